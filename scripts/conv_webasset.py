@@ -6,7 +6,6 @@ in a web browser
 
 import sys
 import os
-import glob
 import argparse
 import logging
 from types import SimpleNamespace
@@ -44,6 +43,51 @@ LOGGER.setLevel(DEBUG_LVL)
 
 
 
+def scan_dirs(top_dir):
+    ''' A generator that walks a directory tree, top down, in the same order as 'os.walk()'
+        Uses 'os.scandir()' directly, so the file type comes with each directory entry
+
+    :param top_dir: directory in which to begin the walk
+    :returns: yields a (directory path, list of file 'os.DirEntry' objects) tuple for each directory
+    '''
+    subdir_list = []
+    file_list = []
+    try:
+        with os.scandir(top_dir) as entry_it:
+            for entry in entry_it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    file_list.append(entry)
+                # Like 'os.walk()', symbolic links to directories are not followed
+                elif not entry.is_symlink():
+                    subdir_list.append(entry.path)
+    except OSError:
+        # Unreadable directories are skipped, as 'os.walk()' does
+        return
+    yield top_dir, file_list
+    for subdir in subdir_list:
+        yield from scan_dirs(subdir)
+
+
+def file_ext(file_name):
+    ''' Returns the upper case extension of a file name, without the '.'
+        Same result as 'os.path.splitext()', i.e. leading dots are not extension separators,
+        but avoids its overhead when checking every file in a directory tree
+
+    :param file_name: file name without directory path, string or bytes
+    :returns: upper case extension or empty string if there is none, same type as 'file_name'
+    '''
+    dot_str = b'.' if isinstance(file_name, bytes) else '.'
+    base_name = file_name.lstrip(dot_str)
+    dot_idx = base_name.rfind(dot_str)
+    if dot_idx < 0:
+        return file_name[:0]
+    return base_name[dot_idx+1:].upper()
+
+
 def find(converter_obj, src_dir, dest_dir, config_build_obj):
     ''' Searches for 3rd party model files in all the subdirectories
 
@@ -54,37 +98,41 @@ def find(converter_obj, src_dir, dest_dir, config_build_obj):
     '''
     LOGGER.debug(f"find({src_dir}, {dest_dir})")
     found = False
-    walk_obj = os.walk(src_dir)
     supported_exts = converter_obj.get_supported_exts()
-    for root, subfolders, files in walk_obj:
-        done = False
-        for file in files:
-            name_str, fileext_str = os.path.splitext(file)
-            for target_fileext_str in supported_exts:
-                if fileext_str.lstrip('.').upper() == target_fileext_str:
-                    find_and_process(converter_obj, root, dest_dir)
-                    found = True
-                    done = True
-                    break
-            if done:
-                break
+    # Normalise the extensions once, so each file only needs one set lookup
+    # The tree is walked with bytes paths, so file names are not decoded unless they are used
+    ext_set = frozenset(os.fsencode(ext_str.upper()) for ext_str in supported_exts)
+    for root, file_entry_list in scan_dirs(os.fsencode(src_dir)):
+        # Process the directory as soon as one of its files has a supported extension
+        if any(file_ext(file_entry.name) in ext_set for file_entry in file_entry_list):
+            find_and_process(converter_obj, os.fsdecode(root), dest_dir, file_entry_list)
+            found = True
     if not found:
         LOGGER.info(f"No files found with extensions: {supported_exts}")
 
 
-def find_and_process(converter_obj, src_dir, dest_dir):
+def find_and_process(converter_obj, src_dir, dest_dir, file_entry_list=None):
     ''' Searches for files in local directory and processes them
 
+    :param converter_obj: file converter object
     :param src_dir: source directory where there are 3rd party model files
     :param dest_dir: destination directory where output is written to
-    :param ext_list: list of supported file extensions
+    :param file_entry_list: optional list of 'os.DirEntry' objects for the files in 'src_dir',
+                            with string or bytes paths, if omitted the directory is scanned once here
     '''
     LOGGER.debug(f"find_and_process({src_dir}, {dest_dir})")
+    if file_entry_list is None:
+        file_entry_list = next(scan_dirs(src_dir), (src_dir, []))[1]
+    # Names and paths are decoded once, in case the directory was scanned with bytes paths
+    name_path_list = [(os.fsdecode(file_entry.name), os.fsdecode(file_entry.path))
+                      for file_entry in file_entry_list]
+    # Same matching as 'glob.glob(os.path.join(src_dir, "*."+ext_str.lower()))'
+    # but the directory is only listed once, rather than once per extension
     for ext_str in converter_obj.get_supported_exts():
-        wildcard_str = os.path.join(src_dir, "*."+ext_str.lower())
-        file_list = glob.glob(wildcard_str)
-        for filename_str in file_list:
-            converter_obj.process(filename_str, dest_dir)
+        suffix_str = "."+ext_str.lower()
+        for file_name, file_path in name_path_list:
+            if file_name.endswith(suffix_str) and not file_name.startswith('.'):
+                converter_obj.process(file_path, dest_dir)
 
     # Convert all files from COLLADA to GLTF v2
     if CONVERT_COLLADA:
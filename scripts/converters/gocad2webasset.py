@@ -114,11 +114,11 @@ class Gocad2WebAsset(Converter):
         return GocadImporter.SUPPORTED_EXTS
 
 
-    def process_points(self, whole_file_lines, dest_dir, noext_filename, base_xyz, filename, src_dir):
+    def process_points(self, file_lines_list, dest_dir, noext_filename, base_xyz, filename, src_dir):
         ''' Takes in GOCAD lines and converts to a COLLADA file if less than 3000 points,
             else converts to a GZipped GEOJSON file.
 
-        :param whole_file_lines: list of strings taken from file's lines
+        :param file_lines_list: list of GOCAD objects, each a list of strings taken from file's lines
         :param dest_dir: destination directory
         :param noext_filename: source file name with path but without extension
         :param base_xyz: [x,y,z] offset for writing out coordinates
@@ -127,7 +127,6 @@ class Gocad2WebAsset(Converter):
 
         '''
         self.logger.debug(f"process_points({dest_dir}, {noext_filename}, {base_xyz}, {filename}, {src_dir})")
-        file_lines_list = split_gocad_objs(whole_file_lines)
         out_filename = os.path.join(dest_dir, os.path.basename(noext_filename))
         file_ext='.gltf'
         for mask_idx, file_lines in enumerate(file_lines_list):
@@ -176,10 +175,10 @@ class Gocad2WebAsset(Converter):
         return True
 
 
-    def process_volumes(self, whole_file_lines, dest_dir, noext_filename, base_xyz, filename, src_dir): 
+    def process_volumes(self, file_lines_list, dest_dir, noext_filename, base_xyz, filename, src_dir): 
         """ Process file that contains a 3D volume
 
-        :param whole_file_lines: list of strings taken from file's lines
+        :param file_lines_list: list of GOCAD objects, each a list of strings taken from file's lines
         :param dest_dir: destination directory
         :param noext_filename: source file name with path but without extension
         :param base_xyz: [x,y,z] offset for writing out coordinates
@@ -187,7 +186,6 @@ class Gocad2WebAsset(Converter):
         :param src_dir: source directory
         """
         self.logger.debug(f"process_volumes({noext_filename}")
-        file_lines_list = split_gocad_objs(whole_file_lines)
         has_result = False
         for mask_idx, file_lines in enumerate(file_lines_list):
             if len(file_lines_list) > 1:
@@ -202,20 +200,33 @@ class Gocad2WebAsset(Converter):
                 self.logger.warning(f"Could not process {filename}")
                 continue
 
+            # Each property of a single layer volume is an independent PNG file,
+            # so these are all written out together
+            png_idx_list = []
+            png_job_list = []
+            for prop_idx, (geom_obj, style_obj, meta_obj) in enumerate(gsm_list):
+                if geom_obj.vol_data is not None and geom_obj.is_single_layer_vo():
+                    out_filename = os.path.join(dest_dir, os.path.basename(meta_obj.src_filename))
+                    png_idx_list.append(prop_idx)
+                    png_job_list.append((geom_obj, style_obj, meta_obj, out_filename))
+            png_popup_list = self.png_kit_obj.write_voxel_png_list(png_job_list)
+            png_popup_dict = dict(zip(png_idx_list, png_popup_list))
+
             # Loop around when several binary files in one GOCAD VOXET object
             for prop_idx, (geom_obj, style_obj, meta_obj) in enumerate(gsm_list):
                 out_filename = os.path.join(dest_dir, os.path.basename(meta_obj.src_filename))
                 self.write_single_volume((geom_obj, style_obj, meta_obj),
-                                         src_dir, out_filename, prop_idx)
+                                         src_dir, out_filename, prop_idx,
+                                         png_popup_dict.get(prop_idx))
                 self.config_build_obj.add_ext(geom_obj.get_extent())
             has_result = True
         return has_result
 
 
-    def process_others(self, whole_file_lines, dest_dir, noext_filename, base_xyz, filename, src_dir, ext_str, out_filename):
+    def process_others(self, file_lines_list, dest_dir, noext_filename, base_xyz, filename, src_dir, ext_str, out_filename):
         """ Process other kinds of file, e.g. faults
 
-        :param whole_file_lines: list of strings taken from file's lines
+        :param file_lines_list: list of GOCAD objects, each a list of strings taken from file's lines
         :param dest_dir: destination directory
         :param noext_filename: source file name with path but without extension
         :param base_xyz: [x,y,z] offset for writing out coordinates
@@ -225,7 +236,6 @@ class Gocad2WebAsset(Converter):
         :param out_filename: output filename
         """
         self.logger.debug(f"process_others({dest_dir}, {filename}, {base_xyz}, {src_dir}, {ext_str}, {out_filename}")
-        file_lines_list = split_gocad_objs(whole_file_lines)
         self.coll_kit_obj.start_collada()
         popup_dict = {}
         node_label = ''
@@ -413,10 +423,15 @@ class Gocad2WebAsset(Converter):
         out_filename = os.path.join(dest_dir, os.path.basename(noext_filename))
         src_dir = os.path.dirname(filename)
 
-        # Open GOCAD file and read all its contents, assume it fits in memory
+        # Open GOCAD file and read its contents, assume each GOCAD object fits in memory
         try:
-            file_d = open(filename, 'r')
-            whole_file_lines = file_d.readlines()
+            with open(filename, 'r') as file_d:
+                # Group files are read whole as their lines are indexed during processing
+                if self.file_datastr_map.is_mixture(filename):
+                    whole_file_lines = file_d.readlines()
+                # Other files are split into GOCAD objects as the lines are read
+                else:
+                    file_lines_list = split_gocad_objs(file_d)
         except OSError as os_exc:
             self.logger.error(f"Can't open or read - skipping file {filename}, {os_exc}")
             return False
@@ -425,21 +440,20 @@ class Gocad2WebAsset(Converter):
         # VS files usually have lots of data points and thus one COLLADA file for each GOCAD file
         # If the VS file has too many points, then output as GZipped GEOJSON file
         if self.file_datastr_map.is_points(filename):
-            ok = self.process_points(whole_file_lines, dest_dir, noext_filename, base_xyz, filename, src_dir)
+            ok = self.process_points(file_lines_list, dest_dir, noext_filename, base_xyz, filename, src_dir)
 
         # One VO or SG file can produce many other files
         elif self.file_datastr_map.is_volume(filename):
-            ok = self.process_volumes(whole_file_lines, dest_dir, noext_filename, base_xyz, filename, src_dir)
+            ok = self.process_volumes(file_lines_list, dest_dir, noext_filename, base_xyz, filename, src_dir)
 
         # For triangles, wells and lines, place multiple GOCAD objects in one COLLADA file
         elif self.file_datastr_map.is_borehole(filename) or self.file_datastr_map.is_flat_shape(filename):
-            ok = self.process_others(whole_file_lines, dest_dir, noext_filename, base_xyz, filename, src_dir, ext_str, out_filename)
+            ok = self.process_others(file_lines_list, dest_dir, noext_filename, base_xyz, filename, src_dir, ext_str, out_filename)
 
         # Process group files, depending on the number of GOCAD objects inside
         elif self.file_datastr_map.is_mixture(filename):
             ok = self.process_groups(whole_file_lines, dest_dir, noext_filename, base_xyz, filename, src_dir, out_filename)
 
-        file_d.close()
         if ok:
             self.logger.debug("process() returns True")
             return True
@@ -448,13 +462,15 @@ class Gocad2WebAsset(Converter):
         return False
 
 
-    def write_single_volume(self, gsm_obj, src_dir, out_filename, prop_idx):
+    def write_single_volume(self, gsm_obj, src_dir, out_filename, prop_idx, png_popup_dict=None):
         ''' Write a single volume to disk
         :param gsm_obj: (MODEL_GEOMETRY, STYLE, METADATA) tuple, contains the geometry of the
                         volume, the volume's style & metadata
         :param src_dir: source directory where there are 3rd party model files
         :param out_filename: output filename without extension
         :param prop_idx: property index of volume's properties, integer
+        :param png_popup_dict: optional popup dict of a single layer volume's PNG file,
+                               if supplied then the PNG file has already been written
         '''
         geom_obj, style_obj, meta_obj = gsm_obj
         self.logger.debug(f"write_single_volume(geom_obj={geom_obj}, style_obj={style_obj}, meta_obj={meta_obj})")
@@ -484,8 +500,11 @@ class Gocad2WebAsset(Converter):
 
             # Produce a PNG file from voxet file
             else:
-                popup_dict = self.png_kit_obj.write_single_voxel_png(geom_obj, style_obj, meta_obj,
-                                                                out_filename)
+                if png_popup_dict is not None:
+                    popup_dict = png_popup_dict
+                else:
+                    popup_dict = self.png_kit_obj.write_single_voxel_png(geom_obj, style_obj, meta_obj,
+                                                                         out_filename)
                 # Just supply the PNG file as the downloadable source for single layer volumes
                 src_filename = out_filename + '.PNG'
                 self.config_build_obj.add_config(self.params.grp_struct_dict,
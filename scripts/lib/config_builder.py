@@ -4,9 +4,10 @@ import logging
 import sys
 import os
 import json
-from collections import defaultdict
+from operator import itemgetter
 from pathlib import PurePath
 from copy import deepcopy
+import numpy as np
 
 # Set up debugging
 LOCAL_LOGGER = logging.getLogger(__name__)
@@ -25,15 +26,25 @@ LOCAL_LOGGER.addHandler(LOCAL_HANDLER)
 
 LOCAL_LOGGER.setLevel(logging.INFO)  # logging.DEBUG
 
+EXTENT_ARR_INIT_SZ = 64
+''' Initial number of rows in the array of extents
+'''
+
+UNDERSCORE_TABLE = str.maketrans('_', ' ')
+''' Translation table used to replace underscores with spaces in labels
+'''
+
 class ConfigBuilder():
 
 
     def __init__(self, debug_level=logging.INFO):
         '''
-        A list of geographical extents [ [min_x, max_x, min_y, max_y], ... ]
+        An array of geographical extents [ [min_x, max_x, min_y, max_y], ... ]
         NB: An extent is a list of coords defining boundaries of model
+        The array grows by doubling, only the first 'self.extent_cnt' rows are in use
         '''
-        self.extent_list = []
+        self.extent_arr = np.empty((EXTENT_ARR_INIT_SZ, 4), dtype=np.float64)
+        self.extent_cnt = 0
 
         '''
         A list of model config dicts
@@ -57,31 +68,32 @@ class ConfigBuilder():
 
 
     def add_ext(self, ext):
-        ''' Adds an extent to this instance's internal extent list
+        ''' Adds an extent to this instance's internal extent array
             :param ext: single extent [min_x, max_x, min_y, max_y]
         '''
-        self.extent_list.append(ext)
+        # Extents that are too short are ignored
+        if len(ext) < 4:
+            return
+        if self.extent_cnt == len(self.extent_arr):
+            new_arr = np.empty((2 * len(self.extent_arr), 4), dtype=np.float64)
+            new_arr[:self.extent_cnt] = self.extent_arr
+            self.extent_arr = new_arr
+        self.extent_arr[self.extent_cnt] = ext[:4]
+        self.extent_cnt += 1
 
 
     def reduce_extents(self):
-        ''' Reduces the internal list of extents to just one extent
+        ''' Reduces the internal array of extents to just one extent
             :returns: single extent [min_x, max_x, min_y, max_y]
         '''
         LOCAL_LOGGER.debug("reduce_extents()")
 
-        out_extent = [sys.float_info.max, -sys.float_info.max, sys.float_info.max, -sys.float_info.max]
-        for extent in self.extent_list:
-            if len(extent) < 4:
-                continue
-            if extent[0] < out_extent[0]:
-                out_extent[0] = float(extent[0])
-            if extent[1] > out_extent[1]:
-                out_extent[1] = float(extent[1])
-            if extent[2] < out_extent[2]:
-                out_extent[2] = float(extent[2])
-            if extent[3] > out_extent[3]:
-                out_extent[3] = float(extent[3])
-        return out_extent
+        ext_arr = self.extent_arr[:self.extent_cnt]
+        # Min X & min Y are found in one pass over the array, then max X & max Y
+        # NB: 'fmin' and 'fmax' ignore NaN values
+        min_x, min_y = np.fmin.reduce(ext_arr[:, 0:4:2], axis=0, initial=sys.float_info.max).tolist()
+        max_x, max_y = np.fmax.reduce(ext_arr[:, 1:4:2], axis=0, initial=-sys.float_info.max).tolist()
+        return [min_x, max_x, min_y, max_y]
 
 
     def create_json_config(self, output_filename, dest_dir, params):
@@ -97,7 +109,7 @@ class ConfigBuilder():
 
         # Sort by display name before saving to file, sort by display name, then model URL
         sorted_model_dict_list = sorted(self.config_list,
-                                    key=lambda x: (x['display_name'], x['model_url']))
+                                    key=itemgetter('display_name', 'model_url'))
         # Create the first entries in our JSON output
         config_dict = {"properties": {"crs": params.crs, "extent": self.reduce_extents(),
                                       "name": params.name,
@@ -108,38 +120,43 @@ class ConfigBuilder():
                       }
         # Are there any sidebar group labels that we can use?
         if hasattr(params, 'grp_struct_dict'):
-            config_dict['groups'] = defaultdict(list)
+            grp_struct_dict = params.grp_struct_dict
+            groups_dict = {}
             for model in sorted_model_dict_list:
-                model_file = model['model_url']
                 # Can we use the group label defined in the model conversion config file?
-                if model_file in params.grp_struct_dict:
-                    group_name = params.grp_struct_dict[model_file][0]
-                    config_dict["groups"][group_name].append(model)
+                grp_struct = grp_struct_dict.get(model['model_url'])
+                if grp_struct is not None:
+                    group_name = grp_struct[0]
                 # Use the alternative group label
                 elif 'alt_group_label' in model:
-                    config_dict["groups"][model['alt_group_label']].append(model)
+                    group_name = model['alt_group_label']
                 # Otherwise categorise as 'Not Grouped'
                 else:
-                    config_dict["groups"]['Not Grouped'].append(model)
+                    group_name = 'Not Grouped'
+                groups_dict.setdefault(group_name, []).append(model)
+            config_dict['groups'] = groups_dict
 
         # Are there WMS layers?
-        if hasattr(params, 'wms_services'):
+        if getattr(params, 'wms_services', None):
+            wms_list = config_dict.setdefault('groups', {}).setdefault('WMS Layers', [])
             for layer in params.wms_services:
-                config_dict['groups']['WMS Layers'].append({ **layer,
-                                                            "type": "WMSLayer",
-                                                            "displayed": True,
-                                                            "include": True})
+                wms_list.append({ **layer,
+                                  "type": "WMSLayer",
+                                  "displayed": True,
+                                  "include": True})
 
         # Are there any group names to be renamed?
-        if hasattr(params, 'grp_rename_list'):
+        if hasattr(params, 'grp_rename_list') and 'groups' in config_dict:
             grp_clone = deepcopy(config_dict['groups'])
+            # Index the group names for case insensitive lookup, the first of any clashing names is used
+            grp_index = {}
+            for grp in config_dict['groups']:
+                grp_index.setdefault(grp.casefold(), grp)
             for from_name, to_name in params.grp_rename_list:
-                for grp in config_dict['groups']:
-                    # Case insensitive compare
-                    if grp.casefold() == from_name.casefold():
-                        LOCAL_LOGGER.debug(f"Renaming group labels: {to_name} renamed to {from_name}")
-                        grp_clone[to_name] = grp_clone.pop(grp)
-                        break
+                grp = grp_index.get(from_name.casefold())
+                if grp is not None:
+                    LOCAL_LOGGER.debug(f"Renaming group labels: {to_name} renamed to {from_name}")
+                    grp_clone[to_name] = grp_clone.pop(grp)
             config_dict['groups'] = grp_clone
 
         # Is there a proj4 definition?
@@ -153,8 +170,9 @@ class ConfigBuilder():
         try:
             # Save out web asset JSON config file
             out_file = os.path.join(dest_dir, os.path.basename(output_filename))
+            # Encode in one go and write once, 'json.dump()' writes each token separately
             with open(out_file, "w") as file_p:
-                json.dump(config_dict, file_p, indent=4, sort_keys=True)
+                file_p.write(json.dumps(config_dict, indent=4, sort_keys=True))
         except OSError as os_exc:
             LOCAL_LOGGER.error(f"Cannot open file {output_filename}, {os_exc}")
             return
@@ -164,9 +182,10 @@ class ConfigBuilder():
         # This can be added to the model conv file to make it easy to categorise
         # the model parts in the website's sidebar
         conv_part_list = []
-        if len(config_dict['groups']['Not Grouped']) > 0:
-            LOCAL_LOGGER.warning(f"There are {len(config_dict['groups']['Not Grouped'])} ungrouped model parts saved to 'conv_group_struct.json'")
-            for part in config_dict['groups']['Not Grouped']:
+        not_grouped_list = config_dict.get('groups', {}).get('Not Grouped', [])
+        if len(not_grouped_list) > 0:
+            LOCAL_LOGGER.warning(f"There are {len(not_grouped_list)} ungrouped model parts saved to 'conv_group_struct.json'")
+            for part in not_grouped_list:
                 conv_part = {'FileNameKey': part['model_url'], "Insert": { 'display_name': part['display_name'] }}
                 if 'popups' in part:
                     conv_part['Insert']['popups'] = part['popups']
@@ -176,7 +195,8 @@ class ConfigBuilder():
                 # Save sample model conversion file
                 out_file = os.path.join(dest_dir, "conv_group_struct.json")
                 with open(out_file, 'w') as out_fp:
-                    json.dump({'GroupStructure': {"Not Grouped": conv_part_list}}, out_fp, indent=4, sort_keys=True)
+                    out_fp.write(json.dumps({'GroupStructure': {"Not Grouped": conv_part_list}},
+                                            indent=4, sort_keys=True))
             except OSError as os_exc:
                 LOCAL_LOGGER.error(f"Cannot save file {out_file}, {os_exc}")
 
@@ -218,24 +238,25 @@ class ConfigBuilder():
         modelconf_dict['model_url'] = model_url
         if outsrc_filename is not None:
             modelconf_dict['src_filename'] = os.path.basename(outsrc_filename)
-        if file_ext.upper() == ".PNG":
+        ext_upper = file_ext.upper()
+        if ext_upper == ".PNG":
             # PNG files do not have any coordinates, so they must be supplied
             modelconf_dict['type'] = 'ImagePlane'
             modelconf_dict['position'] = position
-        elif file_ext.upper() == '.GZSON':
+        elif ext_upper == '.GZSON':
             modelconf_dict['type'] = 'GZSON'
         else:
             modelconf_dict['type'] = 'GLTFObject'
         modelconf_dict['popups'] = popup_dict
 
-        self.add_inserts(gs_dict, model_url, modelconf_dict, label_str.replace('_', ' '))
+        self.add_inserts(gs_dict, model_url, modelconf_dict, label_str.translate(UNDERSCORE_TABLE))
 
         modelconf_dict['include'] = True
         modelconf_dict['displayed'] = True
         # Make an alternative group name from the last segment of source file's directory path
         pp = PurePath(file_name)
         # Make each word of group name capitalised
-        uncap_str = ' '.join(pp.parts[-2:-1]).replace('_', ' ')
+        uncap_str = ' '.join(pp.parts[-2:-1]).translate(UNDERSCORE_TABLE)
         modelconf_dict['alt_group_label'] = ' '.join([ s.capitalize() for s in uncap_str.split(' ')])
         self.config_list.append(modelconf_dict)
 
@@ -250,9 +271,9 @@ class ConfigBuilder():
         :param alt_name: alternative 'display_name' when not supplied in 'gs_dict'
         '''
         # Include inserts from group struct dict
-        if model_part_key in gs_dict and len(gs_dict[model_part_key]) > 1:
-            for ins_k, ins_v in gs_dict[model_part_key][1].items():
-                modelconf_dict[ins_k] = ins_v
+        grp_struct = gs_dict.get(model_part_key)
+        if grp_struct is not None and len(grp_struct) > 1:
+            modelconf_dict.update(grp_struct[1])
 
         # If display name not in group structure dict, use alt name string
         if 'display_name' not in modelconf_dict:
@@ -283,6 +304,6 @@ class ConfigBuilder():
             modelconf_dict['volumeData']['colourLookup'] = style_obj.get_colour_table()
         if style_obj.get_label_table():
             modelconf_dict['volumeData']['labelLookup'] = style_obj.get_label_table()
-        modelconf_dict['alt_group_label'] = f'3D Volume {model_url[:-3].replace("_"," ")}'
+        modelconf_dict['alt_group_label'] = f'3D Volume {model_url[:-3].translate(UNDERSCORE_TABLE)}'
         self.config_list.append(modelconf_dict)
 
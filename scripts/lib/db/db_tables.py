@@ -3,17 +3,22 @@
 import os
 import sys
 import logging
+import pathlib
+import sqlite3
+from collections import namedtuple
 
 """
 Uses 'sqlalchemy' library to create a simple 'sqlite' db to hold query results for models
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, URL
 from sqlalchemy import Integer
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, func, bindparam
 from sqlalchemy.orm import sessionmaker, relationship, scoped_session
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.schema import ForeignKey, MetaData, PrimaryKeyConstraint
 from sqlalchemy.exc import DatabaseError
+from sqlalchemy.pool import QueuePool
 
 LOGGER = logging.getLogger(__name__)
 # Add handler to logger
@@ -24,6 +29,23 @@ LOGGER.setLevel(logging.INFO)  # logging.DEBUG
 
 QUERY_DB_FILE = 'query_data.db'
 
+SQLITE_PRAGMAS = ["synchronous=NORMAL", "busy_timeout=5000", "cache_size=-20000",
+                  "temp_store=memory"]
+''' sqlite PRAGMAs set on every new connection, they reduce the cost of each commit and make
+    a connection wait for a lock instead of failing straight away
+'''
+
+InfoRow = namedtuple('InfoRow', 'id json')
+''' Lightweight named tuple returned when an info object is added to the database
+
+:id: primary key of the row in the info table
+:json: JSON string
+'''
+
+MAX_IN_PARAMS = 500
+''' Maximum number of parameters used in an SQL 'IN' clause, keeps within sqlite's limits
+'''
+
 # Declarative Base class
 class Base(DeclarativeBase):
     pass
@@ -80,7 +102,7 @@ class SegmentInfo(Base):
     __tablename__ = "segment_info"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    json: Mapped[str] = mapped_column(unique=True)
+    json: Mapped[str] = mapped_column(unique=True, index=True)
 
     def __repr__(self):
         return "{1}: json={0}\n".format(self.json, self.__class__.__name__)
@@ -96,7 +118,7 @@ class PartInfo(Base):
     __tablename__ = "part_info"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    json: Mapped[str] = mapped_column(unique=True)
+    json: Mapped[str] = mapped_column(unique=True, index=True)
 
     def __repr__(self):
         return "{1}: json={0}\n".format(self.json, self.__class__.__name__)
@@ -111,7 +133,7 @@ class ModelInfo(Base):
     __tablename__ = "model_info"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    json: Mapped[str] = mapped_column(unique=True)
+    json: Mapped[str] = mapped_column(unique=True, index=True)
 
     def __repr__(self):
         return "{1}: json={0}\n".format(self.json, self.__class__.__name__)
@@ -126,7 +148,7 @@ class UserInfo(Base):
     __tablename__ = "user_info"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    json: Mapped[str] = mapped_column(unique=True)
+    json: Mapped[str] = mapped_column(unique=True, index=True)
 
     def __repr__(self):
         return "{1}: json={0}\n".format(self.json, self.__class__.__name__)
@@ -144,20 +166,127 @@ class KeyValuePairs(Base):
     value: Mapped[str] = mapped_column(nullable=False)
     is_url: Mapped[bool]
 
+
+INFO_CLASSES = (SegmentInfo, PartInfo, ModelInfo, UserInfo)
+''' Tables holding JSON strings which are referred to by the 'Query' table
+'''
+
+INFO_INSERT_STMTS = {info_cls: insert(info_cls.__table__).prefix_with('OR IGNORE')
+                     for info_cls in INFO_CLASSES}
+''' Statements used to insert into the info tables, built once so they are not rebuilt for every insert
+'''
+
+INFO_SELECT_ID_STMTS = {info_cls: select(info_cls.id).where(info_cls.json == bindparam('json_str'))
+                        for info_cls in INFO_CLASSES}
+''' Statements used to look up ids in the info tables, built once so they are not rebuilt for every lookup
+'''
+
+QUERY_INFO_ID_COLS = ('segment_info_id', 'part_info_id', 'model_info_id', 'user_info_id')
+''' Columns in the 'Query' table which point to the info tables
+'''
+
+QUERY_UPSERT_STMT = sqlite_insert(Query.__table__)
+QUERY_UPSERT_STMT = QUERY_UPSERT_STMT.on_conflict_do_update(
+                        index_elements=['model_name', 'label'],
+                        set_={col: QUERY_UPSERT_STMT.excluded[col] for col in QUERY_INFO_ID_COLS})
+''' Statement used to insert a row into the 'Query' table, or update the row if it already exists
+'''
+
+QUERY_SELECT_COLS = (Query.label, Query.model_name, SegmentInfo.json, PartInfo.json,
+                     ModelInfo.json, UserInfo.json)
+''' Columns returned by 'QueryDB.query()'
+'''
+
+QUERY_SELECT_FROM = Query.__table__ \
+                        .outerjoin(SegmentInfo, Query.segment_info_id == SegmentInfo.id) \
+                        .outerjoin(PartInfo, Query.part_info_id == PartInfo.id) \
+                        .outerjoin(ModelInfo, Query.model_info_id == ModelInfo.id) \
+                        .outerjoin(UserInfo, Query.user_info_id == UserInfo.id)
+''' 'Query' table joined to all the info tables, info tables are optional
+'''
+
+READ_ONLY_DBS = {}
+''' Cache of read-only 'QueryDB' objects, key is database filename
+    Each object keeps its connection pool open until it is removed by 'close_read_only_dbs()'
+'''
+
+def open_read_only_db(db_name):
+    """
+    Opens a database for reading, the 'QueryDB' object and its connection pool are reused
+    by later calls
+
+    :param db_name: database filename
+    :returns: 'QueryDB' object, call 'get_error()' to check if it opened successfully
+    """
+    qdb = READ_ONLY_DBS.get(db_name)
+    if qdb is None:
+        qdb = QueryDB(db_name=db_name, read_only=True)
+        # Only cache it if it opened, the database file may not exist yet
+        if qdb.get_error() == '':
+            READ_ONLY_DBS[db_name] = qdb
+    return qdb
+
+
+def close_read_only_dbs():
+    """
+    Closes the connections of all the cached read-only databases and empties the cache
+    """
+    for qdb in READ_ONLY_DBS.values():
+        qdb.close()
+    READ_ONLY_DBS.clear()
+
 #
 class QueryDB():
     ''' A simple database class to manage the creation, writing and reading of the query database
 
     '''
-    def __init__(self, overwrite=False, db_name='query_data.db'):
-        LOGGER.debug(f"__init__ db {overwrite=} {db_name=}")
+    def __init__(self, overwrite=False, db_name='query_data.db', read_only=False):
+        """
+        :param overwrite: optional (default False) remove all current database tables
+        :param db_name: optional database filename
+        :param read_only: optional (default False) open an existing database for reading only, \
+                          with a pool of connections so that many threads can query it at once. \
+                          Otherwise there is a single connection which is used for writing and reading
+        """
+        LOGGER.debug(f"__init__ db {overwrite=} {db_name=} {read_only=}")
         self.error = ''
+        self.read_only = read_only
+        self.is_wal = not read_only and db_name != ':memory:'
         try:
-            db_name = 'sqlite:///' + db_name
-            eng = create_engine(db_name, echo=False)
-            if overwrite:
-                Base.metadata.drop_all(bind=eng)
-            Base.metadata.create_all(bind=eng)
+            # Write-ahead logging is not available for in-memory databases
+            # and is set by the writer, readers just use it
+            pragma_list = ["journal_mode=WAL"] + SQLITE_PRAGMAS if self.is_wal else SQLITE_PRAGMAS
+            if read_only:
+                # With WAL, readers do not block the writer and the writer does not block readers
+                # The filename is percent-encoded in the URI, sqlalchemy would decode it if it
+                # were in the engine's URL, so sqlite is connected to directly
+                db_uri = pathlib.Path(db_name).resolve().as_uri() + "?mode=ro"
+                eng = create_engine("sqlite://", echo=False, poolclass=QueuePool,
+                                    pool_size=os.cpu_count(),
+                                    creator=lambda: sqlite3.connect(db_uri, uri=True,
+                                                                    check_same_thread=False))
+            elif db_name == ':memory:':
+                eng = create_engine('sqlite:///' + db_name, echo=False)
+            else:
+                # Filename is not parsed as a URL, so it can contain '?', '#' etc.
+                eng = create_engine(URL.create('sqlite', database=db_name), echo=False,
+                                    pool_size=1)
+
+            @event.listens_for(eng, "connect")
+            def set_pragmas(dbapi_conn, _):
+                cursor = dbapi_conn.cursor()
+                for pragma in pragma_list:
+                    cursor.execute(f"PRAGMA {pragma}")
+                cursor.close()
+
+            if not read_only:
+                if overwrite:
+                    Base.metadata.drop_all(bind=eng)
+                Base.metadata.create_all(bind=eng)
+                # Databases created before the 'json' columns were indexed need their indexes added
+                for table in Base.metadata.sorted_tables:
+                    for index in table.indexes:
+                        index.create(bind=eng, checkfirst=True)
             # 'scoped_session()' makes a thread-safe cache of session objects
             #  NOTE: Would like to eventually make scope_session() more global
             self.session_obj = scoped_session(sessionmaker(eng))
@@ -174,6 +303,43 @@ class QueryDB():
         """
         return self.error
 
+    def close(self):
+        """
+        Closes the session and all the database connections
+        A database file that was opened for writing is changed back from write-ahead logging
+        to a rollback journal, so that it can be opened read-only from a directory
+        that is not writable
+        """
+        self.session_obj.remove()
+        eng = self.ses.get_bind()
+        if self.is_wal:
+            with eng.connect() as conn:
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+        eng.dispose()
+
+    def __add_one(self, info_cls, json_str):
+        """
+        Adds an info object to the database, if it is not already there
+
+        :param info_cls: info table class e.g. SegmentInfo, PartInfo
+        :param json_str: JSON string
+        :returns: a tuple (True, InfoRow) if successful
+                          (False, exception string) if operation failed
+        """
+        try:
+            # 'INSERT OR IGNORE' does nothing if the JSON string is already in the table
+            result = self.ses.execute(INFO_INSERT_STMTS[info_cls], {'json': json_str})
+            if result.rowcount == 1:
+                info_id = result.lastrowid
+            else:
+                info_id = self.ses.scalar(INFO_SELECT_ID_STMTS[info_cls], {'json_str': json_str})
+            self.ses.commit()
+        except DatabaseError as db_exc:
+            self.ses.rollback()
+            return False, str(db_exc)
+        return True, InfoRow(info_id, json_str)
+
     def add_segment(self, json_str):
         """
         Adds a segment object to database
@@ -182,21 +348,7 @@ class QueryDB():
         :returns: a tuple (True, seginfo_obj) if successful
                           (False, exception string) if operation failed
         """
-        try:
-            seginfo_obj = None
-            if 'segment_info' not in self.metadata_obj.tables.keys():
-                seginfo_obj = SegmentInfo(json=json_str)
-                self.ses.add(seginfo_obj)
-                self.ses.commit()
-                return True, seginfo_obj
-            seginfo_obj = self.ses.scalars(select(SegmentInfo).filter_by(json=json_str).limit(1)).first()
-            if seginfo_obj is None:
-                seginfo_obj = SegmentInfo(json=json_str)
-                self.ses.add(seginfo_obj)
-                self.ses.commit()
-        except DatabaseError as db_exc:
-            return False, str(db_exc)
-        return True, seginfo_obj
+        return self.__add_one(SegmentInfo, json_str)
 
     def add_part(self, json_str):
         """
@@ -206,20 +358,7 @@ class QueryDB():
         :returns: a tuple (True, partinfo_obj) if successful
                           (False, exception string) if operation failed
         """
-        try:
-            if 'part_info' not in self.metadata_obj.tables.keys():
-                part_obj = PartInfo(json=json_str)
-                self.ses.add(part_obj)
-                self.ses.commit()
-                return True, part_obj
-            part_obj = self.ses.scalars(select(PartInfo).filter_by(json=json_str).limit(1)).first()
-            if part_obj is None:
-                part_obj = PartInfo(json=json_str)
-                self.ses.add(part_obj)
-                self.ses.commit()
-        except DatabaseError as db_exc:
-            return False, str(db_exc)
-        return True, part_obj
+        return self.__add_one(PartInfo, json_str)
 
     def add_model(self, json_str):
         """
@@ -229,20 +368,7 @@ class QueryDB():
         :returns: a tuple (True, model_obj) if successful
                           (False, exception string) if operation failed
         """
-        try:
-            if 'model_info' not in self.metadata_obj.tables.keys():
-                model_obj = ModelInfo(json=json_str)
-                self.ses.add(model_obj)
-                self.ses.commit()
-                return True, model_obj
-            model_obj = self.ses.scalars(select(ModelInfo).filter_by(json=json_str).limit(1)).first()
-            if model_obj is None:
-                model_obj = ModelInfo(json=json_str)
-                self.ses.add(model_obj)
-                self.ses.commit()
-        except DatabaseError as db_exc:
-            return False, str(db_exc)
-        return True, model_obj
+        return self.__add_one(ModelInfo, json_str)
 
     def add_user(self, json_str):
         """
@@ -252,35 +378,116 @@ class QueryDB():
         :returns: a tuple (True, userinfo_obj) if successful
                           (False, exception string) if operation failed
         """
+        return self.__add_one(UserInfo, json_str)
+
+    def __add_many(self, info_cls, json_list):
+        """
+        Adds many info objects to the database in a single transaction, skipping duplicates
+
+        :param info_cls: info table class e.g. SegmentInfo, PartInfo
+        :param json_list: list of JSON strings
+        :returns: a tuple (True, list of InfoRow in the same order as 'json_list') if successful
+                          (False, exception string) if operation failed
+        """
+        # Remove duplicates, preserving order
+        unique = list(dict.fromkeys(json_list))
         try:
-            if 'user_info' not in self.metadata_obj.tables.keys():
-                userinfo_obj = UserInfo(json=json_str)
-                self.ses.add(userinfo_obj)
-                self.ses.commit()
-                return True, userinfo_obj
-            userinfo_obj = self.ses.scalars(select(UserInfo).filter_by(json=json_str).limit(1)).first()
-            if userinfo_obj is None:
-                userinfo_obj = UserInfo(json=json_str)
-                self.ses.add(userinfo_obj)
-                self.ses.commit()
+            existing = {}
+            for idx in range(0, len(unique), MAX_IN_PARAMS):
+                chunk = unique[idx:idx + MAX_IN_PARAMS]
+                existing.update(self.ses.execute(select(info_cls.json, info_cls.id)
+                                                 .where(info_cls.json.in_(chunk))).all())
+            missing = [{'json': json_str} for json_str in unique if json_str not in existing]
+            if missing:
+                self.ses.execute(insert(info_cls), missing)
+                for idx in range(0, len(missing), MAX_IN_PARAMS):
+                    chunk = [row['json'] for row in missing[idx:idx + MAX_IN_PARAMS]]
+                    existing.update(self.ses.execute(select(info_cls.json, info_cls.id)
+                                                     .where(info_cls.json.in_(chunk))).all())
+            self.ses.commit()
         except DatabaseError as db_exc:
+            self.ses.rollback()
             return False, str(db_exc)
-        return True, userinfo_obj
+        return True, [InfoRow(existing[json_str], json_str) for json_str in json_list]
+
+    def add_many_segments(self, json_list):
+        """
+        Adds many segment objects to database
+
+        :param json_list: list of segment objects as JSON strings
+        :returns: a tuple (True, list of seginfo_obj) if successful
+                          (False, exception string) if operation failed
+        """
+        return self.__add_many(SegmentInfo, json_list)
+
+    def add_many_parts(self, json_list):
+        """
+        Adds many part objects to database
+
+        :param json_list: list of part objects as JSON strings
+        :returns: a tuple (True, list of partinfo_obj) if successful
+                          (False, exception string) if operation failed
+        """
+        return self.__add_many(PartInfo, json_list)
+
+    def add_many_models(self, json_list):
+        """
+        Adds many model objects to database
+
+        :param json_list: list of model objects as JSON strings
+        :returns: a tuple (True, list of model_obj) if successful
+                          (False, exception string) if operation failed
+        """
+        return self.__add_many(ModelInfo, json_list)
+
+    def add_many_users(self, json_list):
+        """
+        Adds many user info objects to database
+
+        :param json_list: list of user info objects as JSON strings
+        :returns: a tuple (True, list of userinfo_obj) if successful
+                          (False, exception string) if operation failed
+        """
+        return self.__add_many(UserInfo, json_list)
 
     def add_query(self, label, model_name, segment, part, model, user):
         """
-        Adds a query object to database
+        Adds a query object to database, replacing any existing one with the same label and model name
 
-        :param json_str: query object as a JSON string
-        :returns: a tuple (True, query_obj) if successful
+        :param label: model part label
+        :param model_name: name of model
+        :param segment: segment info object returned by 'add_segment()' or None
+        :param part: part info object returned by 'add_part()' or None
+        :param model: model info object returned by 'add_model()' or None
+        :param user: user info object returned by 'add_user()' or None
+        :returns: a tuple (True, None) if successful
                           (False, exception string) if operation failed
         """
+        return self.add_queries([(label, model_name, segment, part, model, user)])
+
+    def add_queries(self, query_list):
+        """
+        Adds many query objects to database in a single transaction,
+        replacing any existing ones with the same label and model name
+
+        :param query_list: list of tuples, format is (label, model_name, segment, part, model, user) \
+                           see 'add_query()' for details
+        :returns: a tuple (True, None) if successful
+                          (False, exception string) if operation failed
+        """
+        if not query_list:
+            return True, None
+        row_list = [{'label': label, 'model_name': model_name,
+                     'segment_info_id': getattr(segment, 'id', None),
+                     'part_info_id': getattr(part, 'id', None),
+                     'model_info_id': getattr(model, 'id', None),
+                     'user_info_id': getattr(user, 'id', None)}
+                    for label, model_name, segment, part, model, user in query_list]
         try:
-            query_obj = Query(label=label, model_name=model_name, segment_info=segment,
-                              part_info=part, model_info=model, user_info=user)
-            self.ses.merge(query_obj)
+            self.ses.execute(QUERY_UPSERT_STMT, row_list)
             self.ses.commit()
         except DatabaseError as db_exc:
+            self.ses.rollback()
             return False, str(db_exc)
         return True, None
 
@@ -294,24 +501,43 @@ class QueryDB():
                       model_info_dict, user_info_dict) if successful \
                 else (False, exception string)
         """
+        # Each thread has its own session
+        ses = self.session_obj()
+        try:
+            return self.__query(ses, label, model_name)
+        finally:
+            # Return the connection to the pool
+            if self.read_only:
+                self.session_obj.remove()
+
+    def __query(self, ses, label, model_name):
+        """
+        Queries the database using a session
+
+        :param ses: session object
+        :param label: model part label
+        :param model_name: name of model
+        :returns: see 'query()'
+        """
+        # If the label is not found, try again with trailing '_<suffix>' parts removed
+        # e.g. 'label_3_i_44' => 'label_3_i', 'label_3', 'label', all fetched in one SELECT
+        candidates = [label]
+        rest = label
+        while '_' in rest:
+            rest = rest.rpartition('_')[0]
+            candidates.append(rest)
+        # Only the JSON strings are needed, so select them directly rather than loading ORM objects
+        stmt = select(*QUERY_SELECT_COLS).select_from(QUERY_SELECT_FROM) \
+                   .where(Query.model_name == model_name) \
+                   .where(Query.label.in_(candidates))
         try:
-            result = self.ses.scalars(select(Query).filter_by(label=label) \
-                                          .filter_by(model_name=model_name).limit(1)).first()
+            row_list = ses.execute(stmt).all()
         except DatabaseError as db_exc:
             return False, str(db_exc)
-        if result is None:
-            filter_str = label.rpartition('_')[0]
-            try:
-                result = self.ses.scalars(select(Query).filter_by(model_name=model_name) \
-                                              .filter_by(label=filter_str).limit(1)).first()
-            except DatabaseError as db_exc:
-                return False, str(db_exc)
-        if result is None:
+        if not row_list:
             return True, (None, None, None, None, None, None)
-        return True, (result.label, result.model_name, getattr(result.segment_info, 'json', None),
-                      getattr(result.part_info, 'json', None),
-                      getattr(result.model_info, 'json', None),
-                      getattr(result.user_info, 'json', None))
+        # Use the longest matching label
+        return True, tuple(max(row_list, key=lambda row: len(row.label)))
 
     def __del__(self):
         try:
@@ -335,7 +561,7 @@ if __name__ == "__main__":
     assert S is not None
     OK, S2 = QUERY_DB.add_segment('seg')
     assert OK
-    assert S2 is not None
+    assert S2 is not None and S2.id == S.id
 
     # Test for no duplicates
     assert QUERY_DB.ses.scalar(select(func.count(SegmentInfo.id))) == 1
@@ -359,18 +585,55 @@ if __name__ == "__main__":
     OK, MSG = QUERY_DB.add_query('label_3_i', 'model_name3', S3, P, None, None)
     assert OK
 
-    # Have added three 'Query' objs? two 'Segment_Info' objs ? etc.
-    assert QUERY_DB.ses.scalar(select(func.count(Query.model_name))) == 3
+    # Adding the same query again replaces it
+    OK, MSG = QUERY_DB.add_query('label2', 'model_name2', S, P, M, U)
+    assert OK
+    OK, MSG = QUERY_DB.add_queries([('label2', 'model_name2', S3, P, M, U),
+                                    ('label4', 'model_name4', S, None, None, None),
+                                    ('label4', 'model_name4', S3, None, None, None)])
+    assert OK
+    OK, Q4 = QUERY_DB.query('label4', 'model_name4')
+    assert OK and Q4[2] == 'seg3' and Q4[3] is None
+    OK, MSG = QUERY_DB.add_queries([])
+    assert OK
+
+    # Have added four 'Query' objs? two 'Segment_Info' objs ? etc.
+    assert QUERY_DB.ses.scalar(select(func.count(Query.model_name))) == 4
     assert QUERY_DB.ses.scalar(select(func.count(SegmentInfo.id))) == 2
     assert QUERY_DB.ses.scalar(select(func.count(PartInfo.id))) == 1
     assert QUERY_DB.ses.scalar(select(func.count(ModelInfo.id))) == 1
     assert QUERY_DB.ses.scalar(select(func.count(UserInfo.id))) == 1
 
+    # Add many segments at once, including duplicates and a pre-existing segment
+    OK, S_LIST = QUERY_DB.add_many_segments(['seg4', 'seg5', 'seg4', 'seg'])
+    assert OK
+    assert [s.json for s in S_LIST] == ['seg4', 'seg5', 'seg4', 'seg']
+    assert S_LIST[0].id == S_LIST[2].id and S_LIST[3].id == S.id
+    assert QUERY_DB.ses.scalar(select(func.count(SegmentInfo.id))) == 4
+    OK, P_LIST = QUERY_DB.add_many_parts(['part', 'part2'])
+    assert OK and P_LIST[0].id == P.id
+    assert QUERY_DB.ses.scalar(select(func.count(PartInfo.id))) == 2
+    OK, M_LIST = QUERY_DB.add_many_models([])
+    assert OK and M_LIST == []
+    OK, U_LIST = QUERY_DB.add_many_users(['user'])
+    assert OK and U_LIST[0].id == U.id
+
     # Look for a 'Query' with all info tables
     OK, Q1 = QUERY_DB.query('label2', 'model_name2')
     assert(OK and Q1 is not None and Q1[0] == 'label2' and Q1[1] == 'model_name2' \
            and Q1[2] == 'seg3')
 
+    # Check that the query and all the info tables are fetched in one SELECT
+    STATEMENTS = []
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        STATEMENTS.append(statement)
+    event.listen(QUERY_DB.ses.get_bind(), "before_cursor_execute", count_statements)
+    QUERY_DB.ses.expire_all()
+    OK, Q1 = QUERY_DB.query('label2', 'model_name2')
+    assert OK and Q1[2] == 'seg3' and Q1[3] == 'part' and Q1[4] == 'model' and Q1[5] == 'user'
+    assert len(STATEMENTS) == 1
+    event.remove(QUERY_DB.ses.get_bind(), "before_cursor_execute", count_statements)
+
     # Look for 'Query' containing Nones
     OK, Q2 = QUERY_DB.query('label_3_i', 'model_name3')
     assert(OK and Q2[0] == 'label_3_i' and Q2[1] == 'model_name3' and Q2[5] is None)
@@ -379,8 +642,49 @@ if __name__ == "__main__":
     OK, Q2 = QUERY_DB.query('label_3_i_44', 'model_name3')
     assert(OK and Q2[0] == 'label_3_i' and Q2[1] == 'model_name3' and Q2[5] is None)
 
+    # Look for 'Query' with more than one trailing part in label
+    OK, Q2 = QUERY_DB.query('label_3_i_44_extra', 'model_name3')
+    assert(OK and Q2[0] == 'label_3_i' and Q2[1] == 'model_name3')
+
     # Non existing 'Query'
     assert QUERY_DB.query('label1_6', 'model_name5') == (True, (None, None, None, None, None, None))
     assert QUERY_DB.query('_label6', 'model_name5') == (True, (None, None, None, None, None, None))
 
+    # Read from a database file while it is open for writing
+    import tempfile
+    with tempfile.TemporaryDirectory() as TMP_DIR:
+        DB_FILE = os.path.join(TMP_DIR, 'test.db')
+        RW_DB = QueryDB(db_name=DB_FILE)
+        assert RW_DB.get_error() == ''
+        OK, S = RW_DB.add_segment('seg')
+        assert OK
+        OK, MSG = RW_DB.add_query('label', 'model_name', S, None, None, None)
+        assert OK
+        RO_DB = open_read_only_db(DB_FILE)
+        assert RO_DB.get_error() == '' and open_read_only_db(DB_FILE) is RO_DB
+        assert RO_DB.query('label', 'model_name') == (True, ('label', 'model_name', 'seg',
+                                                             None, None, None))
+        OK, MSG = RO_DB.add_segment('seg2')
+        assert not OK
+        # Missing database files are not cached
+        assert open_read_only_db(os.path.join(TMP_DIR, 'missing.db')).get_error() != ''
+        assert os.path.join(TMP_DIR, 'missing.db') not in READ_ONLY_DBS
+        # Filenames with characters that have a special meaning in URIs
+        ODD_DB_FILE = os.path.join(TMP_DIR, 'odd?name#50%.db')
+        ODD_DB = QueryDB(db_name=ODD_DB_FILE)
+        OK, S = ODD_DB.add_segment('odd_seg')
+        OK, MSG = ODD_DB.add_query('odd_label', 'model_name', S, None, None, None)
+        assert OK
+        assert open_read_only_db(ODD_DB_FILE).query('odd_label', 'model_name') == \
+                   (True, ('odd_label', 'model_name', 'odd_seg', None, None, None))
+        close_read_only_dbs()
+        assert READ_ONLY_DBS == {}
+        ODD_DB.close()
+        RW_DB.close()
+        # Closed database file uses a rollback journal, not write-ahead logging
+        with open(DB_FILE, 'rb') as DB_FP:
+            assert DB_FP.read(20)[18:20] == b'\x01\x01'
+        assert not os.path.exists(DB_FILE + '-wal')
+        del RO_DB, RW_DB, ODD_DB
+
     print("PASSED QUERY DB TESTS")
@@ -2,13 +2,96 @@
 Contains ModelGeometries class
 """
 import sys
+from collections.abc import Sequence
 import numpy as np
 
+from lib.db.geometry.types import VRTX, TRGL, SEG
+from lib.db.geometry.xyz_data import XYZDataSet
+
 def unit_vector(vector):
     ''' :returns: the unit vector of the vector.
     '''
     return vector / np.linalg.norm(vector)
 
+
+def grow_array(arr, cnt, add_cnt=1):
+    ''' Doubles the size of a numpy array along its first axis if it is too small
+        to add more rows
+
+    :param arr: numpy array
+    :param cnt: number of rows of 'arr' in use
+    :param add_cnt: optional number of rows to be added, default is 1
+    :returns: 'arr' or a larger copy of 'arr'
+    '''
+    if cnt + add_cnt <= len(arr):
+        return arr
+    return np.resize(arr, (max(16, 2 * cnt, cnt + add_cnt),) + arr.shape[1:])
+
+
+class NamedTupleArrayView(Sequence):
+    ''' A sequence of named tuples (e.g. 'VRTX', 'TRGL') which is a view of some numpy arrays
+        in a ModelGeometries object. Each array holds one field of the named tuple,
+        2D arrays are converted to tuples. Named tuples are only created when they are accessed
+    '''
+
+    def __init__(self, tuple_cls, array_func, add_func):
+        '''
+        :param tuple_cls: named tuple class
+        :param array_func: function returning a list of numpy arrays, one for each field of 'tuple_cls'
+        :param add_func: function called to add a named tuple
+        '''
+        self._tuple_cls = tuple_cls
+        self._array_func = array_func
+        self._add_func = add_func
+
+    def __len__(self):
+        return len(self._array_func()[0])
+
+    def __getitem__(self, idx):
+        # Fetch the arrays once, a slice only converts the rows it needs
+        arr_list = self._array_func()
+        arr_len = len(arr_list[0])
+        if isinstance(idx, slice):
+            col_list = [arr[idx].tolist() for arr in arr_list]
+            return [self._tuple_cls(*[self.__to_field(val) for val in row])
+                    for row in zip(*col_list)]
+        if idx < 0:
+            idx += arr_len
+        if not 0 <= idx < arr_len:
+            raise IndexError(f"{self._tuple_cls.__name__} index out of range")
+        return self._tuple_cls(*[self.__to_field(arr[idx].tolist()) for arr in arr_list])
+
+    def __iter__(self):
+        col_list = [arr.tolist() for arr in self._array_func()]
+        for row in zip(*col_list):
+            yield self._tuple_cls(*[self.__to_field(val) for val in row])
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        # Only print the first few named tuples
+        if len(self) > 10:
+            return repr(self[:10])[:-1] + ", ...]"
+        return repr(list(self))
+
+    @staticmethod
+    def __to_field(val):
+        ''' Converts a row of a 2D array into a tuple
+        '''
+        if isinstance(val, list):
+            return tuple(val)
+        return val
+
+    def append(self, tup):
+        ''' Adds a named tuple
+
+        :param tup: named tuple object
+        '''
+        self._add_func(tup)
+
 class ModelGeometries:
     ''' Class used to store abstract geometry of parts of a geological model and its data
         It should be independent as possible of any model's input format
@@ -16,22 +99,55 @@ class ModelGeometries:
         All sequence numbers for _*_arr start at 1
     '''
 
+    __slots__ = ('_vrtx_n', '_vrtx_xyz', '_vrtx_cnt', '_atom_arr',
+                 '_trgl_n', '_trgl_abc', '_trgl_cnt', '_seg_ab', '_seg_cnt',
+                 'max_x', 'min_x', 'max_y', 'min_y', 'max_z', 'min_z',
+                 'vol_origin', 'vol_axis_u', 'vol_axis_v', 'vol_axis_w', 'vol_sz',
+                 'vol_data', 'vol_data_type', '_xyz_data', '_ijk_data',
+                 '_max_data', '_min_data', '_no_data_marker', 'is_vert_line', 'line_width')
+    ''' Fixed set of attributes, there is no per-instance '__dict__'
+    '''
+
+    _repr_fields = None
+    ''' Names of fields printed by '__repr__()', calculated on first use
+    '''
+
     def __init__(self):
 
-        self._vrtx_arr = []
-        ''' Array of named tuples 'VRTX' used to store vertex data
+        self._vrtx_n = np.empty(0, dtype=np.int64)
+        ''' Array of vertex sequence numbers, only the first '_vrtx_cnt' are in use
+        '''
+
+        self._vrtx_xyz = np.empty((0, 3), dtype=np.float64)
+        ''' Array of vertex (X,Y,Z) coordinates, only the first '_vrtx_cnt' rows are in use
+        '''
+
+        self._vrtx_cnt = 0
+        ''' Number of vertices stored in '_vrtx_n' and '_vrtx_xyz'
         '''
 
         self._atom_arr = []
         ''' Array of named tuples 'ATOM' used to store atom data
         '''
 
-        self._trgl_arr = []
-        ''' Array of named tuples 'TRGL' used store triangle face data
+        self._trgl_n = np.empty(0, dtype=np.int64)
+        ''' Array of triangle sequence numbers, only the first '_trgl_cnt' are in use
         '''
 
-        self._seg_arr = []
-        ''' Array of named tuples 'SEG' used to store line segment data
+        self._trgl_abc = np.empty((0, 3), dtype=np.int32)
+        ''' Array of triangle vertex numbers, only the first '_trgl_cnt' rows are in use
+        '''
+
+        self._trgl_cnt = 0
+        ''' Number of triangles stored in '_trgl_n' and '_trgl_abc'
+        '''
+
+        self._seg_ab = np.empty((0, 2), dtype=np.int32)
+        ''' Array of line segment vertex numbers, only the first '_seg_cnt' rows are in use
+        '''
+
+        self._seg_cnt = 0
+        ''' Number of line segments stored in '_seg_ab'
         '''
 
         self.max_x = -sys.float_info.max
@@ -79,7 +195,7 @@ class ModelGeometries:
         '''
 
         self.vol_data = None
-        ''' 3d numpy array of volume data
+        ''' 3d numpy array of volume data, shape is 'vol_sz', index it as vol_data[x, y, z]
         '''
 
         self.vol_data_type = "FLOAT_32"
@@ -89,7 +205,7 @@ class ModelGeometries:
 
         self._xyz_data = []
         ''' Generic property data associated with XYZ points
-            This is an array of a dictionary mapping (X,Y,Z) => [data1, data2, data3, ... ]
+            This is an array of 'XYZDataSet' objects, each holds parallel coordinate and value arrays
         '''
 
         self._ijk_data = []
@@ -121,10 +237,21 @@ class ModelGeometries:
     def __repr__(self):
         ''' Print friendly representation
         '''
+        # Find the non-callable fields once, then reuse them for all instances of the class
+        cls = type(self)
+        if cls.__dict__.get('_repr_fields') is None:
+            cls._repr_fields = tuple(field for field in dir(self)
+                                     if field[-2:] != '__' and field != '_repr_fields'
+                                     and not callable(getattr(self, field)))
         ret_str = ''
-        for field in dir(self):
-            if field[-2:] != '__' and not callable(getattr(self, field)):
-                ret_str += field + ": " + repr(getattr(self, field))[:500] + "\n"
+        for field in cls._repr_fields:
+            val = getattr(self, field)
+            # Large numpy arrays are slow to format, so just print a summary
+            if isinstance(val, np.ndarray):
+                val_str = f"ndarray(shape={val.shape}, dtype={val.dtype})"
+            else:
+                val_str = repr(val)[:500]
+            ret_str += field + ": " + val_str + "\n"
         return ret_str
 
 
@@ -134,7 +261,48 @@ class ModelGeometries:
     def vrtx_arr(self):
         ''' Returns array of VRTX objects
         '''
-        return self._vrtx_arr
+        return NamedTupleArrayView(VRTX, lambda: [self.vrtx_n_array, self.vrtx_xyz_array],
+                                   lambda vrtx: self.add_vrtx(vrtx.n, *vrtx.xyz))
+
+
+    @property
+    def vrtx_cnt(self):
+        ''' Returns number of vertices
+        '''
+        return self._vrtx_cnt
+
+
+    @property
+    def vrtx_n_array(self):
+        ''' Returns numpy array of vertex sequence numbers
+        '''
+        return self._vrtx_n[:self._vrtx_cnt]
+
+
+    @property
+    def vrtx_xyz_array(self):
+        ''' Returns numpy array of vertex coordinates, shape is (number of vertices, 3)
+        '''
+        return self._vrtx_xyz[:self._vrtx_cnt]
+
+
+    def add_vrtx(self, seq_no, x_coord, y_coord, z_coord):
+        ''' Adds a vertex, the arrays are doubled in size when full
+
+        :param seq_no: vertex sequence number
+        :param x_coord, y_coord, z_coord: x,y,z coords
+        '''
+        self._vrtx_n = grow_array(self._vrtx_n, self._vrtx_cnt)
+        self._vrtx_xyz = grow_array(self._vrtx_xyz, self._vrtx_cnt)
+        self._vrtx_n[self._vrtx_cnt] = seq_no
+        self._vrtx_xyz[self._vrtx_cnt] = (x_coord, y_coord, z_coord)
+        self._vrtx_cnt += 1
+
+
+    def recompute_extent(self):
+        ''' Calculates and stores the max and min of all the vertex coordinates
+        '''
+        self.calc_minmax_batch(self.vrtx_xyz_array)
 
 
     @property
@@ -148,33 +316,121 @@ class ModelGeometries:
     def trgl_arr(self):
         ''' Returns array of TRGL objects
         '''
-        return self._trgl_arr
+        return NamedTupleArrayView(TRGL, lambda: [self.trgl_n_array, self.trgl_abc_array],
+                                   lambda trgl: self.add_trgl(trgl.n, *trgl.abc))
+
+
+    @property
+    def trgl_n_array(self):
+        ''' Returns numpy array of triangle sequence numbers
+        '''
+        return self._trgl_n[:self._trgl_cnt]
+
+
+    @property
+    def trgl_abc_array(self):
+        ''' Returns numpy array of triangle vertex numbers, shape is (number of triangles, 3)
+        '''
+        return self._trgl_abc[:self._trgl_cnt]
+
+
+    def add_trgl(self, seq_no, a_vrtx, b_vrtx, c_vrtx):
+        ''' Adds a triangle, the arrays are doubled in size when full
+
+        :param seq_no: triangle sequence number
+        :param a_vrtx, b_vrtx, c_vrtx: vertex numbers of the triangle's corners
+        '''
+        self._trgl_n = grow_array(self._trgl_n, self._trgl_cnt)
+        self._trgl_abc = grow_array(self._trgl_abc, self._trgl_cnt)
+        self._trgl_n[self._trgl_cnt] = seq_no
+        self._trgl_abc[self._trgl_cnt] = (a_vrtx, b_vrtx, c_vrtx)
+        self._trgl_cnt += 1
 
 
     @property
     def seg_arr(self):
         ''' Returns array of SEG objects
         '''
-        return self._seg_arr
+        return NamedTupleArrayView(SEG, lambda: [self.seg_ab_array],
+                                   lambda seg: self.add_seg(*seg.ab))
+
+
+    @property
+    def seg_ab_array(self):
+        ''' Returns numpy array of line segment vertex numbers, shape is (number of segments, 2)
+        '''
+        return self._seg_ab[:self._seg_cnt]
+
+
+    def add_seg(self, a_vrtx, b_vrtx):
+        ''' Adds a line segment, the array is doubled in size when full
+
+        :param a_vrtx, b_vrtx: vertex numbers of the segment's ends
+        '''
+        self._seg_ab = grow_array(self._seg_ab, self._seg_cnt)
+        self._seg_ab[self._seg_cnt] = (a_vrtx, b_vrtx)
+        self._seg_cnt += 1
+
+
+    def add_vrtx_array(self, seq_no_arr, xyz_arr):
+        ''' Adds many vertices at once
+
+        :param seq_no_arr: numpy array of vertex sequence numbers
+        :param xyz_arr: numpy array of vertex x,y,z coords, shape is (number of vertices, 3)
+        '''
+        xyz_arr = np.asarray(xyz_arr).reshape(-1, 3)
+        end_cnt = self._vrtx_cnt + len(xyz_arr)
+        self._vrtx_n = grow_array(self._vrtx_n, self._vrtx_cnt, len(xyz_arr))
+        self._vrtx_xyz = grow_array(self._vrtx_xyz, self._vrtx_cnt, len(xyz_arr))
+        self._vrtx_n[self._vrtx_cnt:end_cnt] = seq_no_arr
+        self._vrtx_xyz[self._vrtx_cnt:end_cnt] = xyz_arr
+        self._vrtx_cnt = end_cnt
+
+
+    def add_trgl_array(self, seq_no_arr, abc_arr):
+        ''' Adds many triangles at once
+
+        :param seq_no_arr: numpy array of triangle sequence numbers
+        :param abc_arr: numpy array of triangle vertex numbers, shape is (number of triangles, 3)
+        '''
+        abc_arr = np.asarray(abc_arr).reshape(-1, 3)
+        end_cnt = self._trgl_cnt + len(abc_arr)
+        self._trgl_n = grow_array(self._trgl_n, self._trgl_cnt, len(abc_arr))
+        self._trgl_abc = grow_array(self._trgl_abc, self._trgl_cnt, len(abc_arr))
+        self._trgl_n[self._trgl_cnt:end_cnt] = seq_no_arr
+        self._trgl_abc[self._trgl_cnt:end_cnt] = abc_arr
+        self._trgl_cnt = end_cnt
+
+
+    def add_seg_array(self, ab_arr):
+        ''' Adds many line segments at once
+
+        :param ab_arr: numpy array of segment vertex numbers, shape is (number of segments, 2)
+        '''
+        ab_arr = np.asarray(ab_arr).reshape(-1, 2)
+        end_cnt = self._seg_cnt + len(ab_arr)
+        self._seg_ab = grow_array(self._seg_ab, self._seg_cnt, len(ab_arr))
+        self._seg_ab[self._seg_cnt:end_cnt] = ab_arr
+        self._seg_cnt = end_cnt
 
 
     def is_trgl(self):
         ''' Returns True iff this contains triangle data
         '''
-        return len(self._trgl_arr) > 0
+        return self._trgl_cnt > 0
 
 
     def is_line(self):
         ''' Returns True iff this contains line data
         '''
-        return len(self._seg_arr) > 0
+        return self._seg_cnt > 0
 
 
     def is_point(self):
         ''' Returns True iff this contains point data
         '''
-        return (len(self._vrtx_arr) > 0 or len(self._atom_arr) > 0) and len(self._trgl_arr) == 0 \
-               and len(self._seg_arr) == 0
+        return (self._vrtx_cnt > 0 or len(self._atom_arr) > 0) and self._trgl_cnt == 0 \
+               and self._seg_cnt == 0
 
 
     def is_volume(self):
@@ -213,6 +469,31 @@ class ModelGeometries:
         except ValueError:
             pass
 
+    def calc_minmax_batch(self, xyz):
+        ''' Calculates and stores the max and min of many x,y,z coords at once
+            Like 'calc_minmax()', NaN coordinates are ignored
+
+        :param xyz: numpy array of x,y,z coords, shape is (number of points, 3)
+        '''
+        if len(xyz) == 0:
+            return
+        # 'fmin' & 'fmax' ignore NaNs, result is only NaN if all values are NaN
+        min_xyz = np.fmin.reduce(xyz, axis=0).tolist()
+        max_xyz = np.fmax.reduce(xyz, axis=0).tolist()
+        # NB: If result is NaN, comparison fails and value is not changed
+        if min_xyz[0] < self.min_x:
+            self.min_x = float(min_xyz[0])
+        if min_xyz[1] < self.min_y:
+            self.min_y = float(min_xyz[1])
+        if min_xyz[2] < self.min_z:
+            self.min_z = float(min_xyz[2])
+        if max_xyz[0] > self.max_x:
+            self.max_x = float(max_xyz[0])
+        if max_xyz[1] > self.max_y:
+            self.max_y = float(max_xyz[1])
+        if max_xyz[2] > self.max_z:
+            self.max_z = float(max_xyz[2])
+
     def get_extent(self):
         ''' :returns: estimate of the 2D (XY) geographic extent of the model, using max and min \
             coordinate values format is [min_x, max_x, min_y, max_y]
@@ -280,35 +561,39 @@ class ModelGeometries:
         self._no_data_marker.append(no_data)
 
 
-    def add_loose_3d_data(self, is_xyz, data_dict):
+    def add_loose_3d_data(self, is_xyz, data):
         ''' Adds an instance of XYZ data
         :param is_xyz: True iff xyz data (float, float, float) \
                        else ijk (int, int, int) data
-        :param data_dict: dictionary of (X,Y,Z) => data, or (I,J,K) => data \
-                          values to be added
-        '''
-        if data_dict:
-            assert(((isinstance(list(data_dict.keys())[0][0], float) or \
-                   isinstance(list(data_dict.keys())[0][0], np.float32)) \
-                   and is_xyz) or (not is_xyz and isinstance(list(data_dict.keys())[0][0], int)))
+        :param data: dictionary of (X,Y,Z) => data, or (I,J,K) => data \
+                     values to be added, xyz data can also be an 'XYZDataSet' object
+        '''
+        if is_xyz and isinstance(data, XYZDataSet):
+            if len(data) > 0:
+                self._xyz_data.append(data)
+        elif data:
+            assert(((isinstance(list(data.keys())[0][0], float) or \
+                   isinstance(list(data.keys())[0][0], np.float32)) \
+                   and is_xyz) or (not is_xyz and isinstance(list(data.keys())[0][0], int)))
             if is_xyz:
-                self._xyz_data.append(data_dict)
+                self._xyz_data.append(XYZDataSet.from_dict(data))
             else:
-                self._ijk_data.append(data_dict)
+                self._ijk_data.append(data)
 
 
     def get_loose_3d_data(self, is_xyz, idx=0):
-        ''' Retrieves data from xyz data dictionary
+        ''' Retrieves data from xyz data set or ijk data dictionary
         :param is_xyz: True iff xyz data (float, float, float) \
                        else ijk (int, int, int) data
         :param idx: index for when there are multiple values for each point in space, \
                     omit for volumes
-        :returns: dictionary of (X,Y,Z) => data value or (I,J,K) => data value
+        :returns: 'XYZDataSet' object if 'is_xyz' is True \
+                  else dictionary of (I,J,K) => data value
         '''
         if is_xyz:
             if len(self._xyz_data) > idx:
                 return self._xyz_data[idx]
-        else:
-            if len(self._ijk_data) > idx:
-                return self._ijk_data[idx]
+            return XYZDataSet()
+        if len(self._ijk_data) > idx:
+            return self._ijk_data[idx]
         return {}
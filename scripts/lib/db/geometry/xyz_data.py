@@ -0,0 +1,93 @@
+"""
+Contains XYZDataSet class
+"""
+from dataclasses import dataclass, field
+import numpy as np
+
+
+@dataclass(eq=False)
+class XYZDataSet:
+    ''' Generic property data associated with XYZ points, stored as parallel numpy arrays
+        Row N of 'values' is the data at the point in row N of 'coords'
+        For backwards compatibility values can also be looked up using an (X,Y,Z) tuple,
+        the lookup table is only created when it is first used
+    '''
+
+    coords: np.ndarray = field(default_factory=lambda: np.empty((0, 3), dtype=np.float64))
+    ''' Array of point (X,Y,Z) coordinates, shape is (number of points, 3)
+    '''
+
+    values: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    ''' Array of data values, shape is (number of points,) or (number of points, data size)
+    '''
+
+    _index: dict = field(default=None, init=False, repr=False, compare=False)
+    ''' Lookup table of (X,Y,Z) => row number
+    '''
+
+    @classmethod
+    def from_dict(cls, data_dict):
+        ''' Creates a data set from a dictionary
+
+        :param data_dict: dictionary of (X,Y,Z) => data value, data value is a float or tuple
+        :returns: XYZDataSet object
+        '''
+        if not data_dict:
+            return cls()
+        coords = np.array(list(data_dict.keys()), dtype=np.float64)
+        # NB: dtype is kept, so float32 data stays float32
+        values = np.array(list(data_dict.values()))
+        return cls(coords, values)
+
+    def __repr__(self):
+        # Large numpy arrays are slow to format, so just print a summary
+        return f"XYZDataSet(coords=ndarray(shape={self.coords.shape}, dtype={self.coords.dtype}), " \
+               f"values=ndarray(shape={self.values.shape}, dtype={self.values.dtype}))"
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __get_row(self, xyz):
+        ''' Looks up the row number of a point
+
+        :param xyz: (X,Y,Z) tuple of floats
+        :returns: row number or None if point is not in data set
+        '''
+        if self._index is None:
+            self._index = {tuple(row): row_no for row_no, row in enumerate(self.coords.tolist())}
+        return self._index.get(tuple(xyz))
+
+    def __get_value(self, row_no):
+        ''' Retrieves the data value in a row
+
+        :param row_no: row number
+        :returns: data value, a tuple if there is more than one value per point
+        '''
+        if self.values.ndim > 1:
+            return tuple(self.values[row_no].tolist())
+        return self.values[row_no]
+
+    def __contains__(self, xyz):
+        return self.__get_row(xyz) is not None
+
+    def __getitem__(self, xyz):
+        row_no = self.__get_row(xyz)
+        if row_no is None:
+            raise KeyError(xyz)
+        return self.__get_value(row_no)
+
+    def __iter__(self):
+        for row in self.coords.tolist():
+            yield tuple(row)
+
+    def get(self, xyz, default=None):
+        ''' Retrieves the data value at a point
+
+        :param xyz: (X,Y,Z) tuple of floats
+        :param default: returned if there is no data at this point
+        :returns: data value
+        '''
+        row_no = self.__get_row(xyz)
+        if row_no is None:
+            return default
+        return self.__get_value(row_no)
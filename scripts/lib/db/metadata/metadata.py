@@ -16,6 +16,16 @@ class METADATA():
     ''' Storage for metadata attributes extracted from GOCAD that can be assigned directly
         to GeoSciML
     '''
+
+    __slots__ = ('name', '_property_name', 'is_index_data', 'rock_label_table', 'label_list',
+                 'src_filename', 'geofeat_name', 'geoevent_numeric_age_range', 'mapped_feat')
+    ''' Fixed set of attributes, there is no per-instance '__dict__'
+    '''
+
+    _repr_fields = None
+    ''' Names of fields printed by '__repr__()', calculated on first use
+    '''
+
     def __init__(self):
         self.name = ''
         ''' Taken from GOCAD object name ??
@@ -69,12 +79,23 @@ class METADATA():
     def __repr__(self):
         ''' A basic print friendly representation
         '''
+        # Find the non-callable fields once, then reuse them for all instances of the class
+        cls = type(self)
+        if cls.__dict__.get('_repr_fields') is None:
+            cls._repr_fields = tuple(field for field in dir(self)
+                                     if field[-2:] != '__' and field != '_repr_fields'
+                                     and not callable(getattr(self, field)))
         ret_str = 'METADATA():'
-        for field in dir(self):
-            if field[-2:] != '__' and not callable(getattr(self, field)):
-                ret_str += field + ": " + repr(getattr(self, field))[:200] + "\n"
+        for field in cls._repr_fields:
+            ret_str += field + ": " + repr(getattr(self, field))[:200] + "\n"
         return ret_str
 
+    @property
+    def property_name(self):
+        ''' Returns the first property name, or an empty string if there are none
+        '''
+        return self._property_name[0] if self._property_name else ''
+
     def add_property_name(self, name):
         ''' Adds a property name
         :name: property name, string
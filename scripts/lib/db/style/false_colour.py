@@ -2,6 +2,12 @@
  A collection of Python functions for creating false colour representations of objects
 '''
 import sys
+from functools import lru_cache
+import numpy as np
+
+MAX_FLT = sys.float_info.max
+''' Values equal to this are at the limits of floating point arithmetic and are given colour number 0
+'''
 
 def calculate_false_colour_num(val_flt, max_flt, min_flt, max_colours_flt):
     ''' Calculates a colour number via interpolation
@@ -13,8 +19,7 @@ def calculate_false_colour_num(val_flt, max_flt, min_flt, max_colours_flt):
     :returns: integer colour number
     '''
     # Floating point arithmetic fails if the numbers are at limits
-    if max_flt == abs(sys.float_info.max) or min_flt == abs(sys.float_info.max) \
-                                          or val_flt == abs(sys.float_info.max):
+    if max_flt == MAX_FLT or min_flt == MAX_FLT or val_flt == MAX_FLT:
         return 0
     # Ensure denominator is not too large
     if (max_flt - min_flt) > 0.0000001:
@@ -22,6 +27,28 @@ def calculate_false_colour_num(val_flt, max_flt, min_flt, max_colours_flt):
     return 0
 
 
+def calculate_false_colour_num_array(val_arr, max_flt, min_flt, max_colours_flt):
+    ''' Vectorised version of 'calculate_false_colour_num()', calculates colour numbers for
+        an array of values
+
+    :param val_arr: numpy array of values used to calculate colour numbers
+    :param min_flt: lower bound of value
+    :param max_flt: upper bound of value
+    :param max_colours_flt: maximum number of colours
+    :returns: numpy int32 array of colour numbers, values whose colour number is NaN, infinite
+              or too large for an int32 are given colour number 0
+    '''
+    val_arr = np.asarray(val_arr, dtype=np.float64)
+    if max_flt == MAX_FLT or min_flt == MAX_FLT or (max_flt - min_flt) <= 0.0000001:
+        return np.zeros(val_arr.shape, dtype=np.int32)
+    with np.errstate(over='ignore', invalid='ignore'):
+        num_arr = (max_colours_flt-1)*(val_arr - min_flt)/(max_flt - min_flt)
+    # NB: NaN fails the comparison too
+    num_arr[(val_arr == MAX_FLT) | ~(np.abs(num_arr) < 2.0**31)] = 0.0
+    # Casting truncates towards zero, the same as 'int()'
+    return num_arr.astype(np.int32)
+
+
 def interpolate(x_flt, xmin_flt, xmax_flt, ymin_flt, ymax_flt):
     ''' Given x, linearly interpolates a y-value
 
@@ -35,9 +62,11 @@ def interpolate(x_flt, xmin_flt, xmax_flt, ymin_flt, ymax_flt):
     return (x_flt - xmin_flt) / (xmax_flt - xmin_flt) * (ymax_flt - ymin_flt) + ymin_flt
 
 
+@lru_cache(maxsize=4096)
 def make_false_colour_tup(i_flt, imin_flt, imax_flt):
     ''' This creates a false colour map, returns an RGBA tuple.
         Maps a floating point value that varies between a min and max value to an RGBA tuple
+        Results are cached because the same palette of colours is made for every export
 
     :param i_flt: floating point value to be mapped
     :param imax_flt: maximum range of the floating point value
@@ -71,3 +100,35 @@ def make_false_colour_tup(i_flt, imin_flt, imax_flt):
         pix[1] = interpolate(hue_flt, 0.75, 1.0, saturation, vmin_flt)
         pix[2] = saturation
     return tuple(pix)
+
+
+def make_false_colour_array(i_arr, imin_flt, imax_flt):
+    ''' Vectorised version of 'make_false_colour_tup()', maps an array of floating point
+        values that vary between a min and max value to an array of RGBA values
+
+    :param i_arr: numpy array of floating point values to be mapped
+    :param imax_flt: maximum range of the floating point values
+    :param imin_flt: minimum range of the floating point values
+    :returns: returns a numpy float array of RGBA values, shape is i_arr.shape + (4,)
+    '''
+    i_arr = np.asarray(i_arr, dtype=np.float64)
+    saturation = 0.8
+    vmin_flt = saturation * (1 - saturation)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hue_arr = (imax_flt - i_arr)/ (imax_flt - imin_flt)
+    ranges = [hue_arr < 0.25, hue_arr < 0.5, hue_arr < 0.75]
+
+    pix_arr = np.empty(i_arr.shape + (4,), dtype=np.float64)
+    pix_arr[..., 0] = np.select(ranges, [saturation,
+                                         interpolate(hue_arr, 0.25, 0.5, saturation, vmin_flt),
+                                         vmin_flt], vmin_flt)
+    pix_arr[..., 1] = np.select(ranges, [interpolate(hue_arr, 0.0, 0.25, vmin_flt, saturation),
+                                         saturation, saturation],
+                                interpolate(hue_arr, 0.75, 1.0, saturation, vmin_flt))
+    pix_arr[..., 2] = np.select(ranges, [vmin_flt, vmin_flt,
+                                         interpolate(hue_arr, 0.5, 0.75, vmin_flt, saturation)],
+                                saturation)
+    pix_arr[..., 3] = 1.0
+    # Values outside of range are transparent
+    pix_arr[(i_arr < imin_flt) | (i_arr > imax_flt)] = 0.0
+    return pix_arr
@@ -77,7 +77,8 @@ class AssimpKit(ExportKit):
             self.scn.mMaterials = mat_arr_pp
             self.scn.mNumMaterials = 1
 
-            mesh_gen = tri_gen(geom_obj.trgl_arr, geom_obj.vrtx_arr, meta_obj.name)
+            mesh_gen = tri_gen(geom_obj.trgl_n_array, geom_obj.trgl_abc_array,
+                               geom_obj.vrtx_n_array, geom_obj.vrtx_xyz_array, meta_obj.name)
 
             for vert_list, indices, mesh_name in mesh_gen:
                 mesh_obj = self.make_a_mesh(mesh_name, indices, 0)
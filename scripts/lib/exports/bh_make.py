@@ -43,7 +43,7 @@ def get_blob_boreholes(borehole_dict, model_param_dict):
     :param model_param_dict: input parameters, contains 'PROVIDER'
     :returns: GLTF blob object
     '''
-    LOGGER.debug(f"get_blob_boreholes({borehole_dict}, {model_param_dict})")
+    LOGGER.debug("get_blob_boreholes(%s, %s)", borehole_dict, model_param_dict)
     # Height resolution (depth in metres between data points)
     height_res = 10.0
 
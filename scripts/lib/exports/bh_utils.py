@@ -3,6 +3,7 @@
 '''
 
 import logging, sys
+from functools import lru_cache
 
 
 LOG_LVL = logging.INFO
@@ -28,6 +29,10 @@ if not LOGGER.hasHandlers():
     LOGGER.addHandler(HANDLER)
 
 
+CLEAN_TABLE = str.maketrans({' ': '_', '/': '_', ':': '_'})
+''' Translation table used to replace characters in borehole names
+'''
+
 
 def make_borehole_label(borehole_name, depth):
     ''' Makes a consistent and space-free label for borehole sections
@@ -47,9 +52,11 @@ def make_borehole_filename(borehole_name):
     return "Borehole_"+clean(borehole_name)
 
 
+@lru_cache(maxsize=4096)
 def clean(borehole_name):
     ''' Returns a clean version of the borehole name or id
+        Results are cached because the same name is usually cleaned for both label and filename
 
     :param borehole_name: borehole identifier or name
     '''
-    return borehole_name.replace(' ', '_').replace('/', '_').replace(':', '_')
+    return borehole_name.translate(CLEAN_TABLE)
@@ -5,6 +5,7 @@
 import os
 import glob
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 ''' Path where 'COLLADA2GLTF-bin' is located '''
 if 'COLLADA2GLTF_BIN' in os.environ:
@@ -20,14 +21,16 @@ REMOVE_COLLADA = True
 
 def convert_dir(src_dir, file_mask="*.dae"):
     ''' Converts a directory of files from COLLADA to GLTF
+        Files are converted in parallel, one 'COLLADA2GLTF-bin' process per CPU
 
     :param src_dir: directory of COLLADA files to be converted
     :param file_mask: optional file mask of files
     '''
     wildcard_str = os.path.join(src_dir, file_mask)
     daefile_list = glob.glob(wildcard_str)
-    for daefile_str in daefile_list:
-        convert_file(daefile_str)
+    # Threads are sufficient because the conversion is done in a separate process
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(convert_file, daefile_list))
 
 def convert_file(daefile_str):
     ''' Converts a COLLADA file to GLTF
@@ -62,7 +65,7 @@ def convert_one_file(daefile_str):
     file_name = os.path.abspath(file_name)
     cmd_list = [collada_bin, "-i", daefile_str, "-o", file_name+".gltf"]
     try:
-        cmd_proc = subprocess.run(cmd_list)
+        cmd_proc = subprocess.run(cmd_list, check=False)
     except OSError as os_exc:
         print("Cannot execute COLLADA2GLTF: ", os_exc)
     else:
@@ -3,16 +3,19 @@ Contains the ColladaKit class
 """
 
 import sys
+import math
 import logging
-from collections import defaultdict
+import functools
 import numpy
 import collada as Collada
 
 from lib.exports.collada_out import ColladaOut
+from lib.db.geometry.model_geometries import ModelGeometries
+from lib.exports.geometry_gen import borehole_colour_info
 # from lib.exports.obj_out import ObjKit
 from lib.exports.bh_utils import make_borehole_label
-from lib.exports.export_kit import ExportKit
-from lib.db.style.false_colour import calculate_false_colour_num, make_false_colour_tup
+from lib.exports.export_kit import ExportKit, run_jobs
+from lib.db.style.false_colour import calculate_false_colour_num_array, make_false_colour_tup
 
 class ColladaKit(ExportKit):
     ''' Class used to output COLLADA files, given geometry, style and metadata data structures
@@ -39,6 +42,11 @@ class ColladaKit(ExportKit):
     POINT_SIZE = 300
     ''' Size of object used to represent point data '''
 
+    NEIGHBOUR_OFFSETS = numpy.array([(x_off, y_off, z_off) for x_off in (-1, 0, 1)
+                                     for y_off in (-1, 0, 1) for z_off in (-1, 0, 1)
+                                     if (x_off, y_off, z_off) != (0, 0, 0)], dtype=numpy.int64)
+    ''' (X,Y,Z) grid offsets of the 26 neighbours of a voxel, shape is (26, 3) '''
+
     def __init__(self, debug_level):
         ''' Initialise class
 
@@ -52,6 +60,9 @@ class ColladaKit(ExportKit):
         self.geomnode_list = []
         self.obj_cnt = 0
 
+        # Cache of pycollada (Effect, Material) objects, key is (colour key, RGBA tuple)
+        self.material_cache = {}
+
         self.collout_obj = ColladaOut(debug_level)
         #self.objoout_obj = ObjKit(debug_level)
 
@@ -88,10 +99,11 @@ class ColladaKit(ExportKit):
         geometry_name = meta_obj.name
         popup_dict = {}
         node_label = ''
+        suffix = f"{self.obj_cnt:05d}"
 
         # Triangles
         if geom_obj.is_trgl():
-            effect = Collada.material.Effect("effect-{0:05d}".format(self.obj_cnt), [],
+            effect = Collada.material.Effect(f"effect-{suffix}", [],
                                              self.SHADING, emission=self.EMISSION,
                                              ambient=self.AMBIENT,
                                              # Return a random colour if none was defined
@@ -99,31 +111,28 @@ class ColladaKit(ExportKit):
                                              specular=self.SPECULAR,
                                              shininess=self.SHININESS,
                                              double_sided=True)
-            mat = Collada.material.Material("material-{0:05d}".format(self.obj_cnt),
-                                            "mymaterial-{0:05d}".format(self.obj_cnt),
+            mat = Collada.material.Material(f"material-{suffix}",
+                                            f"mymaterial-{suffix}",
                                             effect)
             self.mesh_obj.effects.append(effect)
             self.mesh_obj.materials.append(mat)
-            matnode = Collada.scene.MaterialNode("materialref-{0:05d}".format(self.obj_cnt),
+            matnode = Collada.scene.MaterialNode(f"materialref-{suffix}",
                                                  mat, inputs=[])
             # Make floats array for inclusion in COLLADA file
-            vert_floats = []
-            for vrtx in geom_obj.vrtx_arr:
-                vert_floats += [vrtx.xyz[0], vrtx.xyz[1], vrtx.xyz[2]]
+            vert_floats = geom_obj.vrtx_xyz_array.ravel()
 
-            vert_src = Collada.source.FloatSource("triverts-array-{0:05d}".format(self.obj_cnt),
-                                                  numpy.array(vert_floats), ('X', 'Y', 'Z'))
-            geom = Collada.geometry.Geometry(self.mesh_obj, "geometry-{0:05d}".format(self.obj_cnt),
+            vert_src = Collada.source.FloatSource(f"triverts-array-{suffix}",
+                                                  vert_floats, ('X', 'Y', 'Z'))
+            geom = Collada.geometry.Geometry(self.mesh_obj, f"geometry-{suffix}",
                                              geometry_name, [vert_src])
             input_list = Collada.source.InputList()
-            input_list.addInput(0, 'VERTEX', "#triverts-array-{0:05d}".format(self.obj_cnt))
+            input_list.addInput(0, 'VERTEX', f"#triverts-array-{suffix}")
 
-            indices = []
-            for tri in geom_obj.trgl_arr:
-                indices += [tri.abc[0]-1, tri.abc[1]-1, tri.abc[2]-1]
+            # Vertex numbers start at 1, COLLADA indices start at 0
+            indices = (geom_obj.trgl_abc_array - 1).ravel()
 
-            triset = geom.createTriangleSet(numpy.array(indices), input_list,
-                                            "materialref-{0:05d}".format(self.obj_cnt))
+            triset = geom.createTriangleSet(indices, input_list,
+                                            f"materialref-{suffix}")
 
             geom.primitives.append(triset)
             self.mesh_obj.geometries.append(geom)
@@ -135,7 +144,7 @@ class ColladaKit(ExportKit):
 
         # Lines
         elif geom_obj.is_line():
-            effect = Collada.material.Effect("effect-{0:05d}".format(self.obj_cnt), [],
+            effect = Collada.material.Effect(f"effect-{suffix}", [],
                                              self.SHADING,
                                              emission=self.EMISSION,
                                              ambient=self.AMBIENT,
@@ -143,14 +152,14 @@ class ColladaKit(ExportKit):
                                              specular=self.SPECULAR,
                                              shininess=self.SHININESS,
                                              double_sided=True)
-            mat = Collada.material.Material("material-{0:05d}".format(self.obj_cnt),
-                                            "mymaterial-{0:05d}".format(self.obj_cnt), effect)
+            mat = Collada.material.Material(f"material-{suffix}",
+                                            f"mymaterial-{suffix}", effect)
             self.mesh_obj.effects.append(effect)
             self.mesh_obj.materials.append(mat)
 
             geom_label_list = self.collout_obj.make_line(self.mesh_obj, geometry_name,
-                                                         self.geomnode_list, geom_obj.seg_arr,
-                                                         geom_obj.vrtx_arr, self.obj_cnt,
+                                                         self.geomnode_list, geom_obj.seg_ab_array,
+                                                         geom_obj.vrtx_xyz_array, self.obj_cnt,
                                                          geom_obj.line_width, not geom_obj.is_vert_line)
             # Create metadata for popup window on map
             for geom_label in geom_label_list:
@@ -159,39 +168,9 @@ class ColladaKit(ExportKit):
 
         # Points
         elif geom_obj.is_point():
-            geometry_name = meta_obj.name
-            prop_dict = geom_obj.get_loose_3d_data(True)
-            colour_num = 0
-
-            # If there are many colours, make MAX_COLORS materials
-            if not style_obj.has_single_colour():
-                self.make_false_colour_materials(self.mesh_obj, self.MAX_COLOURS)
-                max_v = geom_obj.get_max_data()
-                min_v = geom_obj.get_min_data()
-
-            # If there is only one colour
-            else:
-                self.make_colour_material(self.mesh_obj, style_obj.get_rgba_tup(), colour_num)
-                min_v = 0.0
-                max_v = 0.0
-
-            # Draw vertices as pyramids
-            for vrtx in geom_obj.vrtx_arr:
-                # Lookup the colour table
-                if not style_obj.has_single_colour() and vrtx.xyz in prop_dict:
-                    colour_num = calculate_false_colour_num(prop_dict[vrtx.xyz], max_v, min_v,
-                                                            self.MAX_COLOURS)
-                geom_label = self.collout_obj.make_pyramid(self.mesh_obj, geometry_name,
-                                                           self.geomnode_list, vrtx, self.obj_cnt,
-                                                           self.POINT_SIZE, colour_num)
-
-                # Create metadata for popup window on map
-                popup_dict[geom_label] = {'name': meta_obj.get_property_name(),
-                                          'title': geometry_name.replace('_', ' ')}
-                # Some vertices do not have properties
-                if vrtx.xyz in prop_dict:
-                    popup_dict[geom_label]['val'] = prop_dict[vrtx.xyz]
-                node_label = geom_label
+            popup_dict, node_label = self.__add_points(self.mesh_obj, self.geomnode_list, geom_obj,
+                                                       style_obj, meta_obj, skip_no_data=False,
+                                                       obj_cnt=self.obj_cnt)
 
 
         self.obj_cnt += 1
@@ -237,7 +216,7 @@ class ColladaKit(ExportKit):
             popup info dict format: { object_name: { 'attr_name': attr_val, ... } }
         '''
         self.logger.debug("write_collada(%s)", out_filename)
-        self.logger.debug("write_collada() geom_obj=%s", repr(geom_obj))
+        self.logger.debug("write_collada() geom_obj=%r", geom_obj)
         p_dict = {}
         if geom_obj.is_point():
             p_dict = self.write_point_collada(geom_obj, style_obj, meta_obj, out_filename)
@@ -260,50 +239,17 @@ class ColladaKit(ExportKit):
         :param out_filename: path & filename of COLLADA file to output, without extension
         '''
         self.logger.debug("write_point_collada(%s)", out_filename)
-        self.logger.debug("write_point_collada() geom_obj=%s", repr(geom_obj))
+        self.logger.debug("write_point_collada() geom_obj=%r", geom_obj)
 
         if not geom_obj.is_point():
             self.logger.error("Cannot use write_point_collada for line, triangle or volume")
             sys.exit(1)
 
         mesh = Collada.Collada()
-        popup_dict = {}
-        geometry_name = meta_obj.name
-
         node_list = []
         geomnode_list = []
-        colour_num = 0
-        # If there are many colours, make MAX_COLORS materials
-        prop_dict = geom_obj.get_loose_3d_data(True)
-        if not style_obj.has_single_colour():
-            self.make_false_colour_materials(mesh, self.MAX_COLOURS)
-            max_v = geom_obj.get_max_data()
-            min_v = geom_obj.get_min_data()
-
-        # If there is only one colour
-        else:
-            self.make_colour_material(mesh, style_obj.get_rgba_tup(), colour_num)
-
-        # Draw vertices as pyramids
-        geom_label=''
-        for point_cnt, vrtx in enumerate(geom_obj.vrtx_arr):
-            # If there's a colour table calculate colour, but if no data at that point
-            # then skip this vertex
-            if not style_obj.has_single_colour():
-                if vrtx.xyz not in prop_dict:
-                    continue
-                colour_num = calculate_false_colour_num(prop_dict[vrtx.xyz], max_v, min_v,
-                                                        self.MAX_COLOURS)
-
-            # Create coloured pyramid
-            geom_label = self.collout_obj.make_pyramid(mesh, geometry_name, geomnode_list, vrtx,
-                                                       point_cnt, self.POINT_SIZE, colour_num)
-
-            # Create popup info
-            popup_dict[geom_label] = {'name': meta_obj.get_property_name(),
-                                      'title': geometry_name.replace('_', ' ')}
-            if vrtx.xyz in prop_dict:
-                popup_dict[geom_label]['val'] = prop_dict[vrtx.xyz]
+        popup_dict, geom_label = self.__add_points(mesh, geomnode_list, geom_obj, style_obj,
+                                                   meta_obj, skip_no_data=True)
 
         # Create a node using the geometry list
         node = Collada.scene.Node(geom_label, children=geomnode_list)
@@ -326,29 +272,72 @@ class ColladaKit(ExportKit):
         return popup_dict
 
 
-    def compute_neighbours(self, xyz_list, step):
-        ''' Counts the number of neighbours of each point in a 3d array
+    def __add_points(self, mesh, geomnode_list, geom_obj, style_obj, meta_obj, skip_no_data,
+                     obj_cnt=None):
+        ''' Adds the points of a point geometry to a pycollada mesh object, as coloured pyramids
 
-        :params xyz_listr: list of (X,Y,Z) coordinates
-        :returns: dictionary: key is (X,Y,Z), value is number of neighbours
-        '''
-        ret = {}
-        for xyz in xyz_list:
-            cnt = 0
-            for x_val, y_val, z_val in xyz_list:
-                if xyz != (x_val, y_val, z_val):
-                    if self.next_to(xyz[0], x_val, step) and self.next_to(xyz[1], y_val, step) \
-                                                         and self.next_to(xyz[2], z_val, step):
-                        cnt += 1
-            ret[xyz] = cnt
-        #self.logger.debug("compute_neighbours(%s) returns %s", repr(xyz_list), repr(ret))
-        return ret
-
-
-    def next_to(self, a_val, b_val, step):
-        ''' Returns True iff a equals b or if a is exactly 'step' units away from b
+        :param mesh: pycollada 'Collada' object
+        :param geomnode_list: list of pycollada 'GeometryNode' objects, a node is added for each pyramid
+        :param geom_obj: MODEL_GEOMETRY object that holds the points
+        :param style_obj: STYLE object containing colour info
+        :param meta_obj: METADATA object, used for labelling
+        :param skip_no_data: when colouring by data value, if True points without data are omitted, \
+                             else they are given the colour of the previous point
+        :param obj_cnt: optional object counter used to label all the pyramids, \
+                        if omitted each pyramid is labelled with the point's position in the geometry
+        :returns: popup info dict and the label of the last pyramid
+            popup info dict format: { object_name: { 'attr_name': attr_val, ... } }
         '''
-        return a_val == b_val or a_val == b_val + step or a_val == b_val - step
+        geometry_name = meta_obj.name
+        popup_dict = {}
+        geom_label = ''
+        prop_dict = geom_obj.get_loose_3d_data(True)
+        colour_num = 0
+        # These do not change inside the loop below
+        single_colour = style_obj.has_single_colour()
+        property_name = meta_obj.get_property_name()
+        title = geometry_name.replace('_', ' ')
+
+        # Look up each point's data value once, None if the point has no data
+        val_list = [prop_dict.get(vrtx.xyz) for vrtx in geom_obj.vrtx_arr]
+
+        # If there is only one colour
+        if single_colour:
+            self.make_colour_material(mesh, style_obj.get_rgba_tup(), colour_num)
+            colour_iter = iter(())
+
+        # If there are many colours, make MAX_COLORS materials
+        else:
+            self.make_false_colour_materials(mesh, self.MAX_COLOURS)
+            # Calculate the colours of all the points that have data in one pass
+            colour_arr = calculate_false_colour_num_array([val for val in val_list if val is not None],
+                                                          geom_obj.get_max_data(),
+                                                          geom_obj.get_min_data(),
+                                                          self.MAX_COLOURS)
+            colour_iter = iter(colour_arr.tolist())
+
+        # Draw vertices as pyramids
+        for point_cnt, (vrtx, val) in enumerate(zip(geom_obj.vrtx_arr, val_list)):
+            # Lookup the colour table
+            if not single_colour:
+                if val is not None:
+                    colour_num = next(colour_iter)
+                elif skip_no_data:
+                    continue
+
+            # Create coloured pyramid
+            geom_label = self.collout_obj.make_pyramid(mesh, geometry_name, geomnode_list, vrtx,
+                                                       point_cnt if obj_cnt is None else obj_cnt,
+                                                       self.POINT_SIZE, colour_num)
+
+            # Create metadata for popup window on map
+            popup_dict[geom_label] = {'name': property_name, 'title': title}
+            # Some vertices do not have properties
+            if val is not None:
+                popup_dict[geom_label]['val'] = val
+
+        return popup_dict, geom_label
+
 
     def calc_step_sz(self, geom_obj, limit):
         ''' With many voxets being so large, we have to increase sample size so we don't
@@ -359,9 +348,13 @@ class ColladaKit(ExportKit):
                        represent the voxet data
         :returns: step size as an integer, point (sample) size as list of 3 integers [X,Y,Z]
         '''
-        step = 1
         n_elems3 = geom_obj.vol_sz[0] * geom_obj.vol_sz[1] * geom_obj.vol_sz[2]
-        while n_elems3/(step*step*step) > limit:
+        # Smallest step where n_elems3/step^3 <= limit, using the cube root
+        step = max(1, math.ceil((n_elems3 / limit) ** (1.0 / 3.0)))
+        # Correct for rounding errors in the cube root e.g. 27 ** (1/3) = 3.0000000000000004
+        if step > 1 and n_elems3/((step-1)*(step-1)*(step-1)) <= limit:
+            step -= 1
+        elif n_elems3/(step*step*step) > limit:
             step += 1
         pt_size = [(abs(geom_obj.vol_axis_u[0])*step)/(geom_obj.vol_sz[0]*2),
                    (abs(geom_obj.vol_axis_v[1])*step)/(geom_obj.vol_sz[1]*2),
@@ -370,6 +363,46 @@ class ColladaKit(ExportKit):
 
 
 
+    def scan_vol_data(self, geom_obj, step, surface_only=False, omit_hidden=False):
+        ''' Finds the voxels in a volume that have data, sampling every 'step' voxels along each axis
+
+        :params geom_obj: MODEL_GEOMETRY object
+        :params step: sampling step size, integer
+        :params surface_only: optional, if True only returns voxels on the faces of the volume
+        :params omit_hidden: optional, if True omits voxels that cannot be seen because all of their \
+                             26 sampled neighbours have data with the same integer value
+        :returns: coordinates and values of the voxels that have data, in Z, Y, X scan order, \
+                  coordinates is an integer array of (X,Y,Z) indexes, shape is (number of voxels, 3) \
+                  values is a 1D array of voxel values
+        '''
+        # Transpose so that the voxels are found in Z, Y, X order
+        sub_data = numpy.asarray(geom_obj.vol_data)[::step, ::step, ::step].transpose(2, 1, 0)
+        mask = sub_data != geom_obj.get_no_data_marker()
+        self.logger.debug("%d voxels have no data", mask.size - numpy.count_nonzero(mask))
+        if surface_only:
+            # Edge indexes along each axis, note the last index may be skipped by sampling
+            z_idx, y_idx, x_idx = (numpy.arange(0, sz, step) for sz in reversed(geom_obj.vol_sz[:3]))
+            mask &= ((z_idx == 0) | (z_idx == geom_obj.vol_sz[2] - 1))[:, None, None] | \
+                    ((y_idx == 0) | (y_idx == geom_obj.vol_sz[1] - 1))[None, :, None] | \
+                    ((x_idx == 0) | (x_idx == geom_obj.vol_sz[0] - 1))[None, None, :]
+        if omit_hidden:
+            # Pad with a border of voxels without data, then compare each voxel with its neighbours
+            key_pad = numpy.zeros([sz + 2 for sz in mask.shape], dtype=numpy.int64)
+            key_pad[1:-1, 1:-1, 1:-1][mask] = sub_data[mask].astype(numpy.int64)
+            mask_pad = numpy.pad(mask, 1)
+            hidden = mask.copy()
+            for z_off, y_off, x_off in self.NEIGHBOUR_OFFSETS[:, ::-1].tolist():
+                nbr_idx = tuple(slice(1 + off, 1 + off + sz)
+                                for off, sz in zip((z_off, y_off, x_off), mask.shape))
+                hidden &= mask_pad[nbr_idx] & (key_pad[nbr_idx] == key_pad[1:-1, 1:-1, 1:-1])
+            self.logger.debug("%d voxels are hidden", numpy.count_nonzero(hidden))
+            mask &= ~hidden
+        zyx_arr = numpy.argwhere(mask)
+        vals = sub_data[mask]
+        coords = zyx_arr[:, ::-1] * step
+        return coords, vals
+
+
     def write_vol_collada(self, geom_obj, style_obj, meta_obj, out_filename): # pragma: no cover (not currently in use)
         ''' Write out a COLLADA file from a vo file
 
@@ -379,13 +412,14 @@ class ColladaKit(ExportKit):
         :param out_filename: path & filename of COLLADA file to output, without extension
         '''
         self.logger.debug("write_vol_collada(%s)", out_filename)
-        self.logger.debug("write_vol_collada() geom_obj=%s", repr(geom_obj))
+        self.logger.debug("write_vol_collada() geom_obj=%r", geom_obj)
 
         if not geom_obj.is_volume():
             self.logger.error("Cannot use write_vo_collada for non-volume file, internal error")
             sys.exit(1)
 
         geometry_name = meta_obj.name
+        property_name = meta_obj.get_property_name()
         popup_list = []
         popup_dict = {}
 
@@ -398,75 +432,65 @@ class ColladaKit(ExportKit):
             self.logger.debug("step = %d", step)
 
             # Take the index data found in the voxel file and group it together
-            bucket = defaultdict(list)
-            for z_val in range(0, geom_obj.vol_sz[2], step):
-                for y_val in range(0, geom_obj.vol_sz[1], step):
-                    for x_val in range(0, geom_obj.vol_sz[0], step):
-                        if geom_obj.vol_data[x_val][y_val][z_val] != geom_obj.get_no_data_marker():
-                            key = int(geom_obj.vol_data[x_val][y_val][z_val])
-                            bucket[key].append((x_val, y_val, z_val))
+            # If surrounded by cubes of the same kind, you can't see it, so omit
+            coords, vals = self.scan_vol_data(geom_obj, step, omit_hidden=True)
+            key_arr = vals.astype(numpy.int64)
+            # Partition the coordinates with one stable sort on the keys,
+            # which keeps the coordinates in scan order within each bucket
+            uniq_keys, first_idx, inv_idx = numpy.unique(key_arr, return_index=True,
+                                                         return_inverse=True)
+            order = numpy.argsort(inv_idx, kind='stable')
+            bounds = numpy.searchsorted(inv_idx[order], numpy.arange(len(uniq_keys) + 1))
+            sorted_coords = coords[order]
+            # Buckets are kept in the order that their keys are first found in the scan
+            bucket = {}
+            for k in numpy.argsort(first_idx).tolist():
+                bucket[int(uniq_keys[k])] = sorted_coords[bounds[k]:bounds[k+1]].tolist()
 
             self.logger.debug("Computed buckets")
 
-            # Computing neighbours
-            num_neighbours = {}
-            for data_val, coord_list in bucket.items():
-                num_neighbours[data_val] = self.compute_neighbours(coord_list, step)
-
-            self.logger.debug("Computed neighbours")
-
-            # For each index value (usually rock type)
+            min_data = int(geom_obj.get_min_data())
+
+            # Only the volume's position and size are needed to make the cubes,
+            # so the volume data is not copied to the worker processes
+            vol_geom = ModelGeometries()
+            vol_geom.vol_origin = geom_obj.vol_origin
+            vol_geom.vol_sz = geom_obj.vol_sz
+            vol_geom.vol_axis_u = geom_obj.vol_axis_u
+            vol_geom.vol_axis_v = geom_obj.vol_axis_v
+            vol_geom.vol_axis_w = geom_obj.vol_axis_w
+
+            # Each index value (usually rock type) is written to its own file,
+            # as the popup info and the model config refer to each file separately
+            job_list = []
+            popup_info_list = []
             for file_cnt, (data_val, coord_list) in enumerate(bucket.items(), 1):
-                self.logger.debug("Writing coords %s for key %s", repr(coord_list[:6]),
-                                  repr(data_val))
-                mesh = Collada.Collada()
-                self.make_mapped_colour_materials(mesh, style_obj.colour_map)
-                point_cnt = 0
-                node_list = []
-                colour_num = data_val - int(geom_obj.get_min_data())
-                data_val_label = style_obj.get_rock_label_table().get(colour_num,
-                                                                      meta_obj.get_property_name())
+                colour_num = data_val - min_data
+                data_val_label = style_obj.get_rock_label_table().get(colour_num, property_name)
                 geom_label_stub = geometry_name+"-"+data_val_label
-                for x_val, y_val, z_val in coord_list:
-                    # self.logger.debug("%d %d %d data_val = %s num_neighbours = %d",
-                    # x_val,y_val,z_val, repr(data_val),
-                    # num_neighbours[data_val][(x_val,y_val,z_val)])
-                    # If surrounded by other cubes, you can't see it, so omit
-                    if num_neighbours[data_val][(x_val, y_val, z_val)] < 26:
-                        geomnode_list = []
-                        geom_label = self.collout_obj.make_cube(mesh, colour_num, x_val, y_val,
-                                                                z_val, geom_obj, pt_size,
-                                                                geom_label_stub, file_cnt,
-                                                                point_cnt, geomnode_list)
-                        node = Collada.scene.Node("node{0:010d}".format(point_cnt),
-                                                  children=geomnode_list)
-                        node_list.append(node)
-                        point_cnt += 1
+                job_list.append((vol_geom, style_obj.colour_map, colour_num, coord_list, pt_size,
+                                 geom_label_stub, file_cnt, out_filename + '_' + str(file_cnt)))
 
                 # Use a key with a regular expression to save writing thousands of properties
                 # to config file
-                popup_dict["^" + geom_label_stub] = {'title': meta_obj.name,
-                                                     'property name': meta_obj.get_property_name(),
-                                                     'property value': data_val_label}
-
-                myscene = Collada.scene.Scene("myscene", node_list)
-                mesh.scenes.append(myscene)
-                mesh.scene = myscene
+                file_popup_dict = {"^" + geom_label_stub: {'title': meta_obj.name,
+                                                           'property name': property_name,
+                                                           'property value': data_val_label}}
 
                 # If there are unique labels, then use these, else use the filename
-                if data_val_label != meta_obj.get_property_name():
+                if data_val_label != property_name:
                     popup_dict_key = data_val_label
                 else:
                     popup_dict_key = out_filename + '_' + str(file_cnt)
+                popup_info_list.append((popup_dict_key, file_popup_dict))
 
-                # Write out COLLADA file
-                out_filepath = out_filename + '_' +str(file_cnt)
-                self.logger.info("write_vol_collada() Writing COLLADA file: %s.dae", out_filepath)
-                try:
-                    mesh.write(out_filepath+'.dae')
-                except OSError as os_exc:
-                    self.logger.error("ERROR - Cannot write file %s.dae: %s", out_filepath, repr(os_exc))
-                else:
+            # If the files are not written in parallel, one pycollada object is reused for all the files
+            result_list = run_jobs(_write_index_collada, self.logger.level, job_list,
+                                   functools.partial(self.write_index_collada, mesh=Collada.Collada()))
+
+            for is_written, (popup_dict_key, file_popup_dict) in zip(result_list, popup_info_list):
+                popup_dict.update(file_popup_dict)
+                if is_written:
                     popup_list.append((popup_dict_key, popup_dict, out_filename))
                     popup_dict = {}
 
@@ -482,33 +506,26 @@ class ColladaKit(ExportKit):
             step, pt_size = self.calc_step_sz(geom_obj, 100000)
             self.logger.debug("step = %d", step)
 
-            for z_val in range(0, geom_obj.vol_sz[2], step):
-                for y_val in range(0, geom_obj.vol_sz[1], step):
-                    for x_val in range(0, geom_obj.vol_sz[0], step):
-                        if geom_obj.vol_data[x_val][y_val][z_val] !=  \
-                                 geom_obj.get_no_data_marker() and \
-                                 (z_val == 0 or y_val == 0 or x_val == 0 or \
-                                 z_val == geom_obj.vol_sz[2]-1 or \
-                                 y_val == geom_obj.vol_sz[1]-1 or x_val == geom_obj.vol_sz[0]-1):
-                            colour_num = calculate_false_colour_num(geom_obj.vol_data[x_val][y_val][z_val],
-                                                                    geom_obj.get_max_data(),
-                                                                    geom_obj.get_min_data(),
-                                                                    self.MAX_COLOURS)
-                            geomnode_list = []
-                            geom_label = self.collout_obj.make_cube(mesh, colour_num, x_val,
-                                                                    y_val, z_val, geom_obj,
-                                                                    pt_size, geometry_name,
-                                                                    1, point_cnt, geomnode_list)
-                            node = Collada.scene.Node("node{0:010d}".format(point_cnt),
-                                                      children=geomnode_list)
-                            val_str = "{:.3f}".format(geom_obj.vol_data[x_val][y_val][z_val])
-                            popup_dict[geom_label] = {'title': meta_obj.name,
-                                                      'name': meta_obj.get_property_name(),
-                                                      'value': val_str}
-                            node_list.append(node)
-                            point_cnt += 1
-                        elif geom_obj.vol_data[x_val][y_val][z_val] == geom_obj.get_no_data_marker():
-                            self.logger.debug("%d %d %d no data", x_val, y_val, z_val)
+            # Only the cubes on the outside of the volume are visible
+            coords, vals = self.scan_vol_data(geom_obj, step, surface_only=True)
+            colour_nums = calculate_false_colour_num_array(vals, geom_obj.get_max_data(),
+                                                           geom_obj.get_min_data(),
+                                                           self.MAX_COLOURS)
+            for (x_val, y_val, z_val), colour_num, val in zip(coords.tolist(),
+                                                             colour_nums.tolist(), vals):
+                geomnode_list = []
+                geom_label = self.collout_obj.make_cube(mesh, colour_num, x_val,
+                                                        y_val, z_val, geom_obj,
+                                                        pt_size, geometry_name,
+                                                        1, point_cnt, geomnode_list)
+                node = Collada.scene.Node(f"node{point_cnt:010d}",
+                                          children=geomnode_list)
+                val_str = f"{val:.3f}"
+                popup_dict[geom_label] = {'title': meta_obj.name,
+                                          'name': property_name,
+                                          'value': val_str}
+                node_list.append(node)
+                point_cnt += 1
 
             myscene = Collada.scene.Scene("myscene", node_list)
             mesh.scenes.append(myscene)
@@ -521,7 +538,7 @@ class ColladaKit(ExportKit):
             except OSError as os_exc:
                 self.logger.error("ERROR - Cannot write file %s: %s", dest_path, repr(os_exc))
             else:
-                popup_list.append((meta_obj.get_property_name(), popup_dict, out_filename))
+                popup_list.append((property_name, popup_dict, out_filename))
 
         return popup_list
 
@@ -537,27 +554,34 @@ class ColladaKit(ExportKit):
         :param height_reso: height resolution for colour info dict
         :param out_filename: path & filename of COLLADA file to output, without extension
         '''
-        self.logger.debug("write_borehole(%s, %s, colour_info_dict = %s, %s)", repr(base_vrtx),
-                          repr(borehole_name), repr(colour_info_dict), repr(out_filename))
+        self.logger.debug("write_borehole(%r, %r, colour_info_dict = %r, %r)", base_vrtx,
+                          borehole_name, colour_info_dict, out_filename)
 
         mesh = Collada.Collada()
         node_list = []
 
+        # Depths with the same colour share a material, it is labelled with the first depth
+        colour_mat_dict = {}
+        material_list = []
         for depth, colour_info in colour_info_dict.items():
-            effect = Collada.material.Effect("effect_{:d}".format(int(depth)), [], "phong",
-                                             emission=(0, 0, 0, 1), ambient=(0, 0, 0, 1),
-                                             diffuse=colour_info['colour'],
-                                             specular=(0.7, 0.7, 0.7, 1), shininess=50.0)
-            mat = Collada.material.Material("material_{:d}".format(int(depth)),
-                                            "mymaterial_{:d}".format(int(depth)), effect)
-            mesh.effects.append(effect)
-            mesh.materials.append(mat)
+            rgba_colour = tuple(borehole_colour_info(colour_info)[0])
+            if rgba_colour not in colour_mat_dict:
+                effect = Collada.material.Effect(f"effect_{int(depth):d}", [], "phong",
+                                                 emission=(0, 0, 0, 1), ambient=(0, 0, 0, 1),
+                                                 diffuse=rgba_colour,
+                                                 specular=(0.7, 0.7, 0.7, 1), shininess=50.0)
+                mat = Collada.material.Material(f"material_{int(depth):d}",
+                                                f"mymaterial_{int(depth):d}", effect)
+                mesh.effects.append(effect)
+                mesh.materials.append(mat)
+                colour_mat_dict[rgba_colour] = mat
+            material_list.append(colour_mat_dict[rgba_colour])
 
         geomnode_list = []
-        borehole_label = make_borehole_label(borehole_name, 0)
+        borehole_label = make_borehole_label(borehole_name, 0).decode('utf-8')
         self.collout_obj.make_colour_borehole_marker(mesh, base_vrtx, borehole_label,
                                                      geomnode_list,
-                                                     colour_info_dict, height_reso)
+                                                     colour_info_dict, height_reso, material_list)
         node = Collada.scene.Node(borehole_label, children=geomnode_list)
         node_list.append(node)
 
@@ -573,6 +597,53 @@ class ColladaKit(ExportKit):
 
 
 
+    def write_index_collada(self, vol_geom, colour_map, colour_num, coord_list, pt_size,
+                            geom_label_stub, file_cnt, out_filepath, mesh=None):
+        ''' Writes out a COLLADA file of cubes that all have the same index value and colour
+
+        :param vol_geom: MODEL_GEOMETRY object, holds the volume's position and size
+        :param colour_map: dict of colours, key is integer, value is RGBA tuple of 4 floats
+        :param colour_num: position of the cubes' colour within 'colour_map'
+        :param coord_list: list of (X,Y,Z) integer coordinates of the cubes
+        :param pt_size: size of cubes, three float list
+        :param geom_label_stub: generic label for all cubes
+        :param file_cnt: file counter
+        :param out_filepath: path & filename of COLLADA file to output, without extension
+        :param mesh: optional pycollada 'Collada' object to reuse, its libraries are emptied
+        :returns: True if the file was written
+        '''
+        self.logger.debug("Writing coords %s for %s", repr(coord_list[:6]), out_filepath)
+        if mesh is None:
+            mesh = Collada.Collada()
+        else:
+            mesh.geometries = []
+            mesh.effects = []
+            mesh.materials = []
+            mesh.scenes = []
+        node_list = []
+        # Each file only has one colour, so only its material is added, at index 0
+        self.make_mapped_colour_material(mesh, colour_map, colour_num)
+        for point_cnt, (x_val, y_val, z_val) in enumerate(coord_list):
+            geomnode_list = []
+            self.collout_obj.make_cube(mesh, 0, x_val, y_val, z_val, vol_geom, pt_size,
+                                       geom_label_stub, file_cnt, point_cnt, geomnode_list)
+            node = Collada.scene.Node(f"node{point_cnt:010d}", children=geomnode_list)
+            node_list.append(node)
+
+        myscene = Collada.scene.Scene("myscene", node_list)
+        mesh.scenes.append(myscene)
+        mesh.scene = myscene
+
+        # Write out COLLADA file
+        self.logger.info("write_vol_collada() Writing COLLADA file: %s.dae", out_filepath)
+        try:
+            mesh.write(out_filepath+'.dae')
+        except OSError as os_exc:
+            self.logger.error("ERROR - Cannot write file %s.dae: %s", out_filepath, repr(os_exc))
+            return False
+        return True
+
+
     def make_false_colour_materials(self, mesh, max_colours_flt):
         ''' Adds a list of coloured materials to COLLADA object using a false colour map
 
@@ -581,12 +652,12 @@ class ColladaKit(ExportKit):
         '''
         for colour_idx in range(int(max_colours_flt)):
             diffuse_colour = make_false_colour_tup(float(colour_idx), 0.0, max_colours_flt - 1.0)
-            effect = Collada.material.Effect("effect{0:010d}".format(colour_idx), [], self.SHADING,
+            effect = Collada.material.Effect(f"effect{colour_idx:010d}", [], self.SHADING,
                                              emission=self.EMISSION, ambient=self.AMBIENT,
                                              diffuse=diffuse_colour, specular=self.SPECULAR,
                                              shininess=self.SHININESS)
-            mat = Collada.material.Material("material{0:010d}".format(colour_idx),
-                                            "mymaterial{0:010d}".format(colour_idx), effect)
+            mat = Collada.material.Material(f"material{colour_idx:010d}",
+                                            f"mymaterial{colour_idx:010d}", effect)
             mesh.effects.append(effect)
             mesh.materials.append(mat)
 
@@ -600,25 +671,53 @@ class ColladaKit(ExportKit):
         '''
         self.logger.debug("make_colour_material(%s, %s, %s)", repr(mesh), repr(colour_tup),
                           repr(colour_idx))
-        effect = Collada.material.Effect("effect{0:010d}".format(colour_idx), [], self.SHADING,
-                                         emission=self.EMISSION, ambient=self.AMBIENT,
-                                         diffuse=colour_tup, specular=self.SPECULAR,
-                                         shininess=self.SHININESS)
-        mat = Collada.material.Material("material{0:010d}".format(colour_idx),
-                                        "mymaterial{0:010d}".format(colour_idx), effect)
+        effect, mat = self.__make_effect_material(colour_tup, colour_idx)
         mesh.effects.append(effect)
         mesh.materials.append(mat)
 
 
-    def make_mapped_colour_materials(self, mesh, colour_map):
-        ''' Adds a list of coloured materials to COLLADA object using supplied colour_map
+    def make_mapped_colour_material(self, mesh, colour_map, colour_num):
+        ''' Adds one coloured material to COLLADA object using supplied colour_map
+            Materials are cached, so each colour is only created once for all COLLADA objects
 
         :params mesh: COLLADA object
         :params colour_map: dict of colours, key is integer, value is RGBA tuple of 4 floats
+        :params colour_num: position of the colour within 'colour_map'
         '''
-        for key in colour_map:
-            self.make_colour_material(mesh, colour_map[key], key)
+        key = list(colour_map)[colour_num]
+        cache_key = (key, tuple(colour_map[key]))
+        if cache_key not in self.material_cache:
+            self.material_cache[cache_key] = self.__make_effect_material(colour_map[key], key)
+        effect, mat = self.material_cache[cache_key]
+        mesh.effects.append(effect)
+        mesh.materials.append(mat)
+
+
+    def __make_effect_material(self, colour_tup, colour_idx):
+        ''' Creates a colour material and its effect
+
+        :params colour_tup: tuple of floats (R,G,B,A)
+        :params colour_idx: integer index, used to refer to the material
+        :returns: pycollada 'Effect' and 'Material' objects
+        '''
+        effect = Collada.material.Effect(f"effect{colour_idx:010d}", [], self.SHADING,
+                                         emission=self.EMISSION, ambient=self.AMBIENT,
+                                         diffuse=colour_tup, specular=self.SPECULAR,
+                                         shininess=self.SHININESS)
+        mat = Collada.material.Material(f"material{colour_idx:010d}",
+                                        f"mymaterial{colour_idx:010d}", effect)
+        return effect, mat
 
 
 
 #  END OF ColladaKit CLASS
+
+
+def _write_index_collada(debug_level, job):
+    ''' Writes out one index volume COLLADA file in a worker process
+
+    :param debug_level: debug level taken from python's 'logging' module
+    :param job: tuple of parameters for 'ColladaKit.write_index_collada()'
+    :returns: True if the file was written
+    '''
+    return ColladaKit(debug_level).write_index_collada(*job)
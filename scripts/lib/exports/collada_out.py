@@ -57,16 +57,19 @@ class ColladaOut():
         # repr(geometry_name), repr(file_cnt), repr(point_cnt))
         gen = cube_gen(x_val, y_val, z_val, geom_obj, pt_size)
         vert_floats, indices = next(gen)
-        vert_src = Collada.source.FloatSource("cubeverts-array-{0:010d}".format(point_cnt),
-                                              numpy.array(vert_floats), ('X', 'Y', 'Z'))
-        geom_label = "{0}_{1}-{2:010d}".format(geometry_name, file_cnt, point_cnt)
-        geom = Collada.geometry.Geometry(mesh, "geometry{0:010d}".format(point_cnt),
+        suffix = f"{point_cnt:010d}"
+        vert_src = Collada.source.FloatSource(f"cubeverts-array-{suffix}",
+                                              numpy.asarray(vert_floats, dtype=numpy.float64),
+                                              ('X', 'Y', 'Z'))
+        geom_label = f"{geometry_name}_{file_cnt}-{suffix}"
+        geom = Collada.geometry.Geometry(mesh, f"geometry{suffix}",
                                          geom_label, [vert_src])
         input_list = Collada.source.InputList()
-        input_list.addInput(0, 'VERTEX', "#cubeverts-array-{0:010d}".format(point_cnt))
+        input_list.addInput(0, 'VERTEX', f"#cubeverts-array-{suffix}")
 
-        material_label = "materialref-{0:010d}".format(colour_num)
+        material_label = f"materialref-{colour_num:010d}"
         # Triangles seem to be more efficient than polygons
+        # NB: pycollada reshapes index arrays in place, so each triangle set is given a copy
         triset = geom.createTriangleSet(numpy.array(indices), input_list, material_label)
         geom.primitives.append(triset)
         mesh.geometries.append(geom)
@@ -94,31 +97,33 @@ class ColladaOut():
         gen = pyramid_gen(vrtx, point_sz)
         vert_floats, indices = next(gen)
 
+        suffix = f"{point_cnt:010d}"
+        material_label = f"materialref-{colour_num:010d}"
         input_list = Collada.source.InputList()
-        input_list.addInput(0, 'VERTEX', "#pointverts-array-{0:010d}".format(point_cnt))
-        vert_src_list = [Collada.source.FloatSource("pointverts-array-{0:010d}".format(point_cnt),
-                                                    numpy.array(vert_floats), ('X', 'Y', 'Z'))]
-        geom_label = "{0}-{1:010d}".format(geometry_name, point_cnt)
-        geom = Collada.geometry.Geometry(mesh, "geometry{0:010d}".format(point_cnt),
+        input_list.addInput(0, 'VERTEX', f"#pointverts-array-{suffix}")
+        vert_src_list = [Collada.source.FloatSource(f"pointverts-array-{suffix}",
+                                                    numpy.asarray(vert_floats, dtype=numpy.float64),
+                                                    ('X', 'Y', 'Z'))]
+        geom_label = f"{geometry_name}-{suffix}"
+        geom = Collada.geometry.Geometry(mesh, f"geometry{suffix}",
                                          geom_label, vert_src_list)
-        triset_list = [geom.createTriangleSet(numpy.array(indices), input_list,
-                                              "materialref-{0:010d}".format(colour_num))]
+        triset_list = [geom.createTriangleSet(numpy.array(indices), input_list, material_label)]
         geom.primitives = triset_list
         mesh.geometries.append(geom)
-        matnode_list = [Collada.scene.MaterialNode("materialref-{0:010d}".format(colour_num),
-                                                   mesh.materials[colour_num], inputs=[])]
+        matnode_list = [Collada.scene.MaterialNode(material_label, mesh.materials[colour_num],
+                                                   inputs=[])]
         geomnode_list.append(Collada.scene.GeometryNode(geom, matnode_list))
         return geom_label
 
 
-    def make_line(self, mesh, geometry_name, geomnode_list, seg_arr, vrtx_arr, obj_cnt, line_width, z_expand):
+    def make_line(self, mesh, geometry_name, geomnode_list, seg_ab, vrtx_xyz, obj_cnt, line_width, z_expand):
         ''' Makes a line using pycollada objects
 
             :param mesh: pycollada 'Collada' object
             :param geometry_name: generic label for all cubes
             :param geomnode_list: list of pycollada 'GeometryNode' objects
-            :param seg_arr: array of SEG objects, defines line segments
-            :param vrtx_arr: array of VRTX objects, all points along line
+            :param seg_ab: numpy array of line segment vertex numbers, shape is (number of segments, 2)
+            :param vrtx_xyz: numpy array of vertex coordinates of all points along line
             :param obj_cnt: object counter within this file (an object may contain many lines)
             :param line_width: line width, float
             :param z_expand: is true if line width is drawn in z-direction else x-direction
@@ -126,24 +131,29 @@ class ColladaOut():
         '''
         geom_label_list = []
 
-        for point_cnt, vert_floats, indices in line_gen(seg_arr, vrtx_arr, line_width, z_expand):
+        # All the vertices and indices are made in two contiguous buffers,
+        # each pycollada source and triangle set is given a view of one row
+        vert_buf, indices = next(line_gen(seg_ab, vrtx_xyz, line_width, z_expand))
+        idx_buf = numpy.tile(numpy.array(indices, dtype=numpy.int64), (len(vert_buf), 1))
+        for point_cnt in range(len(vert_buf)):
+            suffix = f"{point_cnt:010d}-{obj_cnt:05d}"
 
             vert_src = Collada.source.FloatSource(
-                "lineverts-array-{0:010d}-{1:05d}".format(point_cnt, obj_cnt),
-                numpy.array(vert_floats), ('X', 'Y', 'Z'))
-            geom_label = "line-{0}-{1:010d}".format(geometry_name, point_cnt)
+                f"lineverts-array-{suffix}",
+                vert_buf[point_cnt], ('X', 'Y', 'Z'))
+            geom_label = f"line-{geometry_name}-{point_cnt:010d}"
             geom = Collada.geometry.Geometry(mesh,
-                                             "geometry{0:010d}-{1:05d}".format(point_cnt, obj_cnt),
+                                             f"geometry{suffix}",
                                              geom_label, [vert_src])
 
             input_list = Collada.source.InputList()
             input_list.addInput(0, 'VERTEX',
-                                "#lineverts-array-{0:010d}-{1:05d}".format(point_cnt, obj_cnt))
+                                f"#lineverts-array-{suffix}")
 
-            matnode = Collada.scene.MaterialNode("materialref-{0:010d}-{0:05d}".format(point_cnt, obj_cnt),
+            matnode = Collada.scene.MaterialNode(f"materialref-{point_cnt:010d}-{point_cnt:05d}",
                                              mesh.materials[-1], inputs=[])
-            triset = geom.createTriangleSet(numpy.array(indices),
-                                            input_list, "materialref-{0:05d}".format(obj_cnt))
+            triset = geom.createTriangleSet(idx_buf[point_cnt],
+                                            input_list, f"materialref-{obj_cnt:05d}")
             geom.primitives.append(triset)
             mesh.geometries.append(geom)
             geomnode_list.append(Collada.scene.GeometryNode(geom, [matnode]))
@@ -154,7 +164,7 @@ class ColladaOut():
 
 
     def make_colour_borehole_marker(self, mesh, pos, borehole_label, geomnode_list,
-                                    colour_info_dict, ht_resol):
+                                    colour_info_dict, ht_resol, material_list=None):
         ''' Makes a borehole marker stick with triangular cross section using pycollada objects
 
         :param mesh: pycollada 'Collada' object
@@ -164,23 +174,28 @@ class ColladaOut():
         :param colour_info_dict: dict of: key = height, float; value = { 'colour': (R,G,B,A),
                                                                          'classText': label }
         :param ht_reso: height resolution
+        :param material_list: optional list of pycollada 'Material' objects, one for each depth, \
+                              if omitted then the mesh's materials are used
         '''
-        cb_gen = colour_borehole_gen(pos, "borehole-{0}".format(borehole_label),
+        if material_list is None:
+            material_list = mesh.materials
+        cb_gen = colour_borehole_gen(pos, f"borehole-{borehole_label}",
                                      colour_info_dict, ht_resol)
         # pylint:disable=W0612
         for vert_list, indices, colour_idx, depth, rgba_colour, class_dict, mesh_name in cb_gen:
-            vert_src = Collada.source.FloatSource("pointverts-array-0", numpy.array(vert_list),
+            vert_src = Collada.source.FloatSource("pointverts-array-0",
+                                                  numpy.asarray(vert_list, dtype=numpy.float64),
                                                   ('X', 'Y', 'Z'))
-            geom = Collada.geometry.Geometry(mesh, "geometry_{0}".format(int(depth)),
+            geom = Collada.geometry.Geometry(mesh, f"geometry_{int(depth)}",
                                              mesh_name, [vert_src])
             input_list = Collada.source.InputList()
             input_list.addInput(0, 'VERTEX', "#pointverts-array-0")
 
             triset = geom.createTriangleSet(numpy.array(indices), input_list,
-                                            "materialref-{:d}".format(int(depth)))
+                                            f"materialref-{int(depth):d}")
             geom.primitives.append(triset)
             mesh.geometries.append(geom)
 
-            matnode = Collada.scene.MaterialNode("materialref-{:d}".format(int(depth)),
-                                                 mesh.materials[colour_idx], inputs=[])
+            matnode = Collada.scene.MaterialNode(f"materialref-{int(depth):d}",
+                                                 material_list[colour_idx], inputs=[])
             geomnode_list.append(Collada.scene.GeometryNode(geom, [matnode]))
@@ -1,8 +1,12 @@
 """
 Parent class for all '_kit' classes
 """
-import logging
+import os
 import sys
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 class ExportKit:
 
@@ -61,3 +65,21 @@ class ExportKit:
         :param out_filename: path & filename file to output
         '''
         raise NotImplementedError("Subclass must implement abstract method")
+
+
+def run_jobs(worker, debug_level, job_list, serial_func):
+    ''' Runs a list of jobs, in parallel if possible
+
+    :param worker: module level function called in a worker process, its parameters are
+                   'debug_level' and one job
+    :param debug_level: debug level taken from python's 'logging' module
+    :param job_list: list of jobs, each job is a tuple of parameters for 'serial_func'
+    :param serial_func: function used to run each job when the jobs are not run in parallel
+    :returns: list of job results, in the same order as 'job_list'
+    '''
+    # The jobs are run in parallel, unless this is a daemon process
+    # e.g. a 'multiprocessing.Pool' worker, as these cannot start processes
+    if len(job_list) > 1 and not multiprocessing.current_process().daemon:
+        with ProcessPoolExecutor(max_workers=min(len(job_list), os.cpu_count())) as executor:
+            return list(executor.map(worker, repeat(debug_level), job_list))
+    return [serial_func(*job) for job in job_list]
@@ -63,7 +63,7 @@ class GltfKit(ExportKit):
         self.logger.debug(f"{self.max_ind=}")
 
         np_triangles = np.array(triangles, dtype="uint16")
-        triangles_binary_blob = np_triangles.flatten().tobytes()
+        triangles_binary_blob = np_triangles.tobytes()
         np_points = np.array(points, dtype="float32")
         points_binary_blob = np_points.tobytes()
         self.logger.debug(f"@@ {np_triangles=}")
@@ -173,7 +173,8 @@ class GltfKit(ExportKit):
             self.make_nodes(b'root_node', bytes(meta_obj.name, 'ascii') + b'_0', 1)
 
 
-            mesh_gen = tri_gen(geom_obj.trgl_arr, geom_obj.vrtx_arr, meta_obj.name)
+            mesh_gen = tri_gen(geom_obj.trgl_n_array, geom_obj.trgl_abc_array,
+                               geom_obj.vrtx_n_array, geom_obj.vrtx_xyz_array, meta_obj.name)
 
             for vert_list, indices, mesh_name in mesh_gen:
                 mesh_obj = self.make_a_mesh(mesh_name, indices, 0)
@@ -41,7 +41,7 @@ class GZSONKit(ExportKit):
         :param out_filename: path & filename of GZSON file to output, without extension
         '''
         self.logger.debug("GZSONKit.write_points(%s)", out_filename)
-        self.logger.debug("GZSONKit.write_points() geom_obj=%s", repr(geom_obj))
+        self.logger.debug("GZSONKit.write_points() geom_obj=%r", geom_obj)
 
         if not geom_obj.is_point():
             self.logger.error("ERROR - Cannot use GZSONKit.write_points for line, triangle or volume")
@@ -102,10 +102,11 @@ class GZSONKit(ExportKit):
         feature_list = []
         prop_dict = geom_obj.get_loose_3d_data(True)
 
+        # Look up the coordinates of both ends of all the segments at once
+        seg_xyz_list = geom_obj.vrtx_xyz_array[geom_obj.seg_ab_array - 1].tolist()
+
         # geom_label=''
-        for seg_cnt, seg in enumerate(geom_obj.seg_arr):
-            xyz1 = geom_obj.vrtx_arr[seg.ab[0]-1]
-            xyz2 = geom_obj.vrtx_arr[seg.ab[1]-1]
+        for seg_cnt, (xyz1, xyz2) in enumerate(seg_xyz_list):
             # Create popup info
             # Not used at present
             # geom_label = "{0}-{1:010d}".format(geometry_name, seg_cnt)
@@ -115,7 +116,7 @@ class GZSONKit(ExportKit):
             # Create a list of line features
             # Not used at present
             # popup_dict[geom_label]['val'] = prop_dict[coord.xyz]
-            ls = LineString([xyz1.xyz, xyz2.xyz])
+            ls = LineString([tuple(xyz1), tuple(xyz2)])
             if style_obj.has_single_colour():
                 feature_list.append(Feature(geometry=ls, properties={"colour": style_obj.get_rgba_tup()}))
             else:
@@ -3,6 +3,8 @@ Contains ObjOut class
 """
 import sys
 import logging
+from functools import lru_cache
+import numpy
 
 from lib.db.style.false_colour import make_false_colour_tup
 
@@ -12,6 +14,24 @@ class ObjKit(): # pragma: no cover (this class is not in use)
     # Limit to 256 colours
     MAX_COLOURS = 256.0
 
+    CUBE_CORNERS = numpy.array([(-1, -1, 1), (-1, -1, -1), (-1, 1, -1), (-1, 1, 1),
+                                (1, -1, 1), (1, -1, -1), (1, 1, -1), (1, 1, 1)], dtype=numpy.float64)
+    ''' Signs of the (X,Y,Z) offsets of the 8 corners of a cube from its centre '''
+
+    CUBE_FACES = ((3, 7, 6, 2), # BOTTOM
+                  (5, 8, 4, 1), # TOP
+                  (2, 6, 5, 1), # SOUTH
+                  (8, 7, 3, 4), # NORTH
+                  (6, 7, 8, 5), # EAST
+                  (4, 3, 2, 1)) # WEST
+    ''' Corners of each face of a cube, numbered from 1 '''
+
+    CUBE_VERT_FMT = b"v %f %f %f\n" * 8
+    ''' Format of the 8 corner vertex lines of a cube, all are formatted in one pass '''
+
+    OBJ_BUFFER_SZ = 1 << 20
+    ''' Size in bytes of the write buffer used for OBJ files '''
+
     def __init__(self, debug_level):
         ''' Initialise class
 
@@ -36,117 +56,130 @@ class ObjKit(): # pragma: no cover (this class is not in use)
         ObjKit.logger.setLevel(debug_level)
         self.logger = ObjKit.logger
 
+        # Make the false colour palette and MTL file materials once, they are the same every time
+        if not hasattr(ObjKit, '_mtl_colour_list'):
+            ObjKit._palette = numpy.array([make_false_colour_tup(float(colour_idx), 0.0,
+                                                                 self.MAX_COLOURS)[:3]
+                                           for colour_idx in range(int(self.MAX_COLOURS))])
+            ObjKit._mtl_header_template = "# Wavefront MTL file converted from  '{src}'\n\n"
+            mtl_list = []
+            for colour_idx, diffuse_colour in enumerate(ObjKit._palette.tolist()):
+                colour_str = f"{diffuse_colour[0]:.3f} {diffuse_colour[1]:.3f} {diffuse_colour[2]:.3f}"
+                mtl_list.append(f"newmtl colouring-{colour_idx:03d}\n"
+                                f"Ka {colour_str}\n"
+                                f"Kd {colour_str}\n"
+                                "Ks 0.000 0.000 0.000\n"
+                                "d 1.0\n")
+            ObjKit._mtl_colour_list = mtl_list
+
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def __voxel_layout(vol_sz, step_sz, use_full_cubes):
+        ''' Finds the voxels to be written and which of their faces are visible,
+            results are cached and must not be modified
+
+        :param vol_sz: size of volume, (X,Y,Z) tuple of integers
+        :param step_sz: when stepping through the voxel block this is the step size
+        :param use_full_cubes: if true all faces of every sampled voxel are visible,
+                               else only the faces on the edges of the volume
+        :returns: x_idx, y_idx, z_idx, face_mask: numpy arrays of X, Y, Z indexes of voxels and
+            boolean array of visible faces, shape is (number of voxels, number of cube faces)
+        '''
+        # Sampled voxel indexes, in Z, Y, X order
+        z_idx, y_idx, x_idx = (idx_arr.ravel() for idx_arr in
+                               numpy.meshgrid(numpy.arange(0, vol_sz[2], step_sz),
+                                              numpy.arange(0, vol_sz[1], step_sz),
+                                              numpy.arange(0, vol_sz[0], step_sz), indexing='ij'))
+
+        # Create a full cube for each voxel
+        if use_full_cubes:
+            face_mask = numpy.ones((len(x_idx), len(ObjKit.CUBE_FACES)), dtype=bool)
+        # To save space, only create surfaces at the edges, assuming a block shape
+        else:
+            face_mask = numpy.column_stack((z_idx == 0,              # BOTTOM FACE
+                                            z_idx == vol_sz[2]-1,    # TOP FACE
+                                            y_idx == 0,              # SOUTH FACE
+                                            y_idx == vol_sz[1]-1,    # NORTH FACE
+                                            x_idx == 0,              # EAST FACE
+                                            x_idx == vol_sz[0]-1))   # WEST FACE
+            # Only write if there are indices to write, so interior voxels are dropped
+            # before any colours or coordinates are calculated
+            keep = face_mask.any(axis=1)
+            x_idx, y_idx, z_idx, face_mask = x_idx[keep], y_idx[keep], z_idx[keep], face_mask[keep]
+
+        for arr in (x_idx, y_idx, z_idx, face_mask):
+            arr.setflags(write=False)
+        return x_idx, y_idx, z_idx, face_mask
+
 
     def write_voxel_obj(self, geom_obj, out_fp, file_name, src_file_str, step_sz,
                         use_full_cubes=False):
-        ''' Writes out voxel data to Wavefront OBJ and MTL files
+        ''' Writes out voxel data to a Wavefront OBJ file, the MTL file is left to the caller
 
-        :param out_fp: open file handle of OBJ file
+        :param out_fp: open file handle of OBJ file, opened in binary mode
         :param geom_obj: MODEL_GEOMETRY object
         :param fileName: filename of OBJ file without the 'OBJ' extension
         :param src_file_str: filename of gocad file
         :param step_sz: when stepping through the voxel block this is the step size
         :param use_full_cubes: (optional, default to false) will write out full cubes to
                                  file if true, else will remove non-visible faces
+        :returns: list of MTL file materials used by the voxels, empty if no voxels are visible
         '''
         self.logger.debug("write_voxel_obj(%s,%s)", file_name, src_file_str)
-        mtl_fp = open(file_name+".MTL", 'w')
-        for colour_idx in range(int(self.MAX_COLOURS)):
-            diffuse_colour = make_false_colour_tup(float(colour_idx), 0.0, self.MAX_COLOURS)
-            mtl_fp.write("# Wavefront MTL file converted from  '{0}'\n\n".format(src_file_str))
-            mtl_fp.write("newmtl colouring-{0:03d}\n".format(colour_idx))
-            mtl_fp.write("Ka {0:.3f} {1:.3f} {2:.3f}\n".format(diffuse_colour[0], diffuse_colour[1],
-                                                               diffuse_colour[2]))
-            mtl_fp.write("Kd {0:.3f} {1:.3f} {2:.3f}\n".format(diffuse_colour[0], diffuse_colour[1],
-                                                               diffuse_colour[2]))
-            mtl_fp.write("Ks 0.000 0.000 0.000\n")
-            mtl_fp.write("d 1.0\n")
-        mtl_fp.close()
-        ct_done = True
-        out_fp.write("mtllib "+file_name+".MTL\n")
+        vol_sz = geom_obj.vol_sz
+        min_data = geom_obj.get_min_data()
+        max_data = geom_obj.get_max_data()
+
+        # The sampled voxels and their visible faces only depend on the volume's size and
+        # the export parameters, so they are reused for volumes of the same size
+        x_idx, y_idx, z_idx, face_mask = self.__voxel_layout(tuple(int(sz) for sz in vol_sz),
+                                                             step_sz, use_full_cubes)
+
+        colour_arr = (255.0*(numpy.asarray(geom_obj.vol_data)[x_idx, y_idx, z_idx] - min_data) \
+                      /(max_data - min_data)).astype(numpy.int64)
+        # Nothing is visible, so there is no need for a material file
+        if len(colour_arr) == 0:
+            return []
+
+        # Only the materials of the colours used by the voxels go in the MTL file
+        used_colours = numpy.unique(colour_arr)
+        used_colours = used_colours[(used_colours >= 0) & (used_colours < len(self._mtl_colour_list))]
+        mtl_list = [self._mtl_colour_list[colour_num] for colour_num in used_colours.tolist()]
+        out_fp.write(f"mtllib {file_name}.MTL\n".encode())
+
+        # Coordinates along each axis are calculated once, then looked up for each voxel
+        # NB: Assumes AXIS_MIN = 0, and AXIS_MAX = 1
+        axis_len = (abs(geom_obj.vol_axis_u[0]), abs(geom_obj.vol_axis_v[1]),
+                    abs(geom_obj.vol_axis_w[2]))
+        u_coords = geom_obj.vol_origin[0] + numpy.arange(0, vol_sz[0], step_sz)/vol_sz[0] * axis_len[0]
+        v_coords = geom_obj.vol_origin[1] + numpy.arange(0, vol_sz[1], step_sz)/vol_sz[1] * axis_len[1]
+        w_coords = geom_obj.vol_origin[2] + numpy.arange(0, vol_sz[2], step_sz)/vol_sz[2] * axis_len[2]
+        uvw_arr = numpy.column_stack((u_coords[x_idx // step_sz], v_coords[y_idx // step_sz],
+                                      w_coords[z_idx // step_sz]))
+        pt_size = numpy.array([step_sz*axis_len[0]/vol_sz[0]/2,
+                               step_sz*axis_len[1]/vol_sz[1]/2,
+                               step_sz*axis_len[2]/vol_sz[2]/2])
+        # Shape is (number of voxels, 8 cube corners, 3)
+        vert_arr = uvw_arr[:, None, :] + self.CUBE_CORNERS * pt_size
+
         vert_idx = 0
-        break_out = False
-        for z_val in range(0, geom_obj.vol_sz[2], step_sz):
-            for y_val in range(0, geom_obj.vol_sz[1], step_sz):
-                for x_val in range(0, geom_obj.vol_sz[0], step_sz):
-                    colour_num = int(255.0*(geom_obj.voxel_data[x_val][y_val][z_val] \
-                                           - geom_obj.voxel_data_stats['min']) \
-                                           /(geom_obj.voxel_data_stats['max'] \
-                                           - geom_obj.voxel_data_stats['min']))
-
-                    # NB: Assumes AXIS_MIN = 0, and AXIS_MAX = 1
-                    u_offset = geom_obj.vol_origin[0] + \
-                               float(x_val)/geom_obj.vol_sz[0]*abs(geom_obj.vol_axis_u[0])
-                    v_offset = geom_obj.vol_origin[1] + \
-                               float(y_val)/geom_obj.vol_sz[1]*abs(geom_obj.vol_axis_v[1])
-                    w_offset = geom_obj.vol_origin[2] + \
-                               float(z_val)/geom_obj.vol_sz[2]*abs(geom_obj.vol_axis_w[2])
-                    uvw = (u_offset, v_offset, w_offset)
-                    pt_size = (step_sz*abs(geom_obj.vol_axis_u[0])/geom_obj.vol_sz[0]/2,
-                               step_sz*abs(geom_obj.vol_axis_v[1])/geom_obj.vol_sz[1]/2,
-                               step_sz*abs(geom_obj.vol_axis_w[2])/geom_obj.vol_sz[2]/2)
-                    vert_list = [(uvw[0]-pt_size[0], uvw[1]-pt_size[1], uvw[2]+pt_size[2]),
-                                 (uvw[0]-pt_size[0], uvw[1]-pt_size[1], uvw[2]-pt_size[2]),
-                                 (uvw[0]-pt_size[0], uvw[1]+pt_size[1], uvw[2]-pt_size[2]),
-                                 (uvw[0]-pt_size[0], uvw[1]+pt_size[1], uvw[2]+pt_size[2]),
-                                 (uvw[0]+pt_size[0], uvw[1]-pt_size[1], uvw[2]+pt_size[2]),
-                                 (uvw[0]+pt_size[0], uvw[1]-pt_size[1], uvw[2]-pt_size[2]),
-                                 (uvw[0]+pt_size[0], uvw[1]+pt_size[1], uvw[2]-pt_size[2]),
-                                 (uvw[0]+pt_size[0], uvw[1]+pt_size[1], uvw[2]+pt_size[2]),
-                                ]
-                    indice_list = []
-
-                    # Create a full cube for each voxel
-                    if use_full_cubes:
-                        indice_list = [(4, 3, 2, 1), # WEST
-                                       (2, 6, 5, 1), # SOUTH
-                                       (3, 7, 6, 2), # BOTTOM
-                                       (8, 7, 3, 4), # NORTH
-                                       (5, 8, 4, 1), # TOP
-                                       (6, 7, 8, 5), # EAST
-                                      ]
-                    # To save space, only create surfaces at the edges, assuming a block shape
-                    else:
-                        # BOTTOM FACE
-                        if z_val == 0:
-                            indice_list.append((3, 7, 6, 2))
-                        # TOP FACE
-                        if z_val == geom_obj.vol_sz[2]-1:
-                            indice_list.append((5, 8, 4, 1))
-                        # SOUTH FACE
-                        if y_val == 0:
-                            indice_list.append((2, 6, 5, 1))
-                        # NORTH FACE
-                        if y_val == geom_obj.vol_sz[1]:
-                            indice_list.append((8, 7, 3, 4))
-                        # EAST FACE
-                        if x_val == 0:
-                            indice_list.append((6, 7, 8, 5))
-                        # WEST FACE
-                        if x_val == geom_obj.vol_sz[0]:
-                            indice_list.append((4, 3, 2, 1))
-
-                    # Only write if there are indices to write
-                    if indice_list:
-                        for vert in vert_list:
-                            out_fp.write("v {0:f} {1:f} {2:f}\n".format(vert[0], vert[1], vert[2]))
-                        out_fp.write("g main-{0:010d}\n".format(vert_idx))
-                        out_fp.write("usemtl colouring-{0:03d}\n".format(colour_num))
-                        for ind in indice_list:
-                            out_fp.write("f {0:d} {1:d} {2:d} {3:d}\n".format(ind[0]+vert_idx,
-                                                                              ind[1]+vert_idx,
-                                                                              ind[2]+vert_idx,
-                                                                              ind[3]+vert_idx))
-                        out_fp.write("\n")
-                        vert_idx += len(vert_list)
-                        if vert_idx > 99999999999:
-                            break_out = True
-                            break
-                if break_out:
-                    break
-            if break_out:
+        # Class attributes used in the voxel loop are copied to local variables once
+        cube_faces = self.CUBE_FACES
+        cube_vert_fmt = self.CUBE_VERT_FMT
+        corner_cnt = len(self.CUBE_CORNERS)
+        # Each voxel is written with one call, the file's buffer batches up the writes
+        for vert_floats, colour_num, face_list in zip(vert_arr.reshape(len(vert_arr), -1).tolist(),
+                                                      colour_arr.tolist(), face_mask.tolist()):
+            line_list = [b"g main-%010d" % vert_idx, b"usemtl colouring-%03d" % colour_num]
+            line_list.extend(b"f %d %d %d %d" % (ind[0]+vert_idx, ind[1]+vert_idx,
+                                                 ind[2]+vert_idx, ind[3]+vert_idx)
+                             for ind, is_face in zip(cube_faces, face_list) if is_face)
+            out_fp.write(cube_vert_fmt % tuple(vert_floats) + b"\n".join(line_list) + b"\n\n")
+            vert_idx += corner_cnt
+            if vert_idx > 99999999999:
                 break
-        return ct_done
+        return mtl_list
 
 
     def write_obj(self, geom_obj, style_obj, file_name, src_file_str):
@@ -166,52 +199,48 @@ class ObjKit(): # pragma: no cover (this class is not in use)
         '''
         self.logger.debug("write_obj(%s,%s)", file_name, src_file_str)
 
-        # Output to OBJ file
+        # Output to OBJ file, pre-encoded bytes are written through a large buffer
         print("Writing OBJ file: ", file_name+".OBJ")
-        out_fp = open(file_name+".OBJ", 'w')
-        out_fp.write("# Wavefront OBJ file converted from '{0}'\n\n".format(src_file_str))
-        ct_done = False
-        # This dictionary returns the insertion order of the vertex
-        # in the vrtx_arr given its sequence number
-        vert_dict = geom_obj.make_vertex_dict()
-        if geom_obj.is_trgl():
-            if len(style_obj.get_rgba_tup()) == 4:
-                out_fp.write("mtllib "+file_name+".MTL\n")
-        if geom_obj.is_trgl() or geom_obj.is_line() or geom_obj.is_point():
-            for vtx in geom_obj.vrtx_arr:
-                out_fp.write("v {0:f} {1:f} {2:f}\n".format(vtx.xyz[0], vtx.xyz[1], vtx.xyz[2]))
-        out_fp.write("g main\n")
-        if geom_obj.is_trgl():
-            out_fp.write("usemtl colouring\n")
-            for fac in geom_obj.trgl_arr:
-                out_fp.write("f {0:d} {1:d} {2:d}\n".format(vert_dict[fac.abc[0]],
-                                                            vert_dict[fac.abc[1]],
-                                                            vert_dict[fac.abc[2]]))
-
-        elif geom_obj.is_line():
-            for seg in geom_obj.seg_arr:
-                out_fp.write("l {0:d} {1:d}\n".format(vert_dict[seg.ab[0]], vert_dict[seg.ab[1]]))
-
-        elif geom_obj.is_point():
-            out_fp.write("p")
-            for pnt in range(len(geom_obj.vrtx_arr)):
-                out_fp.write(" {0:d}".format(pnt+1))
-            out_fp.write("\n")
-
-        elif geom_obj.is_volume():
-            ct_done = self.write_voxel_obj(out_fp, file_name, src_file_str, 64, False)
-        out_fp.close()
-
-        # Create an MTL file for the colour
         rgba_tup = style_obj.get_rgba_tup()
-        if len(rgba_tup) == 4 and not ct_done:
-            out_fp = open(file_name+".MTL", 'w')
-            out_fp.write("# Wavefront MTL file converted from  '{0}'\n\n".format(src_file_str))
-            out_fp.write("newmtl colouring\n")
-            out_fp.write("Ka {0:.3f} {1:.3f} {2:.3f}\n".format(rgba_tup[0], rgba_tup[1],
-                                                               rgba_tup[2]))
-            out_fp.write("Kd {0:.3f} {1:.3f} {2:.3f}\n".format(rgba_tup[0], rgba_tup[1],
-                                                               rgba_tup[2]))
-            out_fp.write("Ks 0.000 0.000 0.000\n")
-            out_fp.write("d 1.0\n")
-            out_fp.close()
+        mtl_list = []
+        if len(rgba_tup) == 4 and not geom_obj.is_volume():
+            mtl_list.append(f"newmtl colouring\n"
+                            f"Ka {rgba_tup[0]:.3f} {rgba_tup[1]:.3f} {rgba_tup[2]:.3f}\n"
+                            f"Kd {rgba_tup[0]:.3f} {rgba_tup[1]:.3f} {rgba_tup[2]:.3f}\n"
+                            "Ks 0.000 0.000 0.000\n"
+                            "d 1.0\n")
+        with open(file_name+".OBJ", 'wb', buffering=self.OBJ_BUFFER_SZ) as out_fp:
+            out_fp.write(f"# Wavefront OBJ file converted from '{src_file_str}'\n\n".encode())
+            # This dictionary returns the insertion order of the vertex
+            # in the vrtx_arr given its sequence number
+            vert_dict = geom_obj.make_vertex_dict()
+            if geom_obj.is_trgl():
+                if mtl_list:
+                    out_fp.write(f"mtllib {file_name}.MTL\n".encode())
+            if geom_obj.is_trgl() or geom_obj.is_line() or geom_obj.is_point():
+                out_fp.writelines([b"v %f %f %f\n" % tuple(xyz)
+                                   for xyz in geom_obj.vrtx_xyz_array.tolist()])
+            out_fp.write(b"g main\n")
+            if geom_obj.is_trgl():
+                out_fp.write(b"usemtl colouring\n")
+                out_fp.writelines([b"f %d %d %d\n" % (vert_dict[fac.abc[0]], vert_dict[fac.abc[1]],
+                                                      vert_dict[fac.abc[2]])
+                                   for fac in geom_obj.trgl_arr])
+
+            elif geom_obj.is_line():
+                out_fp.writelines([b"l %d %d\n" % (vert_dict[seg.ab[0]], vert_dict[seg.ab[1]])
+                                   for seg in geom_obj.seg_arr])
+
+            elif geom_obj.is_point():
+                out_fp.write(b"p" + b"".join(b" %d" % pnt
+                                             for pnt in range(1, len(geom_obj.vrtx_arr)+1))
+                             + b"\n")
+
+            elif geom_obj.is_volume():
+                mtl_list = self.write_voxel_obj(geom_obj, out_fp, file_name, src_file_str, 64, False)
+
+        # The MTL file is opened once, for either the single colour or the voxel colours
+        if mtl_list:
+            with open(file_name+".MTL", 'w') as mtl_fp:
+                mtl_fp.write(self._mtl_header_template.format(src=src_file_str))
+                mtl_fp.write("".join(mtl_list))
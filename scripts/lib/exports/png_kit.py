@@ -4,11 +4,11 @@ Contains PngKit class
 import os
 import sys
 import logging
-import array
-import PIL
+import PIL.Image
+import numpy as np
 
-from lib.db.style.false_colour import make_false_colour_tup
-from lib.exports.export_kit import ExportKit
+from lib.db.style.false_colour import make_false_colour_array
+from lib.exports.export_kit import ExportKit, run_jobs
 
 class PngKit(ExportKit):
     ''' Class used to output PNG files, given geometry, style and metadata data structures
@@ -23,6 +23,23 @@ class PngKit(ExportKit):
         ExportKit.__init__(self, debug_level)
 
 
+    def __make_colour_lut(self, colour_map):
+        ''' Converts a colour map to a pair of arrays: its sorted keys and their colours
+
+        :param colour_map: dict of colours, key is integer, value is (R,G,B,A) floats
+        :returns: numpy array of sorted keys and numpy array of [R,G,B,A] integers 0..255,
+                  one row for each key
+        '''
+        key_arr = np.array(sorted(colour_map.keys()), dtype=np.int64)
+        colour_arr = np.array([colour_map[key] for key in key_arr.tolist()], dtype=np.float64) * 255.0
+        # Bad values in colour map are given an invisible black colour
+        bad_mask = ~np.isfinite(colour_arr).all(axis=1)
+        if bad_mask.any():
+            self.logger.warning("Bad value in colour map, using RGBA=0,0,0,0 instead")
+            colour_arr[bad_mask] = 0.0
+        return key_arr, colour_arr.astype(np.uint8)
+
+
     def write_single_voxel_png(self, geom_obj, style_obj, meta_obj, file_name):
         ''' Writes out a PNG file of the top layer of the voxel data
 
@@ -32,22 +49,17 @@ class PngKit(ExportKit):
         :param file_name: filename of PNG file, without extension
         '''
         self.logger.debug(f"write_single_voxel_png({file_name})")
-        colour_arr = array.array("B")
         z_val = geom_obj.vol_sz[2] - 1
-        pixel_cnt = 0
         # Volume data are RGBA, data is stored in geom_obj's xyz_data
         if geom_obj.vol_data_type == 'RGBA':
             self.logger.debug("Using in-situ RGBA data")
             # Use False to get data using IJK int indexes
             xyz_data = geom_obj.get_loose_3d_data(is_xyz=False)
-            for x_val in range(0, geom_obj.vol_sz[0]):
-                for y_val in range(0, geom_obj.vol_sz[1]):
-                    try:
-                        pixel_colour = xyz_data.get((x_val, y_val, z_val), (0, 0, 0, 0))
-                    except ValueError:
-                        pixel_colour = (0, 0, 0, 0)
-                    colour_arr.fromlist(list(pixel_colour))
-                    pixel_cnt += 1
+            # Pixels are in (x, y) order, NB: RGBA values may be numpy structured scalars
+            pixel_arr = np.array([tuple(xyz_data.get((x_val, y_val, z_val), (0, 0, 0, 0)))
+                                  for x_val in range(0, geom_obj.vol_sz[0])
+                                  for y_val in range(0, geom_obj.vol_sz[1])],
+                                 dtype=np.uint8).reshape(-1, 4)
         # Volume data are floats, stored in geom_obj's vol_data
         else:  
             colour_map = style_obj.get_colour_table()
@@ -57,51 +69,38 @@ class PngKit(ExportKit):
             # If colour table is provided within source file, use it
             if colour_map:
                 self.logger.debug("Using style colour map")
-                for x_val in range(0, geom_obj.vol_sz[0]):
-                    for y_val in range(0, geom_obj.vol_sz[1]):
-                        try:
-                            val = int(geom_obj.vol_data[x_val][y_val][z_val])
-                            if val in colour_map:
-                                (r_val, g_val, b_val, a_val) = colour_map[val]
-                            else:
-                                # If key val not in map, try previous one in colour map
-                                less_arr = [k for k in list(colour_map.keys()) if k < val]
-                                if len(less_arr) > 0:
-                                    col_key = less_arr[-1]
-                                    (r_val, g_val, b_val, a_val) = colour_map[col_key]
-                                    self.logger.debug(f"Colour map missing value at {val}, using {col_key} instead")
-                                else:
-                                    # Use invisible black colour if no previous one exists
-                                    (r_val, g_val, b_val, a_val) = (0.0, 0.0, 0.0, 0.0)
-                                    self.logger.warning(f"Colour map missing value at {val}, using RGBA=0,0,0,0 instead")
-                            pixel_colour = [int(r_val * 255.0), int(g_val * 255.0), int(b_val * 255.0),
-                                            int(a_val * 255.0)]
-                        except ValueError:
-                            # Bad values in colour map ?
-                            pixel_colour = [0, 0, 0, 0]
-                            self.logger.warning("Bad value in colour map, using RGBA=0,0,0,0 instead")
-                        colour_arr.fromlist(pixel_colour)
-                        pixel_cnt += 1
+                # Pixels are in (x, y) order
+                layer_arr = np.asarray(geom_obj.vol_data[:, :, z_val]).ravel()
+                # Bad values are given an invisible black colour
+                bad_mask = np.isnan(layer_arr)
+                if bad_mask.any():
+                    self.logger.warning("Bad value in colour map, using RGBA=0,0,0,0 instead")
+                key_arr, colour_arr = self.__make_colour_lut(colour_map)
+                idx_arr = np.where(bad_mask, key_arr[0], layer_arr).astype(np.int64)
+                # Find the closest key at or below each value, values above the largest key
+                # are given the colour of the largest key
+                row_arr = np.searchsorted(key_arr, idx_arr, side='right') - 1
+                # Use invisible black colour if there is no previous key in the colour map
+                below_mask = row_arr < 0
+                if below_mask.any():
+                    self.logger.warning("Colour map missing values below its smallest key "
+                                        f"{key_arr[0]}, using RGBA=0,0,0,0 instead")
+                pixel_arr = colour_arr[np.maximum(row_arr, 0)]
+                pixel_arr[bad_mask | below_mask] = 0
             # Else use a false colour map
             else:
                 self.logger.debug("Using false colour map")
-                for x_val in range(0, geom_obj.vol_sz[0]):
-                    for y_val in range(0, geom_obj.vol_sz[1]):
-                        try:
-                            # pylint:disable=W0612
-                            (r_val, g_val, b_val, a_val) = make_false_colour_tup(
-                                geom_obj.vol_data[x_val][y_val][z_val],
-                                geom_obj.get_min_data(),
-                                geom_obj.get_max_data())
-                            pixel_colour = [int(r_val * 255.0), int(g_val * 255.0), int(b_val * 255.0),
-                                            int(a_val * 255.0)]
-                        except ValueError:
-                            pixel_colour = [0, 0, 0, 0]
-                        colour_arr.fromlist(pixel_colour)
-                        pixel_cnt += 1
-
-        img = PIL.Image.frombytes('RGBA', (geom_obj.vol_sz[1], geom_obj.vol_sz[0]),
-                                  colour_arr.tobytes())
+                # Colour the whole layer at once, pixels are in (x, y) order
+                float_arr = make_false_colour_array(geom_obj.vol_data[:, :, z_val].ravel(),
+                                                    geom_obj.get_min_data(),
+                                                    geom_obj.get_max_data()) * 255.0
+                # NaN values cannot be converted to integers, so these pixels are zeroed
+                float_arr[np.isnan(float_arr).any(axis=1)] = 0.0
+                pixel_arr = float_arr.astype(np.uint8)
+
+        # Image rows are X, columns are Y, the image shares the array's memory
+        img = PIL.Image.fromarray(np.ascontiguousarray(pixel_arr, dtype=np.uint8)
+                                  .reshape(geom_obj.vol_sz[0], geom_obj.vol_sz[1], 4))
         self.logger.info(f"Writing PNG file: {file_name}.PNG")
         try:
             img.save(file_name + ".PNG")
@@ -115,3 +114,24 @@ class PngKit(ExportKit):
             label_str = meta_obj.name
         popup_dict = {os.path.basename(file_name): {'title': label_str, 'name': label_str}}
         return popup_dict
+
+
+    def write_voxel_png_list(self, job_list):
+        ''' Writes out a PNG file for each of a list of volumes, e.g. the properties of a volume
+
+        :param job_list: list of (geom_obj, style_obj, meta_obj, file_name) tuples, parameters for
+                         'write_single_voxel_png()'
+        :returns: list of popup dicts, one for each volume, in the same order as 'job_list'
+        '''
+        return run_jobs(_write_single_voxel_png, self.logger.level, job_list,
+                        self.write_single_voxel_png)
+
+
+def _write_single_voxel_png(debug_level, job):
+    ''' Writes out one PNG file in a worker process
+
+    :param debug_level: debug level taken from python's 'logging' module
+    :param job: tuple of parameters for 'PngKit.write_single_voxel_png()'
+    :returns: popup dict
+    '''
+    return PngKit(debug_level).write_single_voxel_png(*job)
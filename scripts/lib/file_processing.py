@@ -11,6 +11,13 @@ from json import JSONDecodeError
 from types import SimpleNamespace
 import requests
 
+# If orjson (https://github.com/ijl/orjson) is installed, then it is used to parse JSON files faster
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Set up debugging
 LOGGER = logging.getLogger(__name__)
 
@@ -121,8 +128,14 @@ def read_json_file(file_name):
     :param file_name: file name of JSON file
     '''
     try:
-        with open(file_name, "r") as file_p:
-            json_dict = json.load(file_p)
+        # Read the whole file at once, then parse it
+        with open(file_name, "rb") as file_p:
+            json_bytes = file_p.read()
+        if HAS_ORJSON:
+            json_dict = orjson.loads(json_bytes)
+        else:
+            json_dict = json.loads(json_bytes)
+    # NB: 'orjson.JSONDecodeError' is a subclass of 'JSONDecodeError'
     except OSError as oe_exc:
         LOGGER.error(f"Cannot open JSON file {file_name}: {oe_exc}")
         sys.exit(1)
@@ -136,9 +149,5 @@ def is_only_small(gsm_list):
     :param gsm_list: list of (ModelGeometries, STYLE, METADATA) objects
     :returns: True if we think this is a small model that can fit in one collada file
     '''
-    small = True
-    for geom_obj, style_obj, meta_obj in gsm_list:
-        if not geom_obj.is_point() and not geom_obj.is_line():
-            small = False
-            break
-    return small
+    # Only the geometries are needed, stops at the first one that is not a point or line
+    return all(geom_obj.is_point() or geom_obj.is_line() for geom_obj, _, _ in gsm_list)
@@ -17,6 +17,15 @@ class GocadFileDataStrMap(FileDataStructMap):
     ''' Constant assigns possible headers to each filename extension
     '''
 
+    GOCAD_MARKERS = frozenset(headers[0] for headers in GOCAD_HEADERS.values())
+    ''' Set of headers that mark the start of a GOCAD object within a file,
+        the first header of each filename extension
+    '''
+
+    GROUP_HEADERS = frozenset(GOCAD_HEADERS['GP'])
+    ''' Set of headers of GOCAD group objects
+    '''
+
     def is_points(self, filename_str):
         ''' Routine to recognise a points file
 
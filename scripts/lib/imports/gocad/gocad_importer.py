@@ -11,14 +11,15 @@ import copy
 import numpy as np
 
 
-from lib.db.geometry.model_geometries import ModelGeometries
+from lib.db.geometry.model_geometries import ModelGeometries, grow_array
 from lib.imports.gocad.props import PROPS
 from lib.db.style.style import STYLE
-from lib.db.geometry.types import VRTX, ATOM, TRGL, SEG
+from lib.db.geometry.types import ATOM
 from lib.db.metadata.metadata import METADATA, MapFeat
 from lib.imports.gocad.gocad_filestr_types import GocadFileDataStrMap
 
-from .helpers import make_line_gen, check_vertex
+from .helpers import make_line_gen
+from .parsers import INF_FLOATS
 
 # Set up debugging
 LOCAL_LOGGER = logging.getLogger(__name__)
@@ -69,7 +70,7 @@ def extract_from_grp(src_dir, filename_str, file_lines, base_xyz, debug_lvl,
         if first_line:
             first_line = False
             # Check that this isn't trying to parse a group file
-            if file_ext.upper() != '.GP' or line_str not in GocadFileDataStrMap.GOCAD_HEADERS['GP']:
+            if file_ext.upper() != '.GP' or line_str not in GocadFileDataStrMap.GROUP_HEADERS:
                 LOCAL_LOGGER.error("SORRY - not a GOCAD GP file %s", repr(line_str))
                 LOCAL_LOGGER.error("    filename_str = %s", filename_str)
                 sys.exit(1)
@@ -99,7 +100,7 @@ def extract_from_grp(src_dir, filename_str, file_lines, base_xyz, debug_lvl,
             is_ok, gsm_list = gocad_obj.process_gocad(src_dir, filename_str, gocad_lines)
             if is_ok:
                 main_gsm_list += gsm_list
-                LOCAL_LOGGER.debug("gsm_list = %s", repr(gsm_list))
+                LOCAL_LOGGER.debug("gsm_list = %r", gsm_list)
             gocad_lines = []
 
         # If found a group header, then process it to fetch its colour defns etc.
@@ -122,18 +123,19 @@ def is_group_header(line_str):
         :param line_str: line string
         :returns: true iif line string is a GOCAD group header
     '''
-    return line_str.rstrip('\n\r ').upper() in GocadFileDataStrMap.GOCAD_HEADERS['GP']
+    return line_str.rstrip('\n\r ').upper() in GocadFileDataStrMap.GROUP_HEADERS
 
 
 class GocadImporter():
     ''' Class used to read GOCAD files and store their details
     '''
     from .parsers import parse_property_header, parse_props, parse_float
-    from .parsers import parse_int, parse_xyz, parse_colour, parse_axis_unit
+    from .parsers import parse_int, parse_xyz, flush_minmax, parse_colour, parse_axis_unit
     from .processors import process_coord_hdr, process_header, process_ascii_well_path
     from .processors import process_well_info, process_well_curve, process_prop_class_hdr, process_well_binary_file
     from .processors import process_vol_data
-    from .volumes import read_volume_binary_files, calc_vo_xyz, calc_sg_xyz, read_region_flags_file
+    from .volumes import read_volume_binary_files, calc_vo_xyz, calc_sg_xyz, calc_vo_minmax
+    from .volumes import calc_sg_minmax, read_region_flags_file
 
     SUPPORTED_EXTS = [
         'TS',
@@ -203,7 +205,7 @@ class GocadImporter():
         ''' A dictionary of files which contain colour tables
             key is GOCAD filename, val is CSV file
         '''
-        self.logger.debug("self.ct_file_dict = %s", repr(self.ct_file_dict))
+        self.logger.debug("self.ct_file_dict = %r", self.ct_file_dict)
 
         self.stop_on_exc = stop_on_exc
 
@@ -266,20 +268,58 @@ class GocadImporter():
         ''' Units of XYZ axes
         '''
 
-        self._vrtx_arr = []
-        ''' Array of named tuples 'VRTX' used to store vertex data
+        self._vrtx_n = np.empty(0, dtype=np.int64)
+        ''' Array of vertex sequence numbers, only the first '_vrtx_cnt' are in use
+        '''
+
+        self._vrtx_xyz = np.empty((0, 3), dtype=np.float64)
+        ''' Array of vertex (X,Y,Z) coordinates, only the first '_vrtx_cnt' rows are in use
+        '''
+
+        self._vrtx_cnt = 0
+        ''' Number of vertices stored in '_vrtx_n' and '_vrtx_xyz'
+        '''
+
+        self._vrtx_idx = {}
+        ''' Lookup table of vertex sequence number => position in '_vrtx_n' of the last vertex \
+            with this number, the first position is '1'
+        '''
+
+        self._vrtx_first_idx = {}
+        ''' Lookup table of vertex sequence number => position in '_vrtx_n' of the first vertex \
+            with this number, the first position is '1'
         '''
 
         self._atom_arr = []
         ''' Array of named tuples 'ATOM' used to store atom data
         '''
 
-        self._trgl_arr = []
-        ''' Array of named tuples 'TRGL' used store triangle face data
+        self._atom_idx = {}
+        ''' Lookup table of atom sequence number => position in '_vrtx_n' of the atom's vertex
+        '''
+
+        self._trgl_n = np.empty(0, dtype=np.int64)
+        ''' Array of triangle sequence numbers, only the first '_trgl_cnt' are in use
+        '''
+
+        self._trgl_abc = np.empty((0, 3), dtype=np.int64)
+        ''' Array of triangle vertex numbers, only the first '_trgl_cnt' rows are in use
+        '''
+
+        self._trgl_cnt = 0
+        ''' Number of triangles stored in '_trgl_n' and '_trgl_abc'
         '''
 
-        self._seg_arr = []
-        ''' Array of named tuples 'SEG' used to store line segment data
+        self._seg_ab = np.empty((0, 2), dtype=np.int64)
+        ''' Array of line segment vertex numbers, only the first '_seg_cnt' rows are in use
+        '''
+
+        self._seg_cnt = 0
+        ''' Number of line segments stored in '_seg_ab'
+        '''
+
+        self.minmax_buf = []
+        ''' (X,Y,Z) coordinates waiting for their min/max to be calculated, see 'flush_minmax()'
         '''
 
         self.axis_u = []
@@ -367,6 +407,11 @@ class GocadImporter():
         ''' Some voxet files have floats that are indexes to rock types
         '''
 
+        self._is_debug = False
+        ''' True iff debug messages are logged, checked before logging a debug message for
+            every line, set in 'process_gocad()'
+        '''
+
 
         self.geom_obj = ModelGeometries()
         self.style_obj = STYLE()
@@ -405,10 +450,11 @@ class GocadImporter():
     def __repr__(self):
         ''' A basic print friendly representation
         '''
+        # Only the instance's own fields are printed, not the class constants
         ret_str = ''
-        for field in dir(self):
-            if field[-2:] != '__' and not callable(getattr(self, field)):
-                ret_str += field + ": " + repr(getattr(self, field))[:200] + "\n"
+        for field, val in self.__dict__.items():
+            if field[-2:] != '__' and not callable(val):
+                ret_str += field + ": " + repr(val)[:200] + "\n"
         return ret_str
 
 
@@ -418,18 +464,253 @@ class GocadImporter():
             array, but some GOCAD files have missing vertices etc.
             The first element starts at '1'
         '''
-        vert_dict = {}
-        # Assign vertices to dict
-        for idx, vrtx in enumerate(self._vrtx_arr, 1):
-            vert_dict[vrtx.n] = idx
+        # Atoms take precedence over vertices with the same sequence number
+        return {**self._vrtx_idx, **self._atom_idx}
 
-        # Assign atoms to dict
-        for atom in self._atom_arr:
-            for idx, vert in enumerate(self._vrtx_arr, 1):
-                if vert.n == atom.v:
-                    vert_dict[atom.n] = idx
-                    break
-        return vert_dict
+
+    def __add_vrtx(self, seq_no, xyz):
+        ''' Adds a vertex to the vertex array and updates the vertex lookup tables
+
+        :param seq_no: vertex sequence number
+        :param xyz: (X,Y,Z) tuple of floats
+        '''
+        self._vrtx_n = grow_array(self._vrtx_n, self._vrtx_cnt)
+        self._vrtx_xyz = grow_array(self._vrtx_xyz, self._vrtx_cnt)
+        self._vrtx_n[self._vrtx_cnt] = seq_no
+        self._vrtx_xyz[self._vrtx_cnt] = xyz
+        self._vrtx_cnt += 1
+        idx = self._vrtx_cnt
+        self._vrtx_idx[seq_no] = idx
+        self._vrtx_first_idx.setdefault(seq_no, idx)
+
+
+    def __add_trgl(self, seq_no, abc):
+        ''' Adds a triangle to the triangle arrays, the arrays are doubled in size when full
+
+        :param seq_no: triangle sequence number
+        :param abc: tuple of the vertex numbers of the triangle's corners
+        '''
+        self._trgl_n = grow_array(self._trgl_n, self._trgl_cnt)
+        self._trgl_abc = grow_array(self._trgl_abc, self._trgl_cnt)
+        self._trgl_n[self._trgl_cnt] = seq_no
+        self._trgl_abc[self._trgl_cnt] = abc
+        self._trgl_cnt += 1
+
+
+    def __add_seg(self, a_vrtx, b_vrtx):
+        ''' Adds a line segment to the segment array, the array is doubled in size when full
+
+        :param a_vrtx, b_vrtx: vertex numbers of the segment's ends
+        '''
+        self._seg_ab = grow_array(self._seg_ab, self._seg_cnt)
+        self._seg_ab[self._seg_cnt] = (a_vrtx, b_vrtx)
+        self._seg_cnt += 1
+
+
+    @staticmethod
+    def __gather_lines(line_gen, field, field_raw, line_str, is_last):
+        ''' Reads lines until one does not start with the same keyword as 'field'
+
+        :param line_gen: line generator, see 'make_line_gen()'
+        :param field, field_raw, line_str, is_last: values from the first line in the run
+        :returns: list of the field arrays in the run, then the field, field_raw, line_str and
+                  is_last values of the line after the run, and True if that line still needs
+                  to be processed
+        '''
+        field_list = [field]
+        if is_last:
+            return field_list, field, field_raw, line_str, is_last, False
+        while True:
+            next_field, field_raw, line_str, is_last = next(line_gen)
+            # End of file
+            if not next_field:
+                return field_list, next_field, field_raw, line_str, is_last, False
+            if next_field[0] != field[0]:
+                return field_list, next_field, field_raw, line_str, is_last, True
+            field_list.append(next_field)
+            if is_last:
+                return field_list, next_field, field_raw, line_str, is_last, False
+
+
+    def __add_vrtx_lines(self, field_list):
+        ''' Adds the vertices from a run of VRTX lines
+            Normally all the coordinates are converted and scaled together, if any line contains
+            an unusual value e.g. GOCAD's infinity, the lines are parsed one at a time instead
+
+        :param field_list: list of arrays of field strings, one for each VRTX line
+        '''
+        try:
+            if any(len(field) < 5 or not INF_FLOATS.keys().isdisjoint(field[2:5]) for field in field_list):
+                raise ValueError("VRTX lines must be parsed one at a time")
+            vrtx_cnt = len(field_list)
+            seq_list = [int(field[1]) for field in field_list]
+            xyz_arr = np.fromiter((float(fp_str) for field in field_list for fp_str in field[2:5]),
+                                  dtype=np.float64, count=3 * vrtx_cnt).reshape(-1, 3)
+        except (OverflowError, ValueError):
+            for field in field_list:
+                try:
+                    self.__add_vrtx_line(field)
+                except IndexError as exc:
+                    self.handle_exc(exc)
+            return
+
+        # Same calculation as 'parse_xyz()', for all vertices at once
+        np.multiply(xyz_arr, self.xyz_mult, out=xyz_arr)
+        self.geom_obj.calc_minmax_batch(xyz_arr)
+        xyz_arr += self.base_xyz
+
+        end_cnt = self._vrtx_cnt + vrtx_cnt
+        self._vrtx_n = grow_array(self._vrtx_n, self._vrtx_cnt, vrtx_cnt)
+        self._vrtx_xyz = grow_array(self._vrtx_xyz, self._vrtx_cnt, vrtx_cnt)
+        self._vrtx_n[self._vrtx_cnt:end_cnt] = seq_list
+        self._vrtx_xyz[self._vrtx_cnt:end_cnt] = xyz_arr
+        for idx, seq_no in enumerate(seq_list, self._vrtx_cnt + 1):
+            self._vrtx_idx[seq_no] = idx
+            self._vrtx_first_idx.setdefault(seq_no, idx)
+        self._vrtx_cnt += vrtx_cnt
+
+
+    def __add_vrtx_line(self, field):
+        ''' Parses a single VRTX or PVRTX line and adds its vertex
+            NB: If the z-axis is inverted, it is inverted after all the lines are processed
+
+        :param field: array of field strings
+        :returns: (X,Y,Z) tuple of the vertex or None if the line could not be parsed
+        '''
+        is_ok_s, seq_no = self.parse_int(field[1])
+        is_ok, x_flt, y_flt, z_flt = self.parse_xyz(True, field[2], field[3], field[4], True)
+        if self._is_debug:
+            self.logger.debug("ParseXYZ %r %s %s %s from %s %s %s", is_ok,
+                              x_flt, y_flt, z_flt, field[2], field[3], field[4])
+        if not is_ok_s or not is_ok:
+            return None
+        self.__add_vrtx(seq_no, (x_flt, y_flt, z_flt))
+        return x_flt, y_flt, z_flt
+
+
+    def __process_pvrtx(self, field, line_str):
+        ''' Processes a PVRTX line, a vertex with attached properties
+
+        :param field: array of field strings
+        :param line_str: line string
+        '''
+        xyz = self.__add_vrtx_line(field)
+        if xyz is not None:
+            self.parse_props(field, self.__final_xyz(xyz))
+
+
+    def __process_atom(self, field, line_str):
+        ''' Processes an ATOM or PATOM line, an atom refers to an existing vertex
+
+        :param field: array of field strings
+        :param line_str: line string
+        '''
+        is_ok_s, seq_no = self.parse_int(field[1])
+        is_ok, v_num = self.parse_int(field[2])
+        if not is_ok_s or not is_ok:
+            return
+        if v_num in self._vrtx_first_idx:
+            self._atom_arr.append(ATOM(seq_no, v_num))
+            # An atom uses the first vertex with its vertex number
+            self._atom_idx[seq_no] = self._vrtx_first_idx[v_num]
+        else:
+            self.logger.error("ATOM refers to VERTEX that has not been defined yet")
+            self.logger.error("    seq_no = %d", seq_no)
+            self.logger.error("    v_num = %d", v_num)
+            self.logger.error("    line = %s", line_str)
+            sys.exit(1)
+
+        # Atoms with attached properties
+        if field[0] == "PATOM":
+            # Same lookup as '__make_vertex_dict()', without making the whole dict
+            vert_idx = self._atom_idx.get(v_num, self._vrtx_idx.get(v_num))
+            self.parse_props(field, self.__final_xyz(self._vrtx_xyz[vert_idx - 1].tolist()), True)
+
+
+    def __final_xyz(self, xyz):
+        ''' Properties are stored using their vertex's final coordinates, but the z-axis of the
+            vertices is not inverted until all the lines are processed
+
+        :param xyz: (X,Y,Z) coordinates of a vertex as it is stored while processing lines
+        :returns: (X,Y,Z) tuple, with the z-axis inverted if required
+        '''
+        if self.invert_zaxis:
+            return xyz[0], xyz[1], -xyz[2]
+        return tuple(xyz)
+
+
+    def __process_seg(self, field, line_str):
+        ''' Processes a SEG line, a line segment between two vertices
+
+        :param field: array of field strings
+        :param line_str: line string
+        '''
+        is_ok_a, a_int = self.parse_int(field[1])
+        is_ok_b, b_int = self.parse_int(field[2])
+        if is_ok_a and is_ok_b:
+            self.__add_seg(a_int, b_int)
+
+
+    LINE_HANDLERS = {'ATOM': __process_atom, 'PATOM': __process_atom,
+                     'PVRTX': __process_pvrtx, 'SEG': __process_seg}
+    ''' Lookup table of GOCAD keyword => method that processes a line starting with the keyword
+    '''
+
+
+    def __add_trgl_lines(self, field_list):
+        ''' Adds the triangles from a run of TRGL lines
+            If any line cannot be converted, the lines are parsed one at a time instead
+
+        :param field_list: list of arrays of field strings, one for each TRGL line
+        '''
+        try:
+            # NB: The triangle's sequence number is its first vertex number
+            abc_list = [(int(field[1]), int(field[2]), int(field[3])) for field in field_list]
+            abc_arr = np.array(abc_list, dtype=np.int64).reshape(-1, 3)
+        except (IndexError, OverflowError, ValueError):
+            for field in field_list:
+                try:
+                    is_ok_s, seq_no = self.parse_int(field[1])
+                    is_ok, a_int, b_int, c_int = self.parse_xyz(False, field[1], field[2],
+                                                                field[3], False, False)
+                    if is_ok and is_ok_s:
+                        self.__add_trgl(seq_no, (a_int, b_int, c_int))
+                except IndexError as exc:
+                    self.handle_exc(exc)
+            return
+
+        trgl_cnt = len(abc_arr)
+        end_cnt = self._trgl_cnt + trgl_cnt
+        self._trgl_n = grow_array(self._trgl_n, self._trgl_cnt, trgl_cnt)
+        self._trgl_abc = grow_array(self._trgl_abc, self._trgl_cnt, trgl_cnt)
+        self._trgl_n[self._trgl_cnt:end_cnt] = abc_arr[:, 0]
+        self._trgl_abc[self._trgl_cnt:end_cnt] = abc_arr
+        self._trgl_cnt = end_cnt
+
+
+    @staticmethod
+    def __renumber(vert_dict, num_arr):
+        ''' Looks up an array of vertex sequence numbers in the vertex dictionary
+
+        :param vert_dict: vertex dictionary, see '__make_vertex_dict()'
+        :param num_arr: numpy array of vertex sequence numbers
+        :returns: numpy array of new vertex numbers, same shape as 'num_arr'
+        '''
+        if num_arr.size == 0:
+            return num_arr.copy()
+        key_arr = np.fromiter(vert_dict.keys(), dtype=np.int64, count=len(vert_dict))
+        val_arr = np.fromiter(vert_dict.values(), dtype=np.int64, count=len(vert_dict))
+        sort_idx = np.argsort(key_arr)
+        key_arr = np.append(key_arr[sort_idx], 0)
+        val_arr = val_arr[sort_idx]
+        # NB: An extra key is appended so that numbers past the largest key can be checked
+        pos_arr = np.searchsorted(key_arr[:-1], num_arr)
+        missing = key_arr[pos_arr] != num_arr
+        missing |= pos_arr == len(val_arr)
+        # Same error as a dict lookup
+        if missing.any():
+            raise KeyError(int(num_arr[missing][0]))
+        return val_arr[pos_arr]
 
 
     def process_gocad(self, src_dir, filename_str, file_lines):
@@ -444,10 +725,7 @@ class GocadImporter():
         ret_val = True
 
         debug_lvl = self.logger.getEffectiveLevel()
-
-        # For keeping track of the ID of VRTX, ATOM, PVRTX, SEG etc.
-        seq_no = 0
-        seq_no_prev = -1
+        self._is_debug = self.logger.isEnabledFor(logging.DEBUG)
 
         file_name, file_ext = os.path.splitext(filename_str)
         self.np_filename = os.path.basename(file_name)
@@ -463,27 +741,41 @@ class GocadImporter():
         is_last = False
         # Retry flag forces parsing of the field array without asking for the next line
         retry = False
+        # Set when the last line was read ahead and is waiting to be processed
+        stop_after_retry = False
         while not is_last:
             if not retry:
+                if stop_after_retry:
+                    break
                 field, field_raw, line_str, is_last = next(line_gen)
             retry = False
             if is_last and not field:
                 break
 
-            self.logger.debug(f"field = {field} field_raw={field_raw} line_str = {line_str} is_last = {is_last}") 
+            if self._is_debug:
+                self.logger.debug("field = %s field_raw=%s line_str = %s is_last = %s",
+                                  field, field_raw, line_str, is_last)
             # Skip the subsets keywords
             if field[0] in ["SUBVSET", "ILINE", "TFACE", "TVOLUME"]:
-                self.logger.debug("Skip subset keywords")
+                if self._is_debug:
+                    self.logger.debug("Skip subset keywords")
                 continue
 
             # Skip control nodes (used to denote fixed points in GOCAD)
             if field[0] == "CNP":
-                self.logger.debug("Skip control nodes")
+                if self._is_debug:
+                    self.logger.debug("Skip control nodes")
                 continue
 
             try:
+                # Geometry lines are the most common, so they are looked up first
+                # NB: Well files handle these keywords separately
+                line_handler = self.LINE_HANDLERS.get(field[0])
+                if line_handler is not None and not self._is_wl:
+                    line_handler(self, field, line_str)
+
                 # Are we in the main header?
-                if field[0] == "HEADER":
+                elif field[0] == "HEADER":
                     self.logger.debug("Processing header")
                     is_last = self.process_header(line_gen)
 
@@ -546,10 +838,10 @@ class GocadImporter():
 
                         # Convert well path into a series of SEG types
                         if len(well_path) > 1:
-                            self._vrtx_arr.append(VRTX(1, well_path[0]))
+                            self.__add_vrtx(1, well_path[0])
                             for idx in range(1, len(well_path)):
-                                self._seg_arr.append(SEG((idx, idx + 1)))
-                                self._vrtx_arr.append(VRTX(idx + 1, well_path[idx]))
+                                self.__add_seg(idx, idx + 1)
+                                self.__add_vrtx(idx + 1, well_path[idx])
                              
                         self.logger.debug(f"Well path: {well_path}")
                         self.logger.debug(f"Label list: {self.meta_obj.label_list}")
@@ -575,68 +867,18 @@ class GocadImporter():
                         self.well_wp_file_data = self.process_well_binary_file(bin_file)
                         self.logger.debug(f"p_flts={self.well_wp_file_data[:40]}")
 
-                # Atoms, with or without properties
-                elif field[0] == "ATOM" or field[0] == 'PATOM':
-                    seq_no_prev = seq_no
-                    is_ok_s, seq_no = self.parse_int(field[1])
-                    is_ok, v_num = self.parse_int(field[2])
-                    if not is_ok_s or not is_ok:
-                        seq_no = seq_no_prev
+                # Runs of vertices without properties and runs of triangles are converted in one go
+                elif field[0] in ("VRTX", "TRGL"):
+                    field_list, field, field_raw, line_str, is_last, retry = \
+                        self.__gather_lines(line_gen, field, field_raw, line_str,
+                                            is_last or stop_after_retry)
+                    if field_list[0][0] == "VRTX":
+                        self.__add_vrtx_lines(field_list)
                     else:
-                        if check_vertex(v_num, self._vrtx_arr):
-                            self._atom_arr.append(ATOM(seq_no, v_num))
-                        else:
-                            self.logger.error("ATOM refers to VERTEX that has not been defined yet")
-                            self.logger.error("    seq_no = %d", seq_no)
-                            self.logger.error("    v_num = %d", v_num)
-                            self.logger.error("    line = %s", line_str)
-                            sys.exit(1)
-
-                        # Atoms with attached properties
-                        if field[0] == "PATOM":
-                            vert_dict = self.__make_vertex_dict()
-                            self.parse_props(field, self._vrtx_arr[vert_dict[v_num] - 1].xyz,
-                                             True)
-
-                # Grab the vertices and properties, does not care if there are
-                # gaps in the sequence number
-                elif field[0] == "PVRTX" or  field[0] == "VRTX":
-                    seq_no_prev = seq_no
-                    is_ok_s, seq_no = self.parse_int(field[1])
-                    is_ok, x_flt, y_flt, z_flt = self.parse_xyz(True, field[2], field[3],
-                                                                field[4], True)
-                    self.logger.debug("ParseXYZ %s %f %f %f from %s %s %s", repr(is_ok),
-                                      x_flt, y_flt, z_flt,
-                                      field[2], field[3], field[4])
-                    if not is_ok_s or not is_ok:
-                        seq_no = seq_no_prev
-                    else:
-                        # Add vertex
-                        if self.invert_zaxis:
-                            z_flt = -1.0 * z_flt
-                        self._vrtx_arr.append(VRTX(seq_no, (x_flt, y_flt, z_flt)))
-
-                        # Vertices with attached properties
-                        if field[0] == "PVRTX":
-                            self.parse_props(field, (x_flt, y_flt, z_flt))
-
-                # Grab the triangular edges
-                elif field[0] == "TRGL":
-                    seq_no_prev = seq_no
-                    is_ok_s, seq_no = self.parse_int(field[1])
-                    is_ok, a_int, b_int, c_int = self.parse_xyz(False, field[1], field[2],
-                                                                field[3], False, False)
-                    if not is_ok or not is_ok_s:
-                        seq_no = seq_no_prev
-                    else:
-                        self._trgl_arr.append(TRGL(seq_no, (a_int, b_int, c_int)))
-
-                # Grab the segments
-                elif field[0] == "SEG":
-                    is_ok_a, a_int = self.parse_int(field[1])
-                    is_ok_b, b_int = self.parse_int(field[2])
-                    if is_ok_a and is_ok_b:
-                        self._seg_arr.append(SEG((a_int, b_int)))
+                        self.__add_trgl_lines(field_list)
+                    # If the line after the run is the last line, stop after processing it
+                    if retry and is_last:
+                        is_last, stop_after_retry = False, True
 
                 # Grab metadata - see 'metadata.py' for more info
                 elif field[0] in ("STRATIGRAPHIC_POSITION", "GEOLOGICAL_FEATURE"):
@@ -762,6 +1004,14 @@ class GocadImporter():
 
             # END OF TEXT PROCESSING LOOP
 
+        # Calculate min/max of the coordinates
+        self.flush_minmax()
+
+        # Invert the z-axis of all the vertices at once
+        # NB: Well path vertices are not inverted, they are not parsed from VRTX or PVRTX lines
+        if self.invert_zaxis and not self._is_wl:
+            self._vrtx_xyz[:self._vrtx_cnt, 2] *= -1.0
+
 
         # Read in any binary data files and flags files attached to voxel files
         if self._is_vo or self._is_sg:
@@ -797,7 +1047,7 @@ class GocadImporter():
 
         # Complete initialisation of metadata object
 
-        self.logger.debug(f"process_gocad() returns {ret_val} {self.gsm_list}")
+        self.logger.debug("process_gocad() returns %s %s", ret_val, self.gsm_list)
         return ret_val, self.gsm_list
 
 
@@ -884,19 +1134,15 @@ class GocadImporter():
             geom_obj.line_width = self.WELL_LINE_WIDTH
 
         # Re-enumerate all geometries, because some GOCAD files have missing vertex numbers
+        # The vertex, triangle and segment arrays are renumbered and copied in bulk
         vert_dict = self.__make_vertex_dict()
-        for v_old in self._vrtx_arr:
-            vrtx = VRTX(vert_dict[v_old.n], v_old.xyz)
-            geom_obj.vrtx_arr.append(vrtx)
-
-        for t_old in self._trgl_arr:
-            tri = TRGL(t_old.n, (vert_dict[t_old.abc[0]], vert_dict[t_old.abc[1]],
-                                 vert_dict[t_old.abc[2]]))
-            geom_obj.trgl_arr.append(tri)
-
-        for s_old in self._seg_arr:
-            sgm = SEG((vert_dict[s_old.ab[0]], vert_dict[s_old.ab[1]]))
-            geom_obj.seg_arr.append(sgm)
+        geom_obj.add_vrtx_array(self.__renumber(vert_dict, self._vrtx_n[:self._vrtx_cnt]),
+                                self._vrtx_xyz[:self._vrtx_cnt])
+
+        geom_obj.add_trgl_array(self._trgl_n[:self._trgl_cnt],
+                                self.__renumber(vert_dict, self._trgl_abc[:self._trgl_cnt]))
+
+        geom_obj.add_seg_array(self.__renumber(vert_dict, self._seg_ab[:self._seg_cnt]))
 
         for a_old in self._atom_arr:
             atm = ATOM(vert_dict[a_old.n], vert_dict[a_old.v])
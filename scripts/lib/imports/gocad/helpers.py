@@ -2,6 +2,7 @@
 A collection GOCAD helper functions
 """
 import logging
+import re
 import sys
 
 from lib.imports.gocad.gocad_filestr_types import GocadFileDataStrMap
@@ -25,20 +26,20 @@ LOCAL_LOGGER.addHandler(LOCAL_HANDLER)
 def split_gocad_objs(filename_lines):
     ''' Separates joined GOCAD entries within a file
 
-    :param filename_lines: lines from concatenated GOCAD file
+    :param filename_lines: lines from concatenated GOCAD file, any iterable of strings
+                           e.g. an open file, so that the whole file need not be read into memory
+    :returns: list of GOCAD objects, each a list of strings taken from file's lines
     '''
-    gocad_headers = GocadFileDataStrMap.GOCAD_HEADERS
+    gocad_markers = GocadFileDataStrMap.GOCAD_MARKERS
     file_lines_list = []
     part_list = []
     in_file = False
     for line in filename_lines:
         line_str = line.rstrip(' \n\r').upper()
         if not in_file:
-            for marker in gocad_headers.values():
-                if line_str == marker[0]:
-                    in_file = True
-                    part_list.append(line)
-                    break
+            if line_str in gocad_markers:
+                in_file = True
+                part_list.append(line)
         elif in_file:
             part_list.append(line)
             if line_str == 'END':
@@ -48,16 +49,19 @@ def split_gocad_objs(filename_lines):
                 part_list = []
     return file_lines_list
 
-def check_vertex(num, vrtx_arr):
-    ''' If vertex exists in vertex array then returns True else False
+QUOTED_LABEL_RE = re.compile(r'"([^"]*)"')
+''' Regular expression that matches a double-quoted label, quotes are paired from left to right
+'''
+
 
-    :param num: vertex number to search for
-    :param vrtx_arr: vertex array
+def _underscore_label(match):
+    ''' Replaces a double-quoted label with the label surrounded by spaces,
+        with its own spaces replaced by underscores
+
+    :param match: regular expression match object for 'QUOTED_LABEL_RE'
+    :returns: replacement string
     '''
-    for vrtx in vrtx_arr:
-        if vrtx.n == num:
-            return True
-    return False
+    return " " + match.group(1).strip(' ').replace(' ', '_') + " "
 
 
 def _parse_quoted_labels(line_str):
@@ -67,12 +71,10 @@ def _parse_quoted_labels(line_str):
     :reurns: all double-quoted labels with spaces now have double quotes removed and underscores
              substituted for labels
     '''
-    while line_str.count('"') >= 2:
-        before_tup = line_str.partition('"')
-        after_tup = before_tup[2].partition('"')
-        line_str = before_tup[0] + " " + after_tup[0].strip(' ').replace(' ', '_') \
-                   + " " + after_tup[2]
-    return line_str
+    # Most lines have no labels
+    if '"' not in line_str:
+        return line_str
+    return QUOTED_LABEL_RE.sub(_underscore_label, line_str)
 
 
 def _parse_quoted_filename(line):
@@ -83,9 +85,8 @@ def _parse_quoted_filename(line):
     '''
     if line.count('"') < 2:
         return line.split()
-    if line.count('"') >= 2:
-        before_tup = line.partition('"')
-        after_tup = before_tup[2].partition('"')
+    before_tup = line.partition('"')
+    after_tup = before_tup[2].partition('"')
     return before_tup[0].split() + [after_tup[0]] + after_tup[2].split()
 
 
@@ -100,18 +101,20 @@ def make_line_gen(file_lines):
              line of GOCAD file in upper case,
              boolean, True iff it is the last line of the file
     '''
-    for line in file_lines:
-        line_str = line.rstrip(' \n\r').upper()
+    last_idx = len(file_lines) - 1
+    for line_idx, line in enumerate(file_lines):
+        # Strip the line once, it is used for both the upper case and original case fields
+        stripped_str = line.rstrip(' \n\r')
 
         # Split up the string, substituting underscores for spaces in doubled quoted labels
-        line_str = _parse_quoted_labels(line_str)
+        line_str = _parse_quoted_labels(stripped_str.upper())
         splitstr_arr = line_str.split()
 
-        # Split up the string, correctly parsing quoted filename
-        splitstr_arr_raw = _parse_quoted_filename(line.rstrip(' \n\r'))
-
         # Skip blank lines
         if not splitstr_arr:
             continue
-        yield splitstr_arr, splitstr_arr_raw, line_str, line == file_lines[-1:][0]
+
+        # Split up the string, correctly parsing quoted filename
+        splitstr_arr_raw = _parse_quoted_filename(stripped_str)
+        yield splitstr_arr, splitstr_arr_raw, line_str, line_idx == last_idx
     yield [], [], '', True
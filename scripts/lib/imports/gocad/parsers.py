@@ -4,6 +4,12 @@ Functions that process fields in a single line of a GOCAD file
 
 
 import sys
+import numpy as np
+
+INF_FLOATS = {"1.#INF": sys.float_info.max, "INF": sys.float_info.max,
+              "-1.#INF": -sys.float_info.max, "-INF": -sys.float_info.max}
+''' GOCAD's C++ floating point infinity strings for Windows and Linux => float value
+'''
 
 def parse_property_header(self, prop_obj, line_str):
     ''' Parses the PROPERTY header, extracting the colour table info
@@ -69,7 +75,8 @@ def parse_props(self, field, coord_tup, is_patom=False):
             converted, fltp = self.parse_float(fp_str, prop_obj.no_data_marker)
             if converted:
                 prop_obj.assign_to_xyz(coord_tup, fltp)
-                self.logger.debug("prop_obj.data_xyz[%s] = %f", repr(coord_tup), fltp)
+                if self._is_debug:
+                    self.logger.debug("prop_obj.data_xyz[%r] = %f", coord_tup, fltp)
             col_idx += 1
         # Property has 3 floats i.e. XYZ
         elif prop_obj.data_sz == 3:
@@ -85,8 +92,9 @@ def parse_props(self, field, coord_tup, is_patom=False):
             converted_z, fp_z = self.parse_float(fp_str_z, prop_obj.no_data_marker)
             if converted_z and converted_y and converted_x:
                 prop_obj.assign_to_xyz(coord_tup, (fp_x, fp_y, fp_z))
-                self.logger.debug("prop_obj.data_xyz[%s] = (%f,%f,%f)",
-                                  repr(coord_tup), fp_x, fp_y, fp_z)
+                if self._is_debug:
+                    self.logger.debug("prop_obj.data_xyz[%r] = (%f,%f,%f)",
+                                      coord_tup, fp_x, fp_y, fp_z)
             col_idx += 3
         else:
             self.logger.error("Cannot process property size of != 3 and !=1: %d %s",
@@ -104,11 +112,8 @@ def parse_float(self, fp_str, null_val=None):
         else if 'null_val' is defined return (False, null_val)
     '''
     # Handle GOCAD's C++ floating point infinity for Windows and Linux
-    if fp_str in ["1.#INF", "INF"]:
-        fltp = sys.float_info.max
-    elif fp_str in ["-1.#INF", "-INF"]:
-        fltp = -sys.float_info.max
-    else:
+    fltp = INF_FLOATS.get(fp_str)
+    if fltp is None:
         try:
             fltp = float(fp_str)
             if null_val is not None and fltp == null_val:
@@ -141,7 +146,8 @@ def parse_xyz(self, is_float, x_str, y_str, z_str, do_minmax=False, convert=True
 
     :param is_float: if true parse x y z as floats else try integers
     :param x_str, y_str, z_str: X,Y,Z coordinates in string form
-    :param do_minmax: calculate min/max of the X,Y,Z coords
+    :param do_minmax: calculate min/max of the X,Y,Z coords, the coords are saved and the \
+                      calculation is done later by 'flush_minmax()'
     :param convert: convert from kms to metres if necessary
     :returns: returns tuple of four parameters: success - true if could convert
         the strings to floats/ints
@@ -149,11 +155,19 @@ def parse_xyz(self, is_float, x_str, y_str, z_str, do_minmax=False, convert=True
     '''
     x_val = y_val = z_val = None
     if is_float:
-        converted1, x_val = self.parse_float(x_str)
-        converted2, y_val = self.parse_float(y_str)
-        converted3, z_val = self.parse_float(z_str)
-        if not converted1 or not converted2 or not converted3:
-            return False, None, None, None
+        # Usually all three are ordinary numbers and can be converted together
+        if x_str not in INF_FLOATS and y_str not in INF_FLOATS and z_str not in INF_FLOATS:
+            try:
+                x_val, y_val, z_val = float(x_str), float(y_str), float(z_str)
+            except ValueError:
+                x_val = None
+        # Otherwise convert them one at a time, handling infinite values and errors
+        if x_val is None:
+            converted1, x_val = self.parse_float(x_str)
+            converted2, y_val = self.parse_float(y_str)
+            converted3, z_val = self.parse_float(z_str)
+            if not converted1 or not converted2 or not converted3:
+                return False, None, None, None
     else:
         try:
             x_val = int(x_str)
@@ -171,7 +185,7 @@ def parse_xyz(self, is_float, x_str, y_str, z_str, do_minmax=False, convert=True
 
     # Calculate and store minimum and maximum XYZ
     if do_minmax:
-        self.geom_obj.calc_minmax(x_val, y_val, z_val)
+        self.minmax_buf.append((x_val, y_val, z_val))
         x_val += self.base_xyz[0]
         y_val += self.base_xyz[1]
         z_val += self.base_xyz[2]
@@ -180,6 +194,14 @@ def parse_xyz(self, is_float, x_str, y_str, z_str, do_minmax=False, convert=True
 
 
 
+def flush_minmax(self):
+    ''' Calculates min/max of all the X,Y,Z coords saved by 'parse_xyz()' in one pass
+    '''
+    if self.minmax_buf:
+        self.geom_obj.calc_minmax_batch(np.array(self.minmax_buf, dtype=np.float64))
+        self.minmax_buf = []
+
+
 def parse_colour(self, colour_str):
     ''' Parse a colour string into RGBA tuple.
 
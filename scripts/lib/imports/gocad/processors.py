@@ -317,7 +317,7 @@ def process_ascii_well_path(self, line_gen, field):
             break
 
 
-    self.logger.debug(f"END ascii well path = {well_path[1:]} marker_list = {marker_list}")
+    self.logger.debug("END ascii well path = %s marker_list = %s", well_path[1:], marker_list)
 
     # Do not return the first element in well_path, it is a WREF, not a PATH
     return is_last, well_path[1:], marker_list
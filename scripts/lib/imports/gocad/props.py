@@ -187,14 +187,14 @@ class PROPS:
             self.logger.error("Cannot find CSV file: %s", csv_file)
             sys.exit(1)
         try:
-            csv_filehandle = open(csv_file, 'r')
-            csv_reader = csv.reader(csv_filehandle)
-            for row in csv_reader:
-                a_val = 1.0
-                if int(row[0]) in transp_list:
-                    a_val = 0.0
-                col_tab[int(row[0])] = (float(row[2]), float(row[3]), float(row[4]), a_val)
-                lab_tab[int(row[0])] = row[1]
+            with open(csv_file, 'r') as csv_filehandle:
+                csv_reader = csv.reader(csv_filehandle)
+                for row in csv_reader:
+                    a_val = 1.0
+                    if int(row[0]) in transp_list:
+                        a_val = 0.0
+                    col_tab[int(row[0])] = (float(row[2]), float(row[3]), float(row[4]), a_val)
+                    lab_tab[int(row[0])] = row[1]
         except OSError as os_exc:
             self.logger.error("Cannot read CSV file %s %s", csv_file, os_exc)
             sys.exit(1)
@@ -209,7 +209,7 @@ class PROPS:
             :param fltp: floating point value to be assigned
 
         '''
-        self.data_3d[x_val][y_val][z_val] = fltp
+        self.data_3d[x_val, y_val, z_val] = fltp
         self.__calc_minmax(fltp)
 
 
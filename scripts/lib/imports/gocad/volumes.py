@@ -74,6 +74,7 @@ def read_volume_binary_files(self):
                 mult = [(self.axis_max[0] - self.axis_min[0]) / self.vol_sz[0],
                         (self.axis_max[1] - self.axis_min[1]) / self.vol_sz[1],
                         (self.axis_max[2] - self.axis_min[2]) / self.vol_sz[2]]
+                self.calc_vo_minmax(mult)
                 # Loop over points in volume
                 for z_val in range(self.vol_sz[2]):
                     for y_val in range(self.vol_sz[1]):
@@ -127,6 +128,7 @@ def read_volume_binary_files(self):
                     return False
 
                 self.logger.debug(f"pt_arr.shape = {pt_arr.shape}")
+                self.calc_sg_minmax(pt_arr)
 
                 # Loop over points in 3d SGRID
                 for z_val in range(self.vol_sz[2]):
@@ -183,7 +185,7 @@ def read_volume_binary_files(self):
 
 
 def calc_vo_xyz(self, x_idx, y_idx, z_idx, mult):
-    ''' Calculate the XYZ coords and their maxs & mins
+    ''' Calculate the XYZ coords
     ''' 
     x_coord = self.axis_o[0] + \
       (float(x_idx) * self.axis_u[0] * mult[0] + \
@@ -197,18 +199,40 @@ def calc_vo_xyz(self, x_idx, y_idx, z_idx, mult):
       (float(x_idx) * self.axis_w[0]* mult[0] + \
       float(y_idx) * self.axis_w[1] * mult[1] + \
       float(z_idx) * self.axis_w[2] * mult[2])
-    self.geom_obj.calc_minmax(x_coord, y_coord, z_coord)
     return x_coord, y_coord, z_coord
 
 
 def calc_sg_xyz(self, x_idx, y_idx, z_idx, fp_arr):
     ''' SGRID has coordinates in points file
     ''' 
-    x_coord, y_coord, z_coord = fp_arr[x_idx][y_idx][z_idx]
-    self.geom_obj.calc_minmax(x_coord, y_coord, z_coord)
+    x_coord, y_coord, z_coord = fp_arr[x_idx, y_idx, z_idx]
     return x_coord, y_coord, z_coord
 
 
+def calc_vo_minmax(self, mult):
+    ''' Calculate the maxs & mins of the XYZ coords of a VOXET, one layer at a time
+        Uses the same formula as 'calc_vo_xyz()'
+    '''
+    x_idx, y_idx = np.meshgrid(np.arange(self.vol_sz[0], dtype=np.float64),
+                               np.arange(self.vol_sz[1], dtype=np.float64), indexing='ij')
+    layer_xyz = np.empty((self.vol_sz[0] * self.vol_sz[1], 3))
+    for z_idx in range(self.vol_sz[2]):
+        for axis_idx, axis in enumerate((self.axis_u, self.axis_v, self.axis_w)):
+            layer_xyz[:, axis_idx] = (self.axis_o[axis_idx] + \
+              (x_idx * axis[0] * mult[0] + \
+              y_idx * axis[1] * mult[1] + \
+              float(z_idx) * axis[2] * mult[2])).ravel()
+        self.geom_obj.calc_minmax_batch(layer_xyz)
+
+
+def calc_sg_minmax(self, fp_arr):
+    ''' Calculate the maxs & mins of the XYZ coords of an SGRID, taken from its points array
+    '''
+    pt_arr = fp_arr[:self.vol_sz[0], :self.vol_sz[1], :self.vol_sz[2]]
+    self.geom_obj.calc_minmax_batch(np.stack((pt_arr['x'].ravel(), pt_arr['y'].ravel(),
+                                              pt_arr['z'].ravel()), axis=1))
+
+
 def read_region_flags_file(self, flags_array_len, flags_file,
                              flags_bit_sz, flags_offset):
     ''' Reads the flags file and looks for regions for a VOXET or SGRID file.
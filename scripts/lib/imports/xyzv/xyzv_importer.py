@@ -2,7 +2,7 @@ import logging
 import sys
 
 from lib.db.style.style import STYLE
-from lib.db.geometry.types import VRTX, ATOM, TRGL, SEG
+from lib.db.geometry.types import ATOM, TRGL, SEG
 from lib.db.geometry.model_geometries import ModelGeometries
 from lib.db.metadata.metadata import METADATA
 
@@ -38,8 +38,7 @@ def process_xyzv(file_lines, src_dir, filename, label, no_data_val=1e+10):
             (x, y, z, v) = (float(l[0]), float(l[1]), float(l[2]), float(l[3]))
         except ValueError:
             continue
-        geom_obj.vrtx_arr.append(VRTX(idx+1, (x, y, z)))
-        geom_obj.calc_minmax(x, y, z)
+        geom_obj.add_vrtx(idx+1, x, y, z)
         if v != no_data_val:
             if v < min_v:
                 min_v = v
@@ -47,6 +46,7 @@ def process_xyzv(file_lines, src_dir, filename, label, no_data_val=1e+10):
                 max_v = v
         d_dict[x, y, z] = v
 
+    geom_obj.recompute_extent()
     geom_obj.add_loose_3d_data(True, d_dict)
     geom_obj.add_stats(min_v, max_v, no_data_val)
     meta_obj = METADATA()
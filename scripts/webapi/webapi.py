@@ -41,7 +41,7 @@ from lib.file_processing import get_input_conv_param_bh
 from lib.file_processing import read_json_file, find_gltf
 from lib.exports.bh_make import get_blob_boreholes
 from lib.imports.gocad.gocad_importer import GocadImporter
-from lib.db.db_tables import QueryDB, QUERY_DB_FILE
+from lib.db.db_tables import open_read_only_db, QUERY_DB_FILE
 from lib.exports.gltf_kit import GltfKit
 from lib.picklers import element_unpickler, element_pickler, elementtree_unpickler, elementtree_pickler
 
@@ -428,9 +428,9 @@ def make_getfeatinfobyid_response(model, version, query_format, layer_names, obj
         return make_json_exception_response(version, 'InvalidParameterValue', 'incorrect layers, try "'+ LAYER_NAME + '"')
 
     # Query database
-    # Open up query database
+    # Open up query database, read-only connections are shared between requests
     db_path = os.path.join(DATA_DIR, QUERY_DB_FILE)
-    qdb = QueryDB(overwrite=False, db_name=db_path)
+    qdb = open_read_only_db(db_path)
     err_msg = qdb.get_error()
     if err_msg != '':
         LOGGER.error(f"Could not open query db {db_path}: {err_msg}")
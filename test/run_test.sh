@@ -30,6 +30,20 @@ coverage run --source webapi -m pytest
 [ $? -ne 0 ] && exit 1
 popd > /dev/null
 
+# Test geometry classes
+pushd unit/geometry > /dev/null
+coverage erase
+coverage run -m pytest
+[ $? -ne 0 ] && exit 1
+popd > /dev/null
+
+# Test false colour functions
+pushd unit/false_colour > /dev/null
+coverage erase
+coverage run -m pytest
+[ $? -ne 0 ] && exit 1
+popd > /dev/null
+
 # Test regresssion
 pushd regression > /dev/null
 ./reg_run.sh
@@ -42,7 +56,7 @@ coverage erase
 coverage run db_tables.py
 popd > /dev/null
 
-coverage combine unit/gocad_import/.coverage ../scripts/lib/db/.coverage ../scripts/.coverage unit/assimp_kit/.coverage unit/webapi/.coverage
+coverage combine unit/gocad_import/.coverage ../scripts/lib/db/.coverage ../scripts/.coverage unit/assimp_kit/.coverage unit/webapi/.coverage unit/geometry/.coverage unit/false_colour/.coverage
 coverage html
 coverage xml
 coverage report --omit '*/geomodel-2-3dweb/scripts/lib/exports/print_assimp.py'
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for false colour functions, checks that the vectorised functions give the same
+results as the original scalar functions
+"""
+import sys
+import math
+
+import numpy as np
+import pytest
+
+from pathlib import Path
+file_path = Path( __file__ ).absolute()
+
+# Repo root path
+root_path = file_path.parents[3]
+
+# Add in path to local library files
+sys.path.append(str(root_path / "scripts"))
+
+from lib.db.style.false_colour import MAX_FLT, calculate_false_colour_num, \
+                                      calculate_false_colour_num_array, \
+                                      make_false_colour_tup, make_false_colour_array
+
+RANGES = [(0.0, 10.0), (-3.0, -1.0), (-250.5, 1000.25), (5.0, 5.0), (10.0, 0.0),
+          (0.0, MAX_FLT), (1e-9, 2e-9)]
+''' (min, max) ranges used for testing, includes zero-width, reversed and tiny ranges
+'''
+
+EDGE_VALS = [math.nan, math.inf, -math.inf, MAX_FLT, -MAX_FLT, 0.0, -0.0]
+''' Values that are outside of any range or not numbers at all
+'''
+
+MAX_COLOURS = [256.0, 2.0, 1.0]
+''' Number of colours used for testing
+'''
+
+
+def make_vals(min_flt, max_flt):
+    ''' Makes a list of test values for a range: the limits of the range, values
+        inside the range, values just outside the range and the edge values
+
+    :param min_flt: lower bound of range
+    :param max_flt: upper bound of range
+    :returns: list of floats
+    '''
+    width = abs(max_flt - min_flt)
+    if not math.isfinite(width):
+        width = 1.0
+    vals = [min_flt, max_flt, min_flt - width, max_flt + width,
+            math.nextafter(min_flt, -math.inf), math.nextafter(max_flt, math.inf)]
+    vals += [min_flt + frac * (max_flt - min_flt) for frac in np.linspace(0.0, 1.0, 41).tolist()]
+    return vals + EDGE_VALS
+
+
+@pytest.mark.parametrize("min_flt, max_flt", RANGES)
+@pytest.mark.parametrize("max_colours_flt", MAX_COLOURS)
+def test_colour_num_array(min_flt, max_flt, max_colours_flt):
+    vals = make_vals(min_flt, max_flt)
+    num_arr = calculate_false_colour_num_array(np.array(vals), max_flt, min_flt, max_colours_flt)
+    assert num_arr.shape == (len(vals),)
+    for val, num in zip(vals, num_arr.tolist()):
+        try:
+            expected = calculate_false_colour_num(val, max_flt, min_flt, max_colours_flt)
+        # Scalar version fails for NaN & infinite colour numbers, array version returns 0
+        except (OverflowError, ValueError):
+            expected = 0
+        # Array version returns 0 if colour number is too large for an int32
+        if abs(expected) >= 2**31:
+            expected = 0
+        assert num == expected, f"value={val}"
+
+
+def test_colour_num_array_non_finite():
+    num_arr = calculate_false_colour_num_array([math.nan, math.inf, -math.inf, MAX_FLT,
+                                                -MAX_FLT, 1e300], 10.0, 0.0, 256.0)
+    assert num_arr.dtype == np.int32
+    assert num_arr.tolist() == [0, 0, 0, 0, 0, 0]
+
+
+def test_colour_num_array_2d():
+    val_arr = np.array([[0.0, 5.0], [10.0, math.nan]])
+    num_arr = calculate_false_colour_num_array(val_arr, 10.0, 0.0, 256.0)
+    assert num_arr.tolist() == [[0, 127], [255, 0]]
+
+
+@pytest.mark.parametrize("min_flt, max_flt", RANGES)
+def test_colour_array(min_flt, max_flt):
+    vals = make_vals(min_flt, max_flt)
+    with np.errstate(all='ignore'):
+        pix_arr = make_false_colour_array(np.array(vals), min_flt, max_flt)
+    assert pix_arr.shape == (len(vals), 4)
+    for val, pix in zip(vals, pix_arr.tolist()):
+        try:
+            expected = make_false_colour_tup(val, min_flt, max_flt)
+        # Scalar version fails for in-range values of a zero-width range
+        except ZeroDivisionError:
+            assert min_flt == max_flt
+            continue
+        # NaN values are compared as equal
+        np.testing.assert_array_equal(pix, expected, err_msg=f"value={val}")
+
+
+def test_colour_array_out_of_range():
+    pix_arr = make_false_colour_array([-1.0, 11.0, -math.inf, math.inf], 0.0, 10.0)
+    assert pix_arr.tolist() == [[0.0, 0.0, 0.0, 0.0]] * 4
+
+
+def test_colour_array_2d():
+    i_arr = np.array([[0.0, 2.5], [7.5, 10.0]])
+    pix_arr = make_false_colour_array(i_arr, 0.0, 10.0)
+    assert pix_arr.shape == (2, 2, 4)
+    for idx in np.ndindex(i_arr.shape):
+        assert tuple(pix_arr[idx].tolist()) == make_false_colour_tup(float(i_arr[idx]), 0.0, 10.0)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the numpy backed geometry classes: ModelGeometries, NamedTupleArrayView
+and XYZDataSet
+"""
+import sys
+import math
+
+import numpy as np
+import pytest
+
+from pathlib import Path
+file_path = Path( __file__ ).absolute()
+
+# Repo root path
+root_path = file_path.parents[3]
+
+# Add in path to local library files
+sys.path.append(str(root_path / "scripts"))
+
+from lib.db.geometry.model_geometries import ModelGeometries, grow_array
+from lib.db.geometry.xyz_data import XYZDataSet
+from lib.db.geometry.types import VRTX, TRGL
+
+
+def make_geom(vrtx_cnt):
+    ''' Makes a ModelGeometries object with some vertices
+
+    :param vrtx_cnt: number of vertices
+    :returns: ModelGeometries object
+    '''
+    geom = ModelGeometries()
+    for idx in range(vrtx_cnt):
+        geom.add_vrtx(idx + 1, float(idx), float(idx * 10), float(-idx))
+    return geom
+
+
+def test_grow_array():
+    arr = np.zeros((3, 2))
+    # Not full, no need to grow
+    assert grow_array(arr, 2) is arr
+    assert grow_array(arr, 1, 2) is arr
+    # Full, size is doubled, but is at least 16
+    assert grow_array(arr, 3).shape == (16, 2)
+    assert grow_array(np.zeros(20), 20).shape == (40,)
+    # Large batch is bigger than double
+    assert grow_array(np.zeros(20), 20, 50).shape == (70,)
+
+
+def test_view_indexing():
+    geom = make_geom(5)
+    vrtx_arr = geom.vrtx_arr
+    assert len(vrtx_arr) == 5
+    assert vrtx_arr[0] == VRTX(1, (0.0, 0.0, 0.0))
+    assert vrtx_arr[4] == VRTX(5, (4.0, 40.0, -4.0))
+    assert isinstance(vrtx_arr[0].xyz, tuple)
+    # Negative indexes count from the end
+    assert vrtx_arr[-1] == vrtx_arr[4]
+    assert vrtx_arr[-5] == vrtx_arr[0]
+    # Out of range indexes
+    with pytest.raises(IndexError):
+        vrtx_arr[5]
+    with pytest.raises(IndexError):
+        vrtx_arr[-6]
+
+
+def test_view_slicing():
+    geom = make_geom(5)
+    vrtx_arr = geom.vrtx_arr
+    assert vrtx_arr[1:3] == [VRTX(2, (1.0, 10.0, -1.0)), VRTX(3, (2.0, 20.0, -2.0))]
+    assert vrtx_arr[::-2] == [vrtx_arr[4], vrtx_arr[2], vrtx_arr[0]]
+    assert vrtx_arr[3:100] == [vrtx_arr[3], vrtx_arr[4]]
+    assert vrtx_arr[10:] == []
+    assert list(vrtx_arr) == vrtx_arr[:]
+
+
+def test_view_unused_rows():
+    # Buffers are larger than the number of rows in use, only the rows in use are visible
+    geom = make_geom(3)
+    assert len(geom._vrtx_xyz) > 3
+    assert len(geom.vrtx_arr) == 3
+    assert list(geom.vrtx_arr) == geom.vrtx_arr[0:3]
+    with pytest.raises(IndexError):
+        geom.vrtx_arr[3]
+
+
+def test_view_append_and_eq():
+    geom = ModelGeometries()
+    assert geom.trgl_arr == []
+    geom.trgl_arr.append(TRGL(1, (1, 2, 3)))
+    geom.add_trgl(2, 2, 3, 4)
+    assert geom.trgl_arr == [TRGL(1, (1, 2, 3)), TRGL(2, (2, 3, 4))]
+    assert geom.trgl_arr != [TRGL(1, (1, 2, 3))]
+    assert geom.is_trgl()
+
+
+def test_add_arrays():
+    geom = make_geom(2)
+    geom.add_vrtx_array(np.array([3, 4]), np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]))
+    assert geom.vrtx_cnt == 4
+    assert geom.vrtx_arr[2:] == [VRTX(3, (1.0, 2.0, 3.0)), VRTX(4, (4.0, 5.0, 6.0))]
+    # Many small batches
+    for idx in range(100):
+        geom.add_vrtx_array([idx + 5], [[idx, idx, idx]])
+    assert geom.vrtx_cnt == 104
+    assert geom.vrtx_arr[-1] == VRTX(104, (99.0, 99.0, 99.0))
+
+    geom.add_trgl_array(np.array([1, 2]), np.array([[1, 2, 3], [2, 3, 4]]))
+    geom.add_trgl_array(np.array([3]), np.array([[3, 4, 1]]))
+    assert geom.trgl_arr == [TRGL(1, (1, 2, 3)), TRGL(2, (2, 3, 4)), TRGL(3, (3, 4, 1))]
+
+    geom.add_seg_array(np.array([[1, 2], [2, 3]]))
+    geom.add_seg_array(np.empty((0, 2)))
+    assert geom.seg_ab_array.tolist() == [[1, 2], [2, 3]]
+    assert geom.is_line()
+
+
+def test_calc_minmax_batch():
+    geom = ModelGeometries()
+    # Empty array does not change anything
+    geom.calc_minmax_batch(np.empty((0, 3)))
+    assert geom.get_extent() == ModelGeometries().get_extent()
+
+    geom.calc_minmax_batch(np.array([[1.0, 2.0, 3.0], [-1.0, 5.0, 0.5]]))
+    assert geom.get_extent() == [-1.0, 1.0, 2.0, 5.0]
+    assert (geom.min_z, geom.max_z) == (0.5, 3.0)
+
+    # Existing min/max are kept, NaNs are ignored
+    geom.calc_minmax_batch(np.array([[math.nan, 10.0, math.nan], [0.0, math.nan, 4.0]]))
+    assert geom.get_extent() == [-1.0, 1.0, 2.0, 10.0]
+    assert (geom.min_z, geom.max_z) == (0.5, 4.0)
+
+    # Column that is all NaNs is ignored
+    geom.calc_minmax_batch(np.array([[math.nan, -20.0, 0.0]]))
+    assert geom.get_extent() == [-1.0, 1.0, -20.0, 10.0]
+    assert isinstance(geom.min_x, float)
+
+
+def test_calc_minmax_batch_same_as_calc_minmax():
+    rng = np.random.default_rng(1)
+    xyz_arr = rng.uniform(-1000.0, 1000.0, (50, 3))
+    batch_geom = ModelGeometries()
+    batch_geom.calc_minmax_batch(xyz_arr)
+    geom = ModelGeometries()
+    for x_flt, y_flt, z_flt in xyz_arr.tolist():
+        geom.calc_minmax(x_flt, y_flt, z_flt)
+    assert batch_geom.get_extent() == geom.get_extent()
+    assert (batch_geom.min_z, batch_geom.max_z) == (geom.min_z, geom.max_z)
+
+
+def test_xyz_data_set():
+    data = XYZDataSet.from_dict({(1.0, 2.0, 3.0): 4.5, (0.0, 0.0, 0.0): -1.0})
+    assert len(data) == 2
+    assert data[(1.0, 2.0, 3.0)] == 4.5
+    assert data.get((0.0, 0.0, 0.0)) == -1.0
+    assert (1.0, 2.0, 3.0) in data
+    assert (9.0, 9.0, 9.0) not in data
+    assert data.get((9.0, 9.0, 9.0), 'missing') == 'missing'
+    with pytest.raises(KeyError):
+        data[(9.0, 9.0, 9.0)]
+    # Iterates over coordinates in insertion order
+    assert list(data) == [(1.0, 2.0, 3.0), (0.0, 0.0, 0.0)]
+    assert 'shape=(2, 3)' in repr(data)
+
+
+def test_xyz_data_set_multiple_values():
+    data = XYZDataSet.from_dict({(1.0, 2.0, 3.0): (1.0, 2.0, 3.0), (4.0, 5.0, 6.0): (7.0, 8.0, 9.0)})
+    assert data[(4.0, 5.0, 6.0)] == (7.0, 8.0, 9.0)
+    assert isinstance(data[(1.0, 2.0, 3.0)], tuple)
+
+
+def test_xyz_data_set_empty():
+    data = XYZDataSet.from_dict({})
+    assert len(data) == 0
+    assert list(data) == []
+    assert (0.0, 0.0, 0.0) not in data
+    assert data.coords.shape == (0, 3)
+
+
+def test_xyz_data_set_float32():
+    data = XYZDataSet.from_dict({(1.0, 2.0, 3.0): np.float32(0.25)})
+    assert data.values.dtype == np.float32
+    assert data[(1.0, 2.0, 3.0)] == 0.25
+
+
+def test_geometry_xyz_data():
+    geom = ModelGeometries()
+    geom.add_loose_3d_data(True, {(1.0, 2.0, 3.0): 4.0})
+    data = geom.get_loose_3d_data(True)
+    assert isinstance(data, XYZDataSet)
+    assert data[(1.0, 2.0, 3.0)] == 4.0
+    # Missing data sets are empty
+    assert len(geom.get_loose_3d_data(True, 1)) == 0
@@ -413,6 +413,15 @@ gsm_list[0][0].vrtx_arr[0].xyz == (994.4795874134504, 2005.6239995358749, 128.80
 gsm_list[0][0].vrtx_arr[1].xyz == (990.655890123452, 2009.403974792015, 153.78217326370554)")
 
 
+    #
+    # Well path is not inverted when z-axis is positive downwards
+    #
+    test_this("Well path is not inverted when z-axis is positive downwards",
+         "test044.wl", "len(gsm_list)==1 and gocad_obj.invert_zaxis and \
+gsm_list[0][0].vrtx_arr[0].xyz == (994.4795874134504, 2005.6239995358749, 128.80712107653724) and \
+gsm_list[0][0].vrtx_arr[1].xyz == (990.655890123452, 2009.403974792015, 153.78217326370554)")
+
+
     #
     # Parse SGRID keywords and extract volume data
     #
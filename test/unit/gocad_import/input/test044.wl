@@ -0,0 +1,22 @@
+GOCAD Well 1 
+HEADER {
+name:test
+}
+GOCAD_ORIGINAL_COORDINATE_SYSTEM
+NAME Default
+AXIS_NAME "X" "Y" "Z"
+AXIS_UNIT "m" "m" "m"
+ZPOSITIVE Depth
+END_ORIGINAL_COORDINATE_SYSTEM
+"Status" "unknown"
+PATH_ZM_UNIT m
+WREF 1000.0 2000.0 100.0
+DATUM GroundLevel
+KB 0 
+DEVIATION_SURVEY "Minimum Curvature"
+STATION 1884.88  17.00  315.80
+STATION 1914.75  13.60  315.20
+STATION 1940.30  10.70  314.00
+ZM_OFFSET 357384 
+ZM_NPTS 3 
+END
@@ -150,24 +150,30 @@ def get_boreholes(reader, qdb, param_obj, output_mode='GLTF', dest_dir=''):
             first_depth = -1
             # pylint: disable=W0612
             LOGGER.debug("Assembling database")
+            seg_json_list = []
+            colour_idx_list = []
             for vert_list, indices, colour_idx, depth, rgba_colour, class_dict, mesh_name in \
                 colour_borehole_gen(base_xyz, borehole.name, bh_data_dict, height_res):
                 if first_depth < 0:
                     first_depth = int(depth)
-                is_ok, s_obj = qdb.add_segment(json.dumps(class_dict))
-                if not is_ok:
-                    LOGGER.warning(f"Cannot add segment to db: {s_obj}")
-                    continue
+                seg_json_list.append(json.dumps(class_dict))
+                colour_idx_list.append(colour_idx)
+            # Add all the segments in one transaction
+            is_ok, s_obj_list = qdb.add_many_segments(seg_json_list)
+            if not is_ok:
+                LOGGER.warning(f"Cannot add segments to db: {s_obj_list}")
+            else:
                 # Using 'make_borehole_label()' ensures that name is the same
                 # in both db and GLTF file
                 bh_label = make_borehole_label(borehole.name, first_depth)
-                bh_str = f"{bh_label.decode('utf-8')}_{colour_idx}"
-                is_ok, r_obj = qdb.add_query(bh_str, param_obj.modelUrlPath,
-                                             s_obj, p_obj, None, None)
+                query_list = [(f"{bh_label.decode('utf-8')}_{colour_idx}", param_obj.modelUrlPath,
+                               s_obj, p_obj, None, None)
+                              for s_obj, colour_idx in zip(s_obj_list, colour_idx_list)]
+                is_ok, r_obj = qdb.add_queries(query_list)
                 if not is_ok:
-                    LOGGER.warning(f"Cannot add query to db: {r_obj}")
-                    continue
-                LOGGER.debug(f"ADD_QUERY({mesh_name}, {param_obj.modelUrlPath})")
+                    LOGGER.warning(f"Cannot add queries to db: {r_obj}")
+                else:
+                    LOGGER.debug(f"ADD_QUERIES({len(query_list)}, {param_obj.modelUrlPath})")
 
             LOGGER.debug("Writing GLTFs")
             file_name = make_borehole_filename(borehole.name)
@@ -233,6 +239,8 @@ def process_single(dest_dir, input_file, db_name, overwrite_db=True):
     # pylint: disable=W0612
     borehole_loadconfig, none_obj = get_boreholes(reader, qdb, input_params, output_mode='GLTF',
                                                   dest_dir=dest_dir)
+    # Closing the database makes it readable from a read-only directory
+    qdb.close()
     LOGGER.debug(f"borehole_loadconfig = {borehole_loadconfig}")
     if borehole_loadconfig:
         LOGGER.info(f"Writing to: {out_filename}")